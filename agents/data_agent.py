@@ -4,7 +4,7 @@ import logging
 from typing import Any, Dict
 
 from core.models import AgentMessage
-from tools.climate_data_tool import load_region
+from tools.climate_data_tool import load_region, region_to_dict
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +17,9 @@ class DataAgent:
     to the ScenarioAgent.
     """
 
+    # Only reads region data; safe to run concurrently on the MessageBus
+    thread_safe = True
+
     def handle_message(self, msg: AgentMessage, bus: "MessageBus") -> None:
         if msg.type != "POLICY":
             logger.debug("DataAgent ignoring message type %s", msg.type)
@@ -27,11 +30,14 @@ class DataAgent:
 
         logger.info("DataAgent loading data for region %s (session %s)", region_id, msg.session_id)
 
-        region_data = load_region(region_id)
+        # The store's view is shared and read-only; the session gets its own copy,
+        # which is pickled for process workers and saved with the report
+        region_data = region_to_dict(load_region(region_id))
 
         payload = {
             "policy": policy,
             "region": region_data,
+            "seed": msg.payload.get("seed"),
         }
 
         out_msg = AgentMessage(
@@ -1,12 +1,29 @@
 # Scores scenarios
 # Goal: Score scenarios and decide which are viable.
+import heapq
 import logging
-from typing import Any, Dict, List, Tuple
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
 
+from core.config import EVAL_MODE, EVAL_SCORE_BASIS, EVAL_TOP_K
 from core.models import AgentMessage
+from tools.scoring_tool import (
+    DEFAULT_WEIGHTS,
+    SCORE_BASES,
+    ScoringWeights,
+    pareto_frontier,
+    score_scenario,
+    score_simulations,
+    simulation_columns,
+)
 
 logger = logging.getLogger(__name__)
 
+MODES = ("score", "pareto")
+
+# Pareto mode buffers at least this many results before pruning to the frontier
+_PARETO_BUFFER = 4096
+
 
 class EvaluationAgent:
     """
@@ -15,54 +32,242 @@ class EvaluationAgent:
     Aggregates simulation results, computes scores for each scenario based on
     policy targets and constraints, and selects the best scenario. Sends summary
     to ReportAgent.
+
+    Results are scored as they arrive and then dropped: per session the agent
+    keeps running metrics and a bounded min-heap of the `top_k` best scenarios
+    (top_k=0 keeps all), so memory does not grow with the number of
+    candidates. Ties keep arrival order, as a stable sort would.
+
+    Scoring lives in tools.scoring_tool; batches are scored in one
+    vectorized call. score_basis="cumulative" scores the cut in cumulative
+    emissions over the horizon (from simulated trajectories) instead of
+    the end-state reduction. The summary's metrics record the basis and
+    weights, so a report can be re-scored the same way later.
+
+    mode="pareto" also reports the Pareto frontier over (reduction, cost,
+    jobs change): the scenarios no other scenario beats on all three. The
+    agent buffers results and prunes them to the running frontier once
+    the buffer outgrows it, so memory stays near the frontier's size and
+    each prune is one O(n log n) sweep (scoring_tool.pareto_frontier).
+    The weighted score still picks the best scenario.
+
+    SIM_ERROR messages count their scenarios as failed: the session
+    finishes once every expected scenario has either a result or a
+    failure. The summary reports the failures in its metrics (and is kept
+    out of the result cache); if nothing succeeded, best_scenario is None
+    and "error" holds the first failure.
     """
 
-    def __init__(self):
-        # session_id -> dict with expected_count, results list
+    # Concurrent across sessions, but SCENARIO_COUNT / SIM_RESULT(_BATCH) accounting
+    # for one session must be applied in order.
+    thread_safe = True
+    session_ordered = True
+
+    def __init__(
+        self,
+        top_k: int = EVAL_TOP_K,
+        weights: Optional[ScoringWeights] = None,
+        score_basis: str = EVAL_SCORE_BASIS,
+        mode: str = EVAL_MODE,
+    ):
+        if score_basis not in SCORE_BASES:
+            raise ValueError(f"Unknown score basis '{score_basis}'. Expected one of {SCORE_BASES}")
+        if mode not in MODES:
+            raise ValueError(f"Unknown evaluation mode '{mode}'. Expected one of {MODES}")
+
+        self.top_k = top_k
+        self.weights = weights
+        self.score_basis = score_basis
+        self.mode = mode
+        # session_id -> running evaluation state (see _new_state)
         self._sessions: Dict[str, Dict[str, Any]] = {}
 
     def handle_message(self, msg: AgentMessage, bus: "MessageBus") -> None:
         if msg.type == "SCENARIO_COUNT":
-            self._handle_scenario_count(msg)
+            self._handle_scenario_count(msg, bus)
         elif msg.type == "SIM_RESULT":
             self._handle_sim_result(msg, bus)
+        elif msg.type == "SIM_RESULT_BATCH":
+            self._handle_sim_result_batch(msg, bus)
+        elif msg.type == "SIM_ERROR":
+            self._handle_sim_error(msg, bus)
         else:
             logger.debug("EvaluationAgent ignoring message type %s", msg.type)
 
-    def _handle_scenario_count(self, msg: AgentMessage) -> None:
+    @staticmethod
+    def _new_state() -> Dict[str, Any]:
+        return {
+            "expected": None,
+            "received": 0,
+            # Scenarios SimulationAgent could not simulate, and the first error
+            "failed": 0,
+            "error": None,
+            # Result cache key from ScenarioAgent, passed on to ReportAgent
+            "cache_key": None,
+            # Policy and region are the same for every result of a session
+            "policy": None,
+            "region": None,
+            # Min-heap of (score, -seq, scenario, simulation); the root is the worst kept
+            "top": [],
+            # Pareto mode: the frontier so far and results not yet pruned against it,
+            # as (score, -seq, scenario, simulation)
+            "frontier": [],
+            "pending": [],
+            "sum_co2_reduction_percent": 0.0,
+            "sum_total_cost_usd": 0.0,
+            "max_co2_reduction_percent": None,
+            "min_total_cost_usd": None,
+        }
+
+    def _state(self, session_id: str) -> Dict[str, Any]:
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = self._sessions[session_id] = self._new_state()
+        return state
+
+    def _handle_scenario_count(self, msg: AgentMessage, bus: "MessageBus") -> None:
         expected = int(msg.payload["count"])
         session_id = msg.session_id
-        if session_id not in self._sessions:
-            self._sessions[session_id] = {"expected": expected, "results": []}
-        else:
-            self._sessions[session_id]["expected"] = expected
+        state = self._state(session_id)
+        state["expected"] = expected
+        state["cache_key"] = msg.payload.get("cache_key")
 
         logger.info(
             "EvaluationAgent expecting %d scenarios for session %s",
             expected,
             session_id,
         )
+        # Schedulers may deliver results ahead of the count
+        self._maybe_finish(session_id, bus)
 
     def _handle_sim_result(self, msg: AgentMessage, bus: "MessageBus") -> None:
         session_id = msg.session_id
-        if session_id not in self._sessions:
-            self._sessions[session_id] = {"expected": None, "results": []}
+        state = self._state(session_id)
+        payload = msg.payload
 
-        self._sessions[session_id]["results"].append(msg.payload)
-
-        expected = self._sessions[session_id].get("expected")
-        results = self._sessions[session_id]["results"]
+        policy = payload["policy"]
+        simulation = payload["simulation"]
+        score = score_scenario(policy, simulation, self.weights, self.score_basis)
+        self._add_result(state, policy, payload["region"], payload["scenario"], simulation, score)
 
         logger.info(
             "EvaluationAgent received SIM_RESULT (%d/%s expected) for session %s",
-            len(results),
-            expected,
+            state["received"],
+            state["expected"],
+            session_id,
+        )
+
+        self._maybe_finish(session_id, bus)
+
+    def _handle_sim_result_batch(self, msg: AgentMessage, bus: "MessageBus") -> None:
+        session_id = msg.session_id
+        state = self._state(session_id)
+
+        policy = msg.payload["policy"]
+        region = msg.payload["region"]
+        simulations = msg.payload["simulations"]
+        scores = score_simulations(policy, simulations, self.weights, self.score_basis).tolist()
+        for scenario, simulation, score in zip(msg.payload["scenarios"], simulations, scores):
+            self._add_result(state, policy, region, scenario, simulation, score)
+
+        logger.info(
+            "EvaluationAgent received SIM_RESULT_BATCH (%d/%s expected) for session %s",
+            state["received"],
+            state["expected"],
+            session_id,
+        )
+
+        self._maybe_finish(session_id, bus)
+
+    def _handle_sim_error(self, msg: AgentMessage, bus: "MessageBus") -> None:
+        session_id = msg.session_id
+        state = self._state(session_id)
+        if state["policy"] is None:
+            state["policy"] = msg.payload["policy"]
+            state["region"] = msg.payload["region"]
+
+        state["failed"] += len(msg.payload["scenario_ids"])
+        if state["error"] is None:
+            state["error"] = msg.payload["error"]
+
+        logger.warning(
+            "EvaluationAgent received SIM_ERROR for %d scenarios (%d failed, %d/%s received) "
+            "for session %s: %s",
+            len(msg.payload["scenario_ids"]),
+            state["failed"],
+            state["received"],
+            state["expected"],
             session_id,
+            msg.payload["error"],
         )
 
-        if expected is not None and len(results) >= expected:
+        self._maybe_finish(session_id, bus)
+
+    def _add_result(
+        self,
+        state: Dict[str, Any],
+        policy: Dict[str, Any],
+        region: Dict[str, Any],
+        scenario: Dict[str, Any],
+        simulation: Dict[str, Any],
+        score: float,
+    ) -> None:
+        """Fold one scored result into the running state."""
+        if state["policy"] is None:
+            state["policy"] = policy
+            state["region"] = region
+
+        logger.debug(
+            "Scenario %s has score %.2f (sim=%s)",
+            scenario["scenario_id"],
+            score,
+            simulation,
+        )
+
+        state["received"] += 1
+        co2 = simulation["co2_reduction_percent"]
+        cost = simulation["total_cost_usd"]
+        state["sum_co2_reduction_percent"] += co2
+        state["sum_total_cost_usd"] += cost
+        if state["max_co2_reduction_percent"] is None or co2 > state["max_co2_reduction_percent"]:
+            state["max_co2_reduction_percent"] = co2
+        if state["min_total_cost_usd"] is None or cost < state["min_total_cost_usd"]:
+            state["min_total_cost_usd"] = cost
+
+        # Later arrivals lose ties, so they get a smaller -seq
+        entry = (score, -state["received"], scenario, simulation)
+        top = state["top"]
+        if self.top_k <= 0 or len(top) < self.top_k:
+            heapq.heappush(top, entry)
+        elif entry[:2] > top[0][:2]:
+            heapq.heapreplace(top, entry)
+
+        if self.mode == "pareto":
+            state["pending"].append(entry)
+            if len(state["pending"]) >= max(_PARETO_BUFFER, len(state["frontier"])):
+                self._prune_frontier(state)
+
+    def _prune_frontier(self, state: Dict[str, Any]) -> None:
+        """Reduce the frontier plus pending results to the new frontier."""
+        candidates = state["frontier"] + state["pending"]
+        columns = simulation_columns([entry[3] for entry in candidates], self.score_basis)
+        keep = pareto_frontier(
+            columns["co2_reduction_percent"],
+            columns["total_cost_usd"],
+            columns["estimated_jobs_change_percent"],
+        )
+        state["frontier"] = [candidates[i] for i in keep.tolist()]
+        state["pending"] = []
+
+    def _maybe_finish(self, session_id: str, bus: "MessageBus") -> None:
+        """Send EVAL_SUMMARY once every expected scenario has a result or a failure."""
+        state = self._sessions[session_id]
+        expected = state["expected"]
+        done = state["received"] + state["failed"]
+
+        if expected is not None and done and done >= expected:
             logger.info("EvaluationAgent has all results for session %s; evaluating", session_id)
-            summary = self._evaluate_session(results)
+            summary = self._summarize(state)
             out_msg = AgentMessage(
                 sender="EvaluationAgent",
                 receiver="ReportAgent",
@@ -71,101 +276,91 @@ class EvaluationAgent:
                 session_id=session_id,
             )
             bus.send(out_msg)
-            # Optionally clear session to save memory
             del self._sessions[session_id]
 
-    def _evaluate_session(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _summarize(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Compute a score for each scenario and pick the best one.
+        Build the EVAL_SUMMARY payload from the running state: the best
+        scenario, the top-K ranking (best first) and aggregate metrics.
         """
-        scored: List[Tuple[float, Dict[str, Any]]] = []
-
-        for entry in results:
-            policy = entry["policy"]
-            simulation = entry["simulation"]
-            scenario = entry["scenario"]
+        if not state["received"]:
+            return self._summarize_failure(state)
 
-            score = self._score_scenario(policy, simulation)
-            scored.append((score, entry))
-
-            logger.debug(
-                "Scenario %s has score %.2f (sim=%s)",
-                scenario["scenario_id"],
-                score,
-                simulation,
-            )
-
-        scored.sort(key=lambda x: x[0], reverse=True)
-        best_score, best_entry = scored[0]
-
-        # Aggregate metrics
-        co2_reductions = [e["simulation"]["co2_reduction_percent"] for _, e in scored]
-        costs = [e["simulation"]["total_cost_usd"] for _, e in scored]
+        ranked: List[Tuple[float, int, Dict[str, Any], Dict[str, Any]]] = sorted(
+            state["top"], key=lambda e: e[:2], reverse=True
+        )
+        best_score, _, best_scenario, best_simulation = ranked[0]
+        n = state["received"]
 
         summary = {
             "best_scenario": {
                 "score": best_score,
-                "policy": best_entry["policy"],
-                "region": best_entry["region"],
-                "scenario": best_entry["scenario"],
-                "simulation": best_entry["simulation"],
+                "policy": state["policy"],
+                "region": state["region"],
+                "scenario": best_scenario,
+                "simulation": best_simulation,
             },
             "ranked_scenarios": [
                 {
-                    "score": s,
-                    "scenario": e["scenario"],
-                    "simulation": e["simulation"],
+                    "score": score,
+                    "scenario": scenario,
+                    "simulation": simulation,
                 }
-                for s, e in scored
+                for score, _, scenario, simulation in ranked
             ],
             "metrics": {
-                "num_scenarios": len(scored),
-                "avg_co2_reduction_percent": sum(co2_reductions) / len(co2_reductions),
-                "avg_total_cost_usd": sum(costs) / len(costs),
-                "max_co2_reduction_percent": max(co2_reductions),
-                "min_total_cost_usd": min(costs),
+                "num_scenarios": n,
+                "avg_co2_reduction_percent": state["sum_co2_reduction_percent"] / n,
+                "avg_total_cost_usd": state["sum_total_cost_usd"] / n,
+                "max_co2_reduction_percent": state["max_co2_reduction_percent"],
+                "min_total_cost_usd": state["min_total_cost_usd"],
+                "num_failed": state["failed"],
+                "score_basis": self.score_basis,
+                "score_weights": asdict(self.weights or DEFAULT_WEIGHTS),
             },
         }
 
+        if self.mode == "pareto":
+            self._prune_frontier(state)
+            # Best reduction first
+            summary["pareto_frontier"] = [
+                {
+                    "score": score,
+                    "scenario": scenario,
+                    "simulation": simulation,
+                }
+                for score, _, scenario, simulation in state["frontier"]
+            ]
+
+        if state["failed"]:
+            # Partial results: report them, but don't cache them as the answer
+            summary["error"] = state["error"]
+        elif state["cache_key"] is not None:
+            summary["cache_key"] = state["cache_key"]
+
         logger.info(
             "EvaluationAgent selected best scenario %s with score %.2f",
-            summary["best_scenario"]["scenario"]["scenario_id"],
+            best_scenario["scenario_id"],
             best_score,
         )
         return summary
 
-    def _score_scenario(self, policy: Dict[str, Any], sim: Dict[str, Any]) -> float:
-        """
-        Simple scoring function:
-
-        score = w1 * reduction - w2 * budget_overshoot - w3 * jobs_penalty
-
-        All weights are hand-tuned placeholders you can adjust.
-        """
-        targets = policy["targets"]
-        target_reduction = targets["co2_reduction_percent"]
-        reduction = sim["co2_reduction_percent"]
-
-        # reward getting close to or above target
-        reduction_score = reduction - max(0.0, target_reduction - reduction)
-
-        budget_limit = targets.get("budget_limit_usd")
-        cost = sim["total_cost_usd"]
-        if budget_limit is not None and cost > budget_limit:
-            budget_overshoot = (cost - budget_limit) / max(budget_limit, 1.0)
-        else:
-            budget_overshoot = 0.0
-
-        job_limit = targets.get("job_loss_max_percent", 5)
-        jobs_change = sim.get("estimated_jobs_change_percent", 0.0)
-        jobs_penalty = 0.0
-        if jobs_change < -job_limit:
-            jobs_penalty = abs(jobs_change) - job_limit
-
-        # weights
-        w1 = 1.0
-        w2 = 50.0
-        w3 = 10.0
-
-        score = w1 * reduction_score - w2 * budget_overshoot - w3 * jobs_penalty
-        return score
+    def _summarize_failure(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """EVAL_SUMMARY payload for a session where every scenario failed."""
+        logger.error(
+            "EvaluationAgent got no results, %d scenarios failed: %s",
+            state["failed"],
+            state["error"],
+        )
+        return {
+            "best_scenario": None,
+            "policy": state["policy"],
+            "region": state["region"],
+            "ranked_scenarios": [],
+            "metrics": {
+                "num_scenarios": 0,
+                "num_failed": state["failed"],
+                "score_basis": self.score_basis,
+            },
+            "error": state["error"],
+        }
@@ -18,6 +18,9 @@ class Orchestrator:
     This is also a good place to implement pause/resume and handle errors.
     """
 
+    # Keeps no per-session state
+    thread_safe = True
+
     def handle_message(self, msg: AgentMessage, bus: "MessageBus") -> None:
         if msg.type == "START":
             self._handle_start(msg, bus)
@@ -41,7 +44,7 @@ class Orchestrator:
             sender="Orchestrator",
             receiver="PolicyAgent",
             type="GOAL",
-            payload={"text": goal_text, "region_id": region_id},
+            payload={"text": goal_text, "region_id": region_id, "seed": payload.get("seed")},
             session_id=msg.session_id,
         )
         bus.send(goal_msg)
@@ -19,6 +19,9 @@ class PolicyAgent:
     rule-based parser that you can later replace with an LLM call.
     """
 
+    # Pure function of the GOAL payload
+    thread_safe = True
+
     def __init__(self, default_region_id: str = "coastal_city_01"):
         self.default_region_id = default_region_id
 
@@ -38,7 +41,7 @@ class PolicyAgent:
             sender="PolicyAgent",
             receiver="DataAgent",
             type="POLICY",
-            payload={"policy": policy},
+            payload={"policy": policy, "seed": msg.payload.get("seed")},
             session_id=msg.session_id,
         )
         bus.send(out_msg)
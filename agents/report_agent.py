@@ -1,9 +1,9 @@
 # Generates final human-readable reports (LLM)
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from core.models import AgentMessage
-from tools.storage_tool import save_report
+from tools.storage_tool import save_cached_report, save_report
 
 logger = logging.getLogger(__name__)
 
@@ -15,20 +15,41 @@ class ReportAgent:
     Converts evaluation summary into a human-readable report, and saves it
     via storage_tool. In a full version, it would use an LLM to write a
     polished narrative.
+
+    Summaries from EvaluationAgent's pareto mode add a Pareto frontier
+    section listing the trade-offs between reduction, cost and jobs.
+
+    Summaries carrying a cache_key also store the report in the result
+    cache; CACHED_REPORT messages deliver a report from that cache as is.
+
+    Scenarios that failed to simulate are noted in the report with the
+    first error; if none succeeded, the report says so and carries an
+    empty best_scenario.
     """
 
+    # Each session writes its own report file
+    thread_safe = True
+
     def handle_message(self, msg: AgentMessage, bus: "MessageBus") -> None:
+        if msg.type == "CACHED_REPORT":
+            self._publish(msg.session_id, msg.payload["report"], bus)
+            return
         if msg.type != "EVAL_SUMMARY":
             logger.debug("ReportAgent ignoring message type %s", msg.type)
             return
 
         summary: Dict[str, Any] = msg.payload
         report = self._generate_report(summary)
+        if summary.get("cache_key"):
+            save_cached_report(summary["cache_key"], report)
+
+        self._publish(msg.session_id, report, bus)
 
+    def _publish(self, session_id: str, report: Dict[str, Any], bus: "MessageBus") -> None:
         # Persist report
-        save_report(msg.session_id, report)
+        save_report(session_id, report)
 
-        logger.info("ReportAgent saved report for session %s", msg.session_id)
+        logger.info("ReportAgent saved report for session %s", session_id)
 
         # Notify orchestrator that report is ready
         out_msg = AgentMessage(
@@ -36,15 +57,18 @@ class ReportAgent:
             receiver="Orchestrator",
             type="REPORT_READY",
             payload={"report": report},
-            session_id=msg.session_id,
+            session_id=session_id,
         )
         bus.send(out_msg)
-        logger.info("ReportAgent sent REPORT_READY to Orchestrator for session %s", msg.session_id)
+        logger.info("ReportAgent sent REPORT_READY to Orchestrator for session %s", session_id)
 
     def _generate_report(self, summary: Dict[str, Any]) -> Dict[str, Any]:
         """
         Turn best scenario + metrics into a simple structured report.
         """
+        if summary["best_scenario"] is None:
+            return self._failure_report(summary)
+
         best = summary["best_scenario"]
         metrics = summary["metrics"]
         ranked: List[Dict[str, Any]] = summary["ranked_scenarios"]
@@ -72,11 +96,25 @@ class ReportAgent:
             actions_lines.append(line)
         actions_text = "\n".join(actions_lines)
 
+        pathway_text = self._pathway_text(sim)
+        uncertainty_text = self._uncertainty_text(sim.get("uncertainty"))
+
+        if len(ranked) < metrics["num_scenarios"]:
+            # EvaluationAgent only keeps the top K
+            ranked_heading = f"Top {len(ranked)} of {metrics['num_scenarios']} Scenarios Evaluated:"
+        else:
+            ranked_heading = "Additional Scenarios Evaluated:"
+
         body = (
             executive_summary
             + "\n\nKey Actions:\n"
             + actions_text
-            + "\n\nAdditional Scenarios Evaluated:\n"
+            + "\n\n"
+            + pathway_text
+            + uncertainty_text
+            + self._failures_text(summary)
+            + ranked_heading
+            + "\n"
         )
 
         for entry in ranked:
@@ -88,12 +126,110 @@ class ReportAgent:
                 f"cost ${ssim['total_cost_usd']:,.0f}\n"
             )
 
+        frontier = summary.get("pareto_frontier")
+        if frontier is not None:
+            body += self._frontier_text(frontier, metrics["num_scenarios"])
+
         report = {
             "title": title,
             "executive_summary": executive_summary,
             "body": body,
             "best_scenario": best,
+            "ranked_scenarios": ranked,
             "metrics": metrics,
         }
+        if frontier is not None:
+            report["pareto_frontier"] = frontier
+        if summary.get("error"):
+            report["error"] = summary["error"]
 
         return report
+
+    def _failure_report(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Report for a session where no scenario could be simulated."""
+        policy = summary["policy"] or {}
+        region = summary["region"] or {}
+        name = region.get("name", policy.get("region_id", "unknown region"))
+        metrics = summary["metrics"]
+
+        executive_summary = (
+            f"No plan could be produced for region {name}: all "
+            f"{metrics['num_failed']} scenarios failed to simulate."
+        )
+        return {
+            "title": f"Sustainability Plan for {name} (failed)",
+            "executive_summary": executive_summary,
+            "body": executive_summary + f"\n\nFirst error: {summary['error']}\n",
+            "best_scenario": {},
+            "ranked_scenarios": [],
+            "metrics": metrics,
+            "error": summary["error"],
+        }
+
+    @staticmethod
+    def _failures_text(summary: Dict[str, Any]) -> str:
+        """Scenarios that failed to simulate, if any."""
+        failed = summary["metrics"].get("num_failed", 0)
+        if not failed:
+            return ""
+        return f"Failed Scenarios: {failed} could not be simulated (first error: {summary['error']})\n\n"
+
+    @staticmethod
+    def _pathway_text(sim: Dict[str, Any]) -> str:
+        """Year-by-year emissions and spend for the best scenario, if simulated."""
+        trajectory = sim.get("trajectory")
+        if not trajectory:
+            return ""
+
+        lines = [
+            f"- Year {year}: {emissions:.2f} MtCO2, cumulative cost ${cost:,.0f}, jobs {jobs:+.1f}%"
+            for year, emissions, cost, jobs in zip(
+                trajectory["year"],
+                trajectory["emissions_mtco2"],
+                trajectory["cumulative_cost_usd"],
+                trajectory["jobs_change_percent"],
+            )
+        ]
+        return (
+            "Emissions Pathway:\n"
+            + "\n".join(lines)
+            + f"\nCumulative emissions: {sim['cumulative_emissions_mtco2']:.1f} MtCO2 "
+            f"({sim['cumulative_reduction_percent']:.1f}% below baseline)\n\n"
+        )
+
+    @staticmethod
+    def _frontier_text(frontier: List[Dict[str, Any]], num_scenarios: int) -> str:
+        """Non-dominated scenarios, best reduction first."""
+        lines = []
+        for entry in frontier:
+            sc = entry["scenario"]
+            ssim = entry["simulation"]
+            line = f"- {sc['scenario_id']}: {ssim['co2_reduction_percent']:.1f}% reduction"
+            if "cumulative_reduction_percent" in ssim:
+                line += f" ({ssim['cumulative_reduction_percent']:.1f}% cumulative)"
+            line += (
+                f", cost ${ssim['total_cost_usd']:,.0f}, "
+                f"jobs {ssim.get('estimated_jobs_change_percent', 0.0):+.1f}%, "
+                f"score {entry['score']:.2f}"
+            )
+            lines.append(line)
+        return (
+            f"\nPareto Frontier ({len(frontier)} of {num_scenarios} scenarios not dominated "
+            "on reduction, cost and jobs):\n" + "\n".join(lines) + "\n"
+        )
+
+    @staticmethod
+    def _uncertainty_text(uncertainty: Optional[Dict[str, Dict[str, float]]]) -> str:
+        """Monte Carlo p5-p95 ranges for the best scenario, if simulated."""
+        if not uncertainty:
+            return ""
+
+        reduction = uncertainty["co2_reduction_percent"]
+        cost = uncertainty["total_cost_usd"]
+        jobs = uncertainty["estimated_jobs_change_percent"]
+        return (
+            "Uncertainty (p5 / median / p95):\n"
+            f"- CO2 reduction: {reduction['p5']:.1f}% / {reduction['p50']:.1f}% / {reduction['p95']:.1f}%\n"
+            f"- Total cost: ${cost['p5']:,.0f} / ${cost['p50']:,.0f} / ${cost['p95']:,.0f}\n"
+            f"- Jobs impact: {jobs['p5']:.1f}% / {jobs['p50']:.1f}% / {jobs['p95']:.1f}%\n\n"
+        )
@@ -2,13 +2,36 @@
 # Goal: Propose multiple intervention portfolios (parallelizable).
 import logging
 import random
-from typing import Any, Dict, List
+import threading
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Set
 
+from core.config import (
+    EVAL_MODE,
+    EVAL_SCORE_BASIS,
+    EVOLUTION_GENERATIONS,
+    EVOLUTION_MAX_EVALUATIONS,
+    EVOLUTION_POPULATION,
+    EVOLUTION_TIME_BUDGET_S,
+    HILL_CLIMB_RESTARTS,
+    RESULT_CACHE,
+    SCENARIO_BATCH_SIZE,
+    SCENARIO_STRATEGY,
+    SIMULATION_MC_DRAWS,
+    SIMULATION_MC_SEED,
+    SIMULATION_TRAJECTORY,
+)
 from core.models import AgentMessage
-from tools.intervention_tool import load_interventions
+from tools.intervention_tool import InterventionCatalog, get_catalog
+from tools.scoring_tool import DEFAULT_WEIGHTS, SCORE_BASES, ScoringWeights
+from tools.search_tool import branch_and_bound, evolutionary_search, hill_climb
+from tools.simulation_tool import AccumulatorCache, ScenarioKey, canonical_actions, canonical_scenario_key
+from tools.storage_tool import load_cached_report, result_cache_key
 
 logger = logging.getLogger(__name__)
 
+STRATEGIES = ("random", "branch_and_bound", "evolutionary", "hill_climb")
+
 
 class ScenarioAgent:
     """
@@ -16,20 +39,98 @@ class ScenarioAgent:
 
     Given region context + policy, proposes a set of candidate scenarios
     (portfolios of interventions) and sends them for simulation.
+
+    With batch_size > 0, scenarios go out as SCENARIO_BATCH messages that
+    carry policy and region once plus a list of up to batch_size scenarios;
+    with 0, as one SCENARIO message per scenario.
+
+    Strategies:
+    - random: sample num_scenarios distinct random portfolios, actions in
+      canonical (sorted) order.
+    - branch_and_bound: search for the num_scenarios best-scoring portfolios
+      under the policy (tools.search_tool), scored with `weights` on
+      `score_basis` as EvaluationAgent does.
+    - evolutionary: evolve portfolios for large catalogs; after every
+      generation, portfolios that entered the top num_scenarios are sent
+      on right away, and SCENARIO_COUNT follows once the search ends. The
+      search runs one step per message: after sending new portfolios,
+      ScenarioAgent posts itself an EVOLVE_NEXT to resume, so the bus
+      dispatches what was streamed in between, even on a serial bus. The
+      time budget counts that dispatch time too.
+    - hill_climb: local search from `restarts` random portfolios, scoring
+      one-action edits with incremental simulation updates; sends the
+      num_scenarios best portfolios found. Exact accumulators of the
+      portfolios it settles on are kept in an AccumulatorCache shared by
+      all sessions.
+    The search strategies score on `score_basis`
+    (TERRAFORMER_EVAL_SCORE_BASIS by default), so they optimize the score
+    EvaluationAgent reports.
+
+    Randomness comes from a random.Random seeded with the session's seed
+    (REGION_CONTEXT "seed"), so a seeded session is reproducible. With
+    result_cache on, a seeded, reproducible request whose report is already
+    in the result cache is answered with CACHED_REPORT to ReportAgent
+    instead; otherwise the cache key rides on SCENARIO_COUNT so the report
+    is stored once it is written. The key covers policy, region, seed,
+    catalog version, the generator settings and the configured simulation
+    and scoring settings, not per-instance settings of the other agents.
     """
 
-    def __init__(self, num_scenarios: int = 3, min_actions: int = 2, max_actions: int = 4):
+    # State shared between messages (the accumulator cache, running
+    # evolutionary searches) is locked; one EVOLVE_NEXT per session is queued at a time
+    thread_safe = True
+
+    def __init__(
+        self,
+        num_scenarios: int = 3,
+        min_actions: int = 2,
+        max_actions: int = 4,
+        batch_size: int = SCENARIO_BATCH_SIZE,
+        strategy: str = SCENARIO_STRATEGY,
+        weights: Optional[ScoringWeights] = None,
+        population: int = EVOLUTION_POPULATION,
+        generations: int = EVOLUTION_GENERATIONS,
+        max_evaluations: int = EVOLUTION_MAX_EVALUATIONS,
+        time_budget_s: float = EVOLUTION_TIME_BUDGET_S,
+        restarts: int = HILL_CLIMB_RESTARTS,
+        result_cache: bool = RESULT_CACHE,
+        score_basis: str = EVAL_SCORE_BASIS,
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown scenario strategy '{strategy}'. Expected one of {STRATEGIES}")
+        if score_basis not in SCORE_BASES:
+            raise ValueError(f"Unknown score basis '{score_basis}'. Expected one of {SCORE_BASES}")
+
         self.num_scenarios = num_scenarios
         self.min_actions = min_actions
         self.max_actions = max_actions
+        self.batch_size = batch_size
+        self.strategy = strategy
+        self.weights = weights
+        self.population = population
+        self.generations = generations
+        self.max_evaluations = max_evaluations or None
+        self.time_budget_s = time_budget_s or None
+        self.restarts = restarts
+        self.result_cache = result_cache
+        self.score_basis = score_basis
+        self.accumulators = AccumulatorCache()
+
+        self._lock = threading.Lock()
+        # session_id -> running evolutionary search and what it has sent so far
+        self._searches: Dict[str, Dict[str, Any]] = {}
 
     def handle_message(self, msg: AgentMessage, bus: "MessageBus") -> None:
+        if msg.type == "EVOLVE_NEXT":
+            self._evolve_step(msg.session_id, bus)
+            return
         if msg.type != "REGION_CONTEXT":
             logger.debug("ScenarioAgent ignoring message type %s", msg.type)
             return
 
         policy: Dict[str, Any] = msg.payload["policy"]
         region: Dict[str, Any] = msg.payload["region"]
+        seed: Optional[int] = msg.payload.get("seed")
 
         logger.info(
             "ScenarioAgent generating scenarios for region %s (session %s)",
@@ -37,8 +138,25 @@ class ScenarioAgent:
             msg.session_id,
         )
 
-        interventions_catalog = load_interventions()
-        scenarios = self._generate_scenarios(policy, region, interventions_catalog)
+        interventions_catalog = get_catalog()
+        cache_key = self._cache_key(policy, region, seed, interventions_catalog)
+        if cache_key is not None:
+            report = load_cached_report(cache_key)
+            if report is not None:
+                self._send_cached_report(msg.session_id, report, bus)
+                return
+
+        rng = random.Random(seed)
+        if self.strategy == "evolutionary":
+            self._evolve_scenarios(msg.session_id, policy, region, interventions_catalog, rng, cache_key, bus)
+            return
+
+        if self.strategy == "branch_and_bound":
+            scenarios = self._optimize_scenarios(policy, region, interventions_catalog)
+        elif self.strategy == "hill_climb":
+            scenarios = self._climb_scenarios(policy, region, interventions_catalog, rng)
+        else:
+            scenarios = self._generate_scenarios(policy, region, interventions_catalog, rng)
 
         if not scenarios:
             logger.error("ScenarioAgent could not generate any scenarios (no interventions available).")
@@ -46,15 +164,85 @@ class ScenarioAgent:
             return
 
         # Inform EvaluationAgent how many scenarios to expect
+        self._send_count(msg.session_id, len(scenarios), cache_key, bus)
+        self._send_scenarios(msg.session_id, policy, region, scenarios, bus)
+
+    def _cache_key(
+        self,
+        policy: Dict[str, Any],
+        region: Dict[str, Any],
+        seed: Optional[int],
+        interventions_catalog: InterventionCatalog,
+    ) -> Optional[str]:
+        """Result cache key, or None when this request is not reproducible."""
+        if not self.result_cache or seed is None or not interventions_catalog.version:
+            return None
+        if self.strategy == "evolutionary" and self.time_budget_s:
+            # Wall-clock budgets make the search depend on machine speed
+            return None
+
+        return result_cache_key(
+            policy=policy,
+            region=region,
+            seed=seed,
+            catalog_version=interventions_catalog.version,
+            generator={
+                "strategy": self.strategy,
+                "num_scenarios": self.num_scenarios,
+                "min_actions": self.min_actions,
+                "max_actions": self.max_actions,
+                "population": self.population,
+                "generations": self.generations,
+                "max_evaluations": self.max_evaluations,
+                "restarts": self.restarts,
+                "weights": asdict(self.weights or DEFAULT_WEIGHTS),
+                "score_basis": self.score_basis,
+            },
+            simulation={
+                "mc_draws": SIMULATION_MC_DRAWS,
+                "mc_seed": SIMULATION_MC_SEED,
+                "trajectory": SIMULATION_TRAJECTORY,
+                "score_basis": EVAL_SCORE_BASIS,
+                "eval_mode": EVAL_MODE,
+            },
+        )
+
+    def _send_cached_report(self, session_id: str, report: Dict[str, Any], bus: "MessageBus") -> None:
+        out_msg = AgentMessage(
+            sender="ScenarioAgent",
+            receiver="ReportAgent",
+            type="CACHED_REPORT",
+            payload={"report": report},
+            session_id=session_id,
+        )
+        bus.send(out_msg)
+        logger.info("ScenarioAgent answered session %s from the result cache", session_id)
+
+    def _send_count(self, session_id: str, count: int, cache_key: Optional[str], bus: "MessageBus") -> None:
+        payload: Dict[str, Any] = {"count": count}
+        if cache_key is not None:
+            payload["cache_key"] = cache_key
         count_msg = AgentMessage(
             sender="ScenarioAgent",
             receiver="EvaluationAgent",
             type="SCENARIO_COUNT",
-            payload={"count": len(scenarios)},
-            session_id=msg.session_id,
+            payload=payload,
+            session_id=session_id,
         )
         bus.send(count_msg)
 
+    def _send_scenarios(
+        self,
+        session_id: str,
+        policy: Dict[str, Any],
+        region: Dict[str, Any],
+        scenarios: List[Dict[str, Any]],
+        bus: "MessageBus",
+    ) -> None:
+        if self.batch_size > 0:
+            self._send_batches(session_id, policy, region, scenarios, bus)
+            return
+
         for scenario in scenarios:
             out_payload = {
                 "policy": policy,
@@ -67,26 +255,28 @@ class ScenarioAgent:
                 receiver="SimulationAgent",
                 type="SCENARIO",
                 payload=out_payload,
-                session_id=msg.session_id,
+                session_id=session_id,
             )
             bus.send(out_msg)
             logger.info(
                 "ScenarioAgent sent SCENARIO %s to SimulationAgent (session %s)",
                 scenario["scenario_id"],
-                msg.session_id,
+                session_id,
             )
 
     def _generate_scenarios(
         self,
         policy: Dict[str, Any],
         region: Dict[str, Any],
-        interventions_catalog: Dict[str, Dict[str, Any]],
+        interventions_catalog: InterventionCatalog,
+        rng: random.Random,
     ) -> List[Dict[str, Any]]:
         """
-        Simple scenario generator: randomly sample intervention combinations.
+        Simple scenario generator: randomly sample intervention combinations,
+        skipping portfolios already generated (in any action order).
         """
-        all_ids = list(interventions_catalog.keys())
-        random.shuffle(all_ids)
+        all_ids = list(interventions_catalog.ids)
+        rng.shuffle(all_ids)
 
         if not all_ids:
             logger.error("No interventions available to generate scenarios.")
@@ -97,21 +287,207 @@ class ScenarioAgent:
         min_actions = min(self.min_actions, max_actions_available)
 
         scenarios: List[Dict[str, Any]] = []
-        for i in range(self.num_scenarios):
-            num_actions = random.randint(min_actions, max_actions_available)
-            chosen_ids = random.sample(all_ids, num_actions)
+        seen: Set[ScenarioKey] = set()
+        # Small catalogs may have fewer distinct portfolios than requested
+        attempts = self.num_scenarios * 10
+        while len(scenarios) < self.num_scenarios and attempts > 0:
+            attempts -= 1
+            num_actions = rng.randint(min_actions, max_actions_available)
+            chosen_ids = rng.sample(all_ids, num_actions)
 
             actions = []
             for iv_id in chosen_ids:
-                scale = random.choice(["low", "medium", "high"])
+                scale = rng.choice(["low", "medium", "high"])
                 actions.append({"id": iv_id, "scale": scale})
 
+            actions = canonical_actions(actions)
+            key = canonical_scenario_key({"actions": actions})
+            if key in seen:
+                continue
+            seen.add(key)
+
             scenario = {
-                "scenario_id": f"S{i+1}",
+                "scenario_id": f"S{len(scenarios)+1}",
                 "actions": actions,
             }
             scenarios.append(scenario)
 
+        if len(scenarios) < self.num_scenarios:
+            logger.warning(
+                "ScenarioAgent found only %d distinct scenarios (requested %d)",
+                len(scenarios),
+                self.num_scenarios,
+            )
+
         logger.debug("ScenarioAgent generated scenarios: %s", scenarios)
         return scenarios
 
+    def _optimize_scenarios(
+        self,
+        policy: Dict[str, Any],
+        region: Dict[str, Any],
+        interventions_catalog: InterventionCatalog,
+    ) -> List[Dict[str, Any]]:
+        """
+        Branch-and-bound search for the best-scoring portfolios, best first.
+        """
+        ranked = branch_and_bound(
+            region,
+            policy,
+            interventions_catalog,
+            top_n=self.num_scenarios,
+            min_actions=self.min_actions,
+            max_actions=self.max_actions,
+            weights=self.weights,
+            basis=self.score_basis,
+        )
+
+        scenarios = [
+            {"scenario_id": f"S{i+1}", "actions": actions}
+            for i, (_, actions) in enumerate(ranked)
+        ]
+        logger.debug("ScenarioAgent optimized scenarios: %s", scenarios)
+        return scenarios
+
+    def _climb_scenarios(
+        self,
+        policy: Dict[str, Any],
+        region: Dict[str, Any],
+        interventions_catalog: InterventionCatalog,
+        rng: random.Random,
+    ) -> List[Dict[str, Any]]:
+        """
+        Hill-climbing search for high-scoring portfolios, best first.
+        """
+        ranked = hill_climb(
+            region,
+            policy,
+            interventions_catalog,
+            top_n=self.num_scenarios,
+            min_actions=self.min_actions,
+            max_actions=self.max_actions,
+            restarts=self.restarts,
+            weights=self.weights,
+            rng=rng,
+            accumulators=self.accumulators,
+            basis=self.score_basis,
+        )
+
+        scenarios = [
+            {"scenario_id": f"S{i+1}", "actions": actions}
+            for i, (_, actions) in enumerate(ranked)
+        ]
+        logger.debug("ScenarioAgent hill-climbed scenarios: %s", scenarios)
+        return scenarios
+
+    def _evolve_scenarios(
+        self,
+        session_id: str,
+        policy: Dict[str, Any],
+        region: Dict[str, Any],
+        interventions_catalog: InterventionCatalog,
+        rng: random.Random,
+        cache_key: Optional[str],
+        bus: "MessageBus",
+    ) -> None:
+        """
+        Start the evolutionary search for a session and run its first step.
+        """
+        search = evolutionary_search(
+            region,
+            policy,
+            interventions_catalog,
+            top_n=self.num_scenarios,
+            min_actions=self.min_actions,
+            max_actions=self.max_actions,
+            population=self.population,
+            generations=self.generations,
+            max_evaluations=self.max_evaluations,
+            time_budget=self.time_budget_s,
+            weights=self.weights,
+            rng=rng,
+            basis=self.score_basis,
+        )
+        with self._lock:
+            self._searches[session_id] = {
+                "search": search,
+                "policy": policy,
+                "region": region,
+                "cache_key": cache_key,
+                "sent": 0,
+            }
+        self._evolve_step(session_id, bus)
+
+    def _evolve_step(self, session_id: str, bus: "MessageBus") -> None:
+        """
+        Advance a session's search to its next improvement and stream the
+        new top portfolios to SimulationAgent, then post EVOLVE_NEXT; once
+        the search ends, send SCENARIO_COUNT instead.
+        """
+        with self._lock:
+            state = self._searches.get(session_id)
+        if state is None:
+            logger.warning("ScenarioAgent has no evolutionary search running for session %s", session_id)
+            return
+
+        try:
+            improved = next(state["search"], None)
+        except Exception:
+            with self._lock:
+                self._searches.pop(session_id, None)
+            raise
+
+        if improved is None:
+            with self._lock:
+                self._searches.pop(session_id, None)
+            sent = state["sent"]
+            if not sent:
+                logger.error("ScenarioAgent could not generate any scenarios (no interventions available).")
+                return
+            logger.info("ScenarioAgent evolutionary search sent %d scenarios (session %s)", sent, session_id)
+            self._send_count(session_id, sent, state["cache_key"], bus)
+            return
+
+        scenarios = [
+            {"scenario_id": f"S{state['sent'] + i + 1}", "actions": actions}
+            for i, (_, actions) in enumerate(improved)
+        ]
+        state["sent"] += len(scenarios)
+        self._send_scenarios(session_id, state["policy"], state["region"], scenarios, bus)
+
+        next_msg = AgentMessage(
+            sender="ScenarioAgent",
+            receiver="ScenarioAgent",
+            type="EVOLVE_NEXT",
+            payload={},
+            session_id=session_id,
+        )
+        bus.send(next_msg)
+
+    def _send_batches(
+        self,
+        session_id: str,
+        policy: Dict[str, Any],
+        region: Dict[str, Any],
+        scenarios: List[Dict[str, Any]],
+        bus: "MessageBus",
+    ) -> None:
+        for start in range(0, len(scenarios), self.batch_size):
+            batch = scenarios[start : start + self.batch_size]
+            out_msg = AgentMessage(
+                sender="ScenarioAgent",
+                receiver="SimulationAgent",
+                type="SCENARIO_BATCH",
+                payload={
+                    "policy": policy,
+                    "region": region,
+                    "scenarios": batch,
+                },
+                session_id=session_id,
+            )
+            bus.send(out_msg)
+            logger.info(
+                "ScenarioAgent sent SCENARIO_BATCH of %d scenarios to SimulationAgent (session %s)",
+                len(batch),
+                session_id,
+            )
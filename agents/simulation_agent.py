@@ -1,14 +1,75 @@
 # Runs code-based environmental simulations
 # Goal: Numerically simulate impact of each scenario.
 import logging
-from typing import Any, Dict
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
 
+from core.config import (
+    SIMULATION_BACKEND,
+    SIMULATION_CACHE_SIZE,
+    SIMULATION_CHUNK_SIZE,
+    SIMULATION_MC_DRAWS,
+    SIMULATION_MC_SEED,
+    SIMULATION_TRAJECTORY,
+    SIMULATION_WORKERS,
+)
 from core.models import AgentMessage
-from tools.intervention_tool import load_interventions
-from tools.simulation_tool import simulate_scenario
+from tools.intervention_tool import InterventionCatalog, get_catalog
+from tools.simulation_tool import (
+    SimulationCache,
+    simulate_batch,
+    simulate_monte_carlo,
+    simulate_scenario,
+    simulate_trajectory,
+    unpack_batch,
+    unpack_monte_carlo,
+    unpack_trajectory,
+)
 
 logger = logging.getLogger(__name__)
 
+BACKENDS = ("inline", "thread", "process")
+
+# Catalog installed once per worker process by _init_worker
+_WORKER_CATALOG: Optional[InterventionCatalog] = None
+
+
+def _init_worker(interventions_catalog: InterventionCatalog) -> None:
+    """Process pool initializer: keep the catalog so tasks don't re-ship it."""
+    global _WORKER_CATALOG
+    _WORKER_CATALOG = interventions_catalog
+
+
+def _simulate_chunk(
+    region: Dict[str, Any],
+    scenarios: List[Dict[str, Any]],
+    interventions_catalog: Optional[InterventionCatalog] = None,
+    mc_draws: int = 0,
+    mc_seed: int = 0,
+    years: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Simulate a chunk of scenarios for one region (runs on a pool worker).
+    With mc_draws > 0, each result also gets an "uncertainty" entry; with
+    years > 0, a "trajectory" plus cumulative emissions and reduction.
+    """
+    if interventions_catalog is None:
+        interventions_catalog = _WORKER_CATALOG
+    if not scenarios:
+        return []
+    sim_results = unpack_batch(simulate_batch(region, scenarios, interventions_catalog))
+    if mc_draws > 0:
+        mc = simulate_monte_carlo(region, scenarios, interventions_catalog, draws=mc_draws, seed=mc_seed)
+        for sim_result, uncertainty in zip(sim_results, unpack_monte_carlo(mc)):
+            sim_result["uncertainty"] = uncertainty
+    if years > 0:
+        trajectory = simulate_trajectory(region, scenarios, interventions_catalog, years)
+        for sim_result, pathway in zip(sim_results, unpack_trajectory(trajectory)):
+            sim_result.update(pathway)
+    return sim_results
+
 
 class SimulationAgent:
     """
@@ -16,13 +77,76 @@ class SimulationAgent:
 
     Receives SCENARIO messages and performs numerical simulation to
     estimate emissions, cost, and job impact. Sends results to EvaluationAgent.
+    SCENARIO_BATCH messages are simulated in one vectorized pass and
+    answered with a single SIM_RESULT_BATCH.
+
+    Backends:
+    - inline: simulate on the thread dispatching the message.
+    - thread / process: buffer scenarios per session, submit them to a pool
+      in chunks of `chunk_size`, and post SIM_RESULT messages back to the bus
+      as each chunk completes. Each SCENARIO_BATCH is submitted as its own
+      chunk. The process pool receives the catalog once per
+      worker through its initializer, and is restarted if the catalog changes.
+
+    With cache_size > 0, results are memoized in a SimulationCache (see
+    tools.simulation_tool); only misses are simulated or sent to the pool,
+    and `cache.stats()` reports hits and misses.
+
+    With mc_draws > 0, every result also carries "uncertainty": p5/p50/p95
+    of emissions, reduction, cost and jobs from a Monte Carlo run over the
+    catalog's uncertainty bounds (tools.simulation_tool). Scores still use
+    the point estimates.
+
+    With trajectory on, every result also carries a year-by-year
+    "trajectory" over the policy's time_horizon_years, plus
+    cumulative_emissions_mtco2 and cumulative_reduction_percent.
+
+    Scenarios that fail to simulate (or whose results can't be cached or
+    sent) are reported to EvaluationAgent in a SIM_ERROR message, so the
+    session still finishes with a report instead of waiting for results
+    that will never arrive.
     """
 
-    def __init__(self):
-        # Preload interventions catalog to avoid re-reading file
-        self.interventions_catalog = load_interventions()
+    # The catalog is read-only once loaded; pool state is guarded by a lock
+    thread_safe = True
+
+    def __init__(
+        self,
+        backend: str = SIMULATION_BACKEND,
+        max_workers: int = SIMULATION_WORKERS,
+        chunk_size: int = SIMULATION_CHUNK_SIZE,
+        cache_size: int = SIMULATION_CACHE_SIZE,
+        mc_draws: int = SIMULATION_MC_DRAWS,
+        mc_seed: int = SIMULATION_MC_SEED,
+        trajectory: bool = SIMULATION_TRAJECTORY,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown simulation backend '{backend}'. Expected one of {BACKENDS}")
+
+        self.backend = backend
+        self.max_workers = max_workers or None
+        self.chunk_size = max(1, chunk_size)
+        self.cache: Optional[SimulationCache] = SimulationCache(cache_size) if cache_size > 0 else None
+        self.mc_draws = max(0, mc_draws)
+        self.mc_seed = mc_seed
+        self.trajectory = trajectory
+
+        self._lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+        # Catalog version the process pool workers were initialized with
+        self._executor_version: Optional[str] = None
+        # session_id -> {"policy", "region", "scenarios"} waiting to be submitted
+        self._buffers: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def interventions_catalog(self) -> InterventionCatalog:
+        """Shared compiled catalog; cheap to call, reloads only if the CSV changed."""
+        return get_catalog()
 
     def handle_message(self, msg: AgentMessage, bus: "MessageBus") -> None:
+        if msg.type == "SCENARIO_BATCH":
+            self._handle_batch(msg, bus)
+            return
         if msg.type != "SCENARIO":
             logger.debug("SimulationAgent ignoring message type %s", msg.type)
             return
@@ -32,6 +156,11 @@ class SimulationAgent:
         scenario: Dict[str, Any] = msg.payload["scenario"]
 
         scenario_id = scenario["scenario_id"]
+
+        if self.backend != "inline":
+            self._buffer_scenario(msg.session_id, policy, region, scenario, bus)
+            return
+
         logger.info(
             "SimulationAgent simulating %s for region %s (session %s)",
             scenario_id,
@@ -39,8 +168,267 @@ class SimulationAgent:
             msg.session_id,
         )
 
-        sim_result = simulate_scenario(region, scenario, self.interventions_catalog)
+        years = self._years(policy)
+
+        def simulate() -> List[Dict[str, Any]]:
+            if self.cache is None and not self.mc_draws and not years:
+                return [simulate_scenario(region, scenario, self.interventions_catalog)]
+            return self._simulate(region, [scenario], self.interventions_catalog, years)
+
+        self._deliver(bus, msg.session_id, policy, region, [scenario], simulate, batched=False)
+
+    def _handle_batch(self, msg: AgentMessage, bus: "MessageBus") -> None:
+        policy: Dict[str, Any] = msg.payload["policy"]
+        region: Dict[str, Any] = msg.payload["region"]
+        scenarios: List[Dict[str, Any]] = msg.payload["scenarios"]
+
+        if self.backend != "inline":
+            batch = {"policy": policy, "region": region, "scenarios": scenarios}
+            self._submit_chunk(msg.session_id, batch, bus, batched=True)
+            return
+
+        logger.info(
+            "SimulationAgent simulating batch of %d scenarios for region %s (session %s)",
+            len(scenarios),
+            policy["region_id"],
+            msg.session_id,
+        )
+
+        years = self._years(policy)
+        self._deliver(
+            bus,
+            msg.session_id,
+            policy,
+            region,
+            scenarios,
+            lambda: self._simulate(region, scenarios, self.interventions_catalog, years),
+            batched=True,
+        )
+
+    def _simulate(
+        self,
+        region: Dict[str, Any],
+        scenarios: List[Dict[str, Any]],
+        interventions_catalog: InterventionCatalog,
+        years: int,
+    ) -> List[Dict[str, Any]]:
+        """Simulate on the calling thread, through the cache if there is one."""
+        simulate = partial(_simulate_chunk, mc_draws=self.mc_draws, mc_seed=self.mc_seed, years=years)
+        if self.cache is not None:
+            return self.cache.simulate(region, scenarios, interventions_catalog, simulate, context=(years,))
+        return simulate(region, scenarios, interventions_catalog)
+
+    def _years(self, policy: Dict[str, Any]) -> int:
+        """Trajectory horizon for a policy, 0 when trajectories are off."""
+        if not self.trajectory:
+            return 0
+        return max(1, int(policy.get("time_horizon_years", 1)))
+
+    def flush(self, session_id: Optional[str], bus: "MessageBus") -> bool:
+        """
+        Submit partially filled chunks (called by the bus when a session goes
+        idle). Returns True if anything was submitted.
+        """
+        with self._lock:
+            if session_id is None:
+                buffers = list(self._buffers.items())
+                self._buffers.clear()
+            elif session_id in self._buffers:
+                buffers = [(session_id, self._buffers.pop(session_id))]
+            else:
+                return False
+
+        for sid, buffered in buffers:
+            self._submit_chunk(sid, buffered, bus)
+        return bool(buffers)
+
+    def close(self) -> None:
+        """Shut down the worker pool, if one was started."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _buffer_scenario(
+        self,
+        session_id: str,
+        policy: Dict[str, Any],
+        region: Dict[str, Any],
+        scenario: Dict[str, Any],
+        bus: "MessageBus",
+    ) -> None:
+        with self._lock:
+            buffered = self._buffers.setdefault(
+                session_id, {"policy": policy, "region": region, "scenarios": []}
+            )
+            buffered["scenarios"].append(scenario)
+            if len(buffered["scenarios"]) < self.chunk_size:
+                return
+            del self._buffers[session_id]
+
+        self._submit_chunk(session_id, buffered, bus)
+
+    def _get_executor(self, interventions_catalog: InterventionCatalog) -> Executor:
+        with self._lock:
+            if (
+                self._executor is not None
+                and self.backend == "process"
+                and self._executor_version != interventions_catalog.version
+            ):
+                # Workers hold a stale catalog; let running chunks finish on the old pool
+                logger.info("SimulationAgent restarting process pool for updated catalog")
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+            if self._executor is None:
+                if self.backend == "process":
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        initializer=_init_worker,
+                        initargs=(interventions_catalog,),
+                    )
+                    self._executor_version = interventions_catalog.version
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="SimulationAgent",
+                    )
+            return self._executor
+
+    def _submit_chunk(
+        self,
+        session_id: str,
+        buffered: Dict[str, Any],
+        bus: "MessageBus",
+        batched: bool = False,
+    ) -> None:
+        policy = buffered["policy"]
+        region = buffered["region"]
+        scenarios = buffered["scenarios"]
+
+        logger.info(
+            "SimulationAgent submitting %d scenarios for region %s to %s pool (session %s)",
+            len(scenarios),
+            policy["region_id"],
+            self.backend,
+            session_id,
+        )
+
+        interventions_catalog = self.interventions_catalog
+        years = self._years(policy)
+        if self.cache is not None:
+            results, misses, positions = self.cache.lookup(region, scenarios, interventions_catalog, (years,))
+            if not misses:
+                self._deliver(bus, session_id, policy, region, scenarios, lambda: results, batched)
+                return
+        else:
+            results, misses, positions = [], scenarios, []
+
+        executor = self._get_executor(interventions_catalog)
+        bus.hold(session_id)
+        try:
+            if self.backend == "process":
+                future = executor.submit(
+                    _simulate_chunk, region, misses, None, self.mc_draws, self.mc_seed, years
+                )
+            else:
+                future = executor.submit(
+                    _simulate_chunk, region, misses, interventions_catalog, self.mc_draws, self.mc_seed, years
+                )
+        except Exception:
+            bus.release(session_id)
+            raise
+
+        def _collect(done: Future) -> List[Dict[str, Any]]:
+            sim_results = done.result()
+            if self.cache is not None:
+                sim_results = self.cache.store(
+                    region, interventions_catalog, results, misses, positions, sim_results, (years,)
+                )
+            return sim_results
+
+        def _on_done(done: Future) -> None:
+            try:
+                self._deliver(bus, session_id, policy, region, scenarios, partial(_collect, done), batched)
+            finally:
+                bus.release(session_id)
+
+        future.add_done_callback(_on_done)
+
+    def _deliver(
+        self,
+        bus: "MessageBus",
+        session_id: str,
+        policy: Dict[str, Any],
+        region: Dict[str, Any],
+        scenarios: List[Dict[str, Any]],
+        simulate: Callable[[], List[Dict[str, Any]]],
+        batched: bool,
+    ) -> None:
+        """
+        Run `simulate` and send its results, as one SIM_RESULT_BATCH or one
+        SIM_RESULT per scenario. If anything fails, the scenarios not yet
+        sent go to EvaluationAgent as a SIM_ERROR instead.
+        """
+        unsent = scenarios
+        try:
+            sim_results = simulate()
+            if batched:
+                self._send_batch_result(bus, session_id, policy, region, scenarios, sim_results)
+            else:
+                for i, (scenario, sim_result) in enumerate(zip(scenarios, sim_results)):
+                    self._send_result(bus, session_id, policy, region, scenario, sim_result)
+                    unsent = scenarios[i + 1 :]
+            return
+        except Exception as e:  # noqa: BLE001
+            logger.exception(
+                "SimulationAgent failed to simulate %d scenarios (session %s): %s",
+                len(unsent),
+                session_id,
+                e,
+            )
+            error = f"{type(e).__name__}: {e}"
+        self._send_error(bus, session_id, policy, region, unsent, error)
+
+    def _send_error(
+        self,
+        bus: "MessageBus",
+        session_id: str,
+        policy: Dict[str, Any],
+        region: Dict[str, Any],
+        scenarios: List[Dict[str, Any]],
+        error: str,
+    ) -> None:
+        if not scenarios:
+            return
+        out_msg = AgentMessage(
+            sender="SimulationAgent",
+            receiver="EvaluationAgent",
+            type="SIM_ERROR",
+            payload={
+                "policy": policy,
+                "region": region,
+                "scenario_ids": [scenario["scenario_id"] for scenario in scenarios],
+                "error": error,
+            },
+            session_id=session_id,
+        )
+        bus.send(out_msg)
+        logger.info(
+            "SimulationAgent sent SIM_ERROR for %d scenarios to EvaluationAgent (session %s)",
+            len(scenarios),
+            session_id,
+        )
 
+    def _send_result(
+        self,
+        bus: "MessageBus",
+        session_id: str,
+        policy: Dict[str, Any],
+        region: Dict[str, Any],
+        scenario: Dict[str, Any],
+        sim_result: Dict[str, Any],
+    ) -> None:
         out_payload = {
             "policy": policy,
             "region": region,
@@ -53,11 +441,39 @@ class SimulationAgent:
             receiver="EvaluationAgent",
             type="SIM_RESULT",
             payload=out_payload,
-            session_id=msg.session_id,
+            session_id=session_id,
         )
         bus.send(out_msg)
         logger.info(
             "SimulationAgent sent SIM_RESULT for %s to EvaluationAgent (session %s)",
-            scenario_id,
-            msg.session_id,
+            scenario["scenario_id"],
+            session_id,
+        )
+
+    def _send_batch_result(
+        self,
+        bus: "MessageBus",
+        session_id: str,
+        policy: Dict[str, Any],
+        region: Dict[str, Any],
+        scenarios: List[Dict[str, Any]],
+        sim_results: List[Dict[str, Any]],
+    ) -> None:
+        out_msg = AgentMessage(
+            sender="SimulationAgent",
+            receiver="EvaluationAgent",
+            type="SIM_RESULT_BATCH",
+            payload={
+                "policy": policy,
+                "region": region,
+                "scenarios": scenarios,
+                "simulations": sim_results,
+            },
+            session_id=session_id,
+        )
+        bus.send(out_msg)
+        logger.info(
+            "SimulationAgent sent SIM_RESULT_BATCH of %d results to EvaluationAgent (session %s)",
+            len(scenarios),
+            session_id,
         )
@@ -0,0 +1,211 @@
+# Long-lived agent pipeline shared by CLI, eval and UI
+"""
+core.agent_system
+
+AgentSystem: a MessageBus with all agents registered, built once per
+process and reused for every session. Sessions are isolated by session_id
+on the shared bus, so many of them can run concurrently.
+
+With TERRAFORMER_BUS=async the agents run on an AsyncMessageBus instead,
+driven by an event loop on a background thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import logging
+import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Union
+
+from core.async_message_bus import AsyncMessageBus
+from core.config import (
+    AGENT_SYSTEM_BUS,
+    AGENT_SYSTEM_MAX_SESSIONS,
+    BUS_BACKPRESSURE,
+    BUS_HIGH_WATER_MARK,
+    BUS_MAX_WORKERS,
+    BUS_SCHEDULER,
+    DEFAULT_REGION_ID,
+    SCENARIO_SEED,
+)
+from core.message_bus import MessageBus
+from core.models import AgentMessage
+from core.scheduler import make_scheduler
+from core.session_manager import start_session, update_session_status
+
+from agents.orchestrator import Orchestrator
+from agents.policy_agent import PolicyAgent
+from agents.data_agent import DataAgent
+from agents.scenario_agent import ScenarioAgent
+from agents.simulation_agent import SimulationAgent
+from agents.evaluation_agent import EvaluationAgent
+from agents.report_agent import ReportAgent
+
+logger = logging.getLogger(__name__)
+
+BUS_KINDS = ("sync", "async")
+
+
+class AgentSystem:
+    """
+    AgentSystem
+
+    Owns one MessageBus with the full agent pipeline registered.
+    - run_session(goal, region) runs one session on the calling thread.
+    - submit(goal, region) runs it on a worker thread and returns a Future
+      resolving to the session_id once the report is saved.
+
+    Every session gets an RNG seed (the `seed` argument, else
+    TERRAFORMER_SEED, else a fresh random one), recorded in its
+    metadata; re-running with the same goal, region and seed reproduces
+    the report, or returns it from the result cache.
+
+    bus="async" registers the agents on an AsyncMessageBus run by an
+    event loop on a background thread; run_session() waits for the
+    session there. The MessageBus settings (workers, high-water mark,
+    scheduler) don't apply to it.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = AGENT_SYSTEM_MAX_SESSIONS,
+        bus_workers: int = BUS_MAX_WORKERS,
+        high_water_mark: int = BUS_HIGH_WATER_MARK,
+        scheduler: str = BUS_SCHEDULER,
+        bus: str = AGENT_SYSTEM_BUS,
+    ) -> None:
+        if bus not in BUS_KINDS:
+            raise ValueError(f"Unknown bus '{bus}'. Expected one of {BUS_KINDS}")
+
+        self.bus: Union[MessageBus, AsyncMessageBus]
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        if bus == "async":
+            self.bus = AsyncMessageBus()
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(
+                target=self._loop.run_forever, name="AgentSystem-loop", daemon=True
+            )
+            self._loop_thread.start()
+        else:
+            self.bus = MessageBus(
+                max_workers=bus_workers,
+                high_water_marks={"*": high_water_mark} if high_water_mark > 0 else None,
+                backpressure=BUS_BACKPRESSURE,
+                scheduler=make_scheduler(scheduler),
+            )
+        self._register_agents()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_sessions),
+            thread_name_prefix="AgentSystem",
+        )
+
+    def _register_agents(self) -> None:
+        self.bus.register_agent("Orchestrator", Orchestrator())
+        self.bus.register_agent("PolicyAgent", PolicyAgent(default_region_id=DEFAULT_REGION_ID))
+        self.bus.register_agent("DataAgent", DataAgent())
+        self.bus.register_agent("ScenarioAgent", ScenarioAgent())
+        self.bus.register_agent("SimulationAgent", SimulationAgent())
+        self.bus.register_agent("EvaluationAgent", EvaluationAgent())
+        self.bus.register_agent("ReportAgent", ReportAgent())
+
+    def run_session(
+        self,
+        goal_text: str,
+        region_id: Optional[str] = None,
+        sender: str = "User",
+        seed: Optional[int] = None,
+    ) -> str:
+        """
+        Create a session, run the agent pipeline to completion, and return
+        the session_id.
+        """
+        if region_id is None:
+            region_id = DEFAULT_REGION_ID
+        if seed is None:
+            seed = int(SCENARIO_SEED) if SCENARIO_SEED else random.SystemRandom().randrange(2**32)
+
+        state = start_session(goal_text, region_id, metadata={"seed": seed})
+        session_id = state.session_id
+
+        update_session_status(session_id, "running")
+
+        # Kick off the process with a START message to Orchestrator
+        start_msg = AgentMessage(
+            sender=sender,
+            receiver="Orchestrator",
+            type="START",
+            payload={
+                "goal_text": goal_text,
+                "region_id": region_id,
+                "seed": seed,
+            },
+            session_id=session_id,
+        )
+
+        try:
+            if self._loop is not None:
+                asyncio.run_coroutine_threadsafe(self._run_async(start_msg), self._loop).result()
+            else:
+                self.bus.send(start_msg)
+                # Only this session's messages; other sessions keep running elsewhere
+                self.bus.run(session_id=session_id)
+        except Exception:
+            update_session_status(session_id, "error")
+            raise
+
+        update_session_status(session_id, "completed")
+
+        logger.info("Session %s completed", session_id)
+        return session_id
+
+    async def _run_async(self, start_msg: AgentMessage) -> None:
+        # On the loop thread, so the bus binds to this loop
+        self.bus.send(start_msg)
+        await self.bus.run_session(start_msg.session_id)  # type: ignore[union-attr]
+
+    def submit(
+        self,
+        goal_text: str,
+        region_id: Optional[str] = None,
+        sender: str = "User",
+        seed: Optional[int] = None,
+    ) -> "Future[str]":
+        """Run a session in the background; the Future resolves to its session_id."""
+        return self._executor.submit(self.run_session, goal_text, region_id, sender, seed)
+
+    def close(self) -> None:
+        """Wait for submitted sessions, then shut down the bus and agent pools."""
+        self._executor.shutdown(wait=True)
+        self.bus.close()
+        if self._loop is not None:
+            # Sync handlers ran on the loop's default executor
+            asyncio.run_coroutine_threadsafe(self._loop.shutdown_default_executor(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()  # type: ignore[union-attr]
+            self._loop.close()
+            self._loop = None
+
+    def __enter__(self) -> "AgentSystem":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+_SYSTEM: Optional[AgentSystem] = None
+_SYSTEM_LOCK = threading.Lock()
+
+
+def get_agent_system() -> AgentSystem:
+    """Return the process-wide AgentSystem, building it on first use."""
+    global _SYSTEM
+    with _SYSTEM_LOCK:
+        if _SYSTEM is None:
+            _SYSTEM = AgentSystem()
+            atexit.register(_SYSTEM.close)
+            logger.info("Built process-wide AgentSystem")
+        return _SYSTEM
@@ -0,0 +1,258 @@
+# asyncio-native A2A message passing + routing
+"""
+core.async_message_bus
+
+AsyncMessageBus: an asyncio counterpart of MessageBus for embedding the
+agent pipeline in async applications (web servers, LLM-backed agents).
+
+Agents may implement either `def handle_message(msg, bus)` or
+`async def handle_message(msg, bus)`. Coroutine handlers are awaited on the
+event loop; plain handlers run in an executor so they never block it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Executor
+from typing import Deque, Dict, Optional, Set, Tuple
+
+from core.config import ASYNC_BUS_AGENT_CONCURRENCY
+from core.models import AgentMessage
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMessageBus:
+    """
+    AsyncMessageBus
+
+    - register_agent(name, instance, max_concurrency=None)
+    - send(message): callable from the event loop or from any thread
+    - await run_session(session_id): dispatch until that session is finished,
+      while other sessions proceed concurrently on the same loop.
+
+    Concurrency per agent is bounded by a semaphore: `max_concurrency` if
+    given (or declared on the agent), otherwise ASYNC_BUS_AGENT_CONCURRENCY
+    for agents declaring `thread_safe = True` and 1 for the rest. Agents
+    declaring `session_ordered = True` handle one message per session at a
+    time, in FIFO order. hold()/release() and flush() follow MessageBus.
+    """
+
+    def __init__(self, executor: Optional[Executor] = None) -> None:
+        self.agents: Dict[str, object] = {}
+        # None = the event loop's default executor
+        self.executor = executor
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._session_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        # session_id -> FIFO of pending messages
+        self._queues: Dict[str, Deque[AgentMessage]] = {}
+        # session_id -> dispatched-but-unfinished messages plus held work
+        self._inflight: Dict[str, int] = {}
+        # session_id -> wakes run_session when messages arrive or work finishes
+        self._events: Dict[str, asyncio.Event] = {}
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    # --- Agent registration ---
+
+    def register_agent(self, name: str, agent: object, max_concurrency: Optional[int] = None) -> None:
+        """
+        Register an agent with a unique name.
+        The agent must implement `handle_message(self, msg, bus)` (sync or async).
+        """
+        if name in self.agents:
+            logger.warning("Overwriting existing agent registration: %s", name)
+
+        if max_concurrency is None:
+            max_concurrency = getattr(agent, "max_concurrency", None)
+        if max_concurrency is None:
+            max_concurrency = ASYNC_BUS_AGENT_CONCURRENCY if getattr(agent, "thread_safe", False) else 1
+
+        self.agents[name] = agent
+        self._semaphores[name] = asyncio.Semaphore(max(1, max_concurrency))
+        logger.info("Registered agent: %s (max_concurrency=%d)", name, max_concurrency)
+
+    # --- Message queue operations ---
+
+    def _on_loop_thread(self) -> bool:
+        return self._loop is None or threading.get_ident() == self._loop_thread
+
+    def send(self, msg: AgentMessage) -> None:
+        """Enqueue a message; safe to call from sync handlers on executor threads."""
+        logger.debug(
+            "Enqueued message %s from %s to %s (session %s)",
+            msg.type,
+            msg.sender,
+            msg.receiver,
+            msg.session_id,
+        )
+        if self._on_loop_thread():
+            self._enqueue(msg)
+        else:
+            self._loop.call_soon_threadsafe(self._enqueue, msg)  # type: ignore[union-attr]
+
+    def hold(self, session_id: str) -> None:
+        """Mark work for a session as in flight outside the bus."""
+        if self._on_loop_thread():
+            self._adjust_inflight(session_id, 1)
+        else:
+            self._loop.call_soon_threadsafe(self._adjust_inflight, session_id, 1)  # type: ignore[union-attr]
+
+    def release(self, session_id: str) -> None:
+        """Finish work registered with hold(); send its results first."""
+        if self._on_loop_thread():
+            self._adjust_inflight(session_id, -1)
+        else:
+            self._loop.call_soon_threadsafe(self._adjust_inflight, session_id, -1)  # type: ignore[union-attr]
+
+    def pending(self, session_id: Optional[str] = None) -> int:
+        """Number of queued (not yet dispatched) messages."""
+        if session_id is None:
+            return sum(len(q) for q in self._queues.values())
+        queue = self._queues.get(session_id)
+        return len(queue) if queue is not None else 0
+
+    def _enqueue(self, msg: AgentMessage) -> None:
+        queue = self._queues.get(msg.session_id)
+        if queue is None:
+            queue = self._queues[msg.session_id] = deque()
+        queue.append(msg)
+        self._wake(msg.session_id)
+
+    def _adjust_inflight(self, session_id: str, delta: int) -> None:
+        remaining = self._inflight.get(session_id, 0) + delta
+        if remaining:
+            self._inflight[session_id] = remaining
+        else:
+            self._inflight.pop(session_id, None)
+        self._wake(session_id)
+
+    def _wake(self, session_id: str) -> None:
+        event = self._events.get(session_id)
+        if event is not None:
+            event.set()
+
+    # --- Dispatch ---
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if self._loop is None:
+            self._loop = loop
+            self._loop_thread = threading.get_ident()
+        elif self._loop is not loop:
+            raise RuntimeError("AsyncMessageBus is bound to a different event loop")
+        return loop
+
+    async def run_session(self, session_id: str) -> None:
+        """
+        Dispatch this session's messages until its queue is empty, nothing is
+        in flight, and no agent has buffered work left to flush.
+        """
+        loop = self._bind_loop()
+        event = self._events.setdefault(session_id, asyncio.Event())
+
+        try:
+            while True:
+                queue = self._queues.get(session_id)
+                if queue:
+                    msg = queue.popleft()
+                    if not queue:
+                        del self._queues[session_id]
+                    self._adjust_inflight(session_id, 1)
+                    task = loop.create_task(self._dispatch(msg))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                    continue
+
+                if self._inflight.get(session_id):
+                    event.clear()
+                    await event.wait()
+                    continue
+
+                if await self._flush(session_id):
+                    continue
+                break
+        finally:
+            self._events.pop(session_id, None)
+            for key in [k for k in self._session_locks if k[1] == session_id]:
+                del self._session_locks[key]
+
+    async def run(self) -> None:
+        """Dispatch every session with pending messages until all are finished."""
+        self._bind_loop()
+        while self._queues:
+            await asyncio.gather(*(self.run_session(sid) for sid in list(self._queues)))
+
+    async def _flush(self, session_id: str) -> bool:
+        flushed = False
+        for name, agent in list(self.agents.items()):
+            flush = getattr(agent, "flush", None)
+            if not callable(flush):
+                continue
+            try:
+                result = flush(session_id, self)
+                if inspect.isawaitable(result):
+                    result = await result
+                flushed = bool(result) or flushed
+            except Exception as e:  # noqa: BLE001
+                logger.exception("Error flushing agent %s: %s", name, e)
+        return flushed
+
+    async def _dispatch(self, msg: AgentMessage) -> None:
+        try:
+            agent = self.agents.get(msg.receiver)
+            if agent is None:
+                logger.error(
+                    "No registered agent named '%s' for message type %s (session %s)",
+                    msg.receiver,
+                    msg.type,
+                    msg.session_id,
+                )
+                return
+
+            if getattr(agent, "session_ordered", False):
+                lock = self._session_locks.setdefault((msg.receiver, msg.session_id), asyncio.Lock())
+                async with lock:
+                    await self._invoke(agent, msg)
+            else:
+                await self._invoke(agent, msg)
+        finally:
+            self._adjust_inflight(msg.session_id, -1)
+
+    async def _invoke(self, agent: object, msg: AgentMessage) -> None:
+        logger.debug(
+            "Dispatching message %s from %s to %s (session %s)",
+            msg.type,
+            msg.sender,
+            msg.receiver,
+            msg.session_id,
+        )
+
+        handler = agent.handle_message  # type: ignore[attr-defined]
+        async with self._semaphores[msg.receiver]:
+            try:
+                if inspect.iscoroutinefunction(handler):
+                    await handler(msg, self)
+                else:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(self.executor, handler, msg, self)
+            except Exception as e:  # noqa: BLE001
+                logger.exception(
+                    "Error handling message %s by agent %s: %s",
+                    msg.type,
+                    msg.receiver,
+                    e,
+                )
+
+    def close(self) -> None:
+        """Shut down agent-owned pools."""
+        for agent in list(self.agents.values()):
+            close = getattr(agent, "close", None)
+            if callable(close):
+                close()
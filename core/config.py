@@ -24,6 +24,76 @@ for d in (DATA_DIR, MEMORY_DIR, SESSIONS_DIR, LOGS_DIR):
 # Default config values
 DEFAULT_REGION_ID = "coastal_city_01"
 
+# Session storage: "json" (one file per session) or "sqlite" (single WAL database)
+SESSION_BACKEND = os.getenv("TERRAFORMER_SESSION_BACKEND", "json")
+SESSIONS_DB = MEMORY_DIR / "sessions.db"
+
+# MessageBus dispatch: 0 = serial on the calling thread, N > 0 = thread pool of N workers
+BUS_MAX_WORKERS = int(os.getenv("TERRAFORMER_BUS_WORKERS", "0"))
+
+# MessageBus backpressure: max queued messages per agent per session (0 = unbounded),
+# and what a producer does when it hits the mark: block|raise
+BUS_HIGH_WATER_MARK = int(os.getenv("TERRAFORMER_BUS_HIGH_WATER", "0"))
+BUS_BACKPRESSURE = os.getenv("TERRAFORMER_BUS_BACKPRESSURE", "block")
+
+# MessageBus dispatch order: fair | fifo | downstream | fair-downstream (see core.scheduler)
+BUS_SCHEDULER = os.getenv("TERRAFORMER_BUS_SCHEDULER", "fair")
+
+# AgentSystem bus: sync (MessageBus) | async (AsyncMessageBus on a background event loop)
+AGENT_SYSTEM_BUS = os.getenv("TERRAFORMER_BUS", "sync")
+# AsyncMessageBus: default concurrent handlers per thread-safe agent
+ASYNC_BUS_AGENT_CONCURRENCY = int(os.getenv("TERRAFORMER_ASYNC_AGENT_CONCURRENCY", "8"))
+
+# Sessions an AgentSystem runs concurrently (submit() worker threads)
+AGENT_SYSTEM_MAX_SESSIONS = int(os.getenv("TERRAFORMER_MAX_SESSIONS", "4"))
+
+# SimulationAgent execution: "inline" (on the bus thread), "thread" or "process" pool
+SIMULATION_BACKEND = os.getenv("TERRAFORMER_SIM_BACKEND", "inline")
+# Pool size for the thread/process backends (0 = executor default)
+SIMULATION_WORKERS = int(os.getenv("TERRAFORMER_SIM_WORKERS", "0"))
+# Scenarios per task submitted to the pool
+SIMULATION_CHUNK_SIZE = int(os.getenv("TERRAFORMER_SIM_CHUNK_SIZE", "64"))
+# SimulationAgent memoized results (0 = no cache)
+SIMULATION_CACHE_SIZE = int(os.getenv("TERRAFORMER_SIM_CACHE_SIZE", "100000"))
+# Monte Carlo draws per scenario for p5/p50/p95 uncertainty (0 = point estimates only), and their seed
+SIMULATION_MC_DRAWS = int(os.getenv("TERRAFORMER_SIM_MC_DRAWS", "0"))
+SIMULATION_MC_SEED = int(os.getenv("TERRAFORMER_SIM_MC_SEED", "0"))
+# Attach year-by-year trajectories over the policy's time_horizon_years (1 = on; off by default,
+# but always on when TERRAFORMER_EVAL_SCORE_BASIS=cumulative, which scores them)
+SIMULATION_TRAJECTORY = (
+    os.getenv("TERRAFORMER_SIM_TRAJECTORY", "0") != "0"
+    or os.getenv("TERRAFORMER_EVAL_SCORE_BASIS", "final") == "cumulative"
+)
+
+# Scenarios per SCENARIO_BATCH message from ScenarioAgent (0 = one SCENARIO message each)
+SCENARIO_BATCH_SIZE = int(os.getenv("TERRAFORMER_SCENARIO_BATCH_SIZE", "64"))
+# How ScenarioAgent proposes portfolios: random | branch_and_bound | evolutionary | hill_climb
+SCENARIO_STRATEGY = os.getenv("TERRAFORMER_SCENARIO_STRATEGY", "random")
+# ScenarioAgent RNG seed for every session ("" = a fresh random seed per session)
+SCENARIO_SEED = os.getenv("TERRAFORMER_SEED", "")
+# Reuse stored reports for identical seeded requests (memory/cache; 0 = off)
+RESULT_CACHE = os.getenv("TERRAFORMER_RESULT_CACHE", "1") != "0"
+# Evolutionary strategy: population per generation, generations, and budgets (0 = none)
+EVOLUTION_POPULATION = int(os.getenv("TERRAFORMER_EVOLUTION_POPULATION", "64"))
+EVOLUTION_GENERATIONS = int(os.getenv("TERRAFORMER_EVOLUTION_GENERATIONS", "50"))
+EVOLUTION_MAX_EVALUATIONS = int(os.getenv("TERRAFORMER_EVOLUTION_MAX_EVALUATIONS", "0"))
+EVOLUTION_TIME_BUDGET_S = float(os.getenv("TERRAFORMER_EVOLUTION_TIME_BUDGET_S", "0"))
+# Hill-climbing strategy: random restarts per session
+HILL_CLIMB_RESTARTS = int(os.getenv("TERRAFORMER_HILL_CLIMB_RESTARTS", "8"))
+
+# Scenarios EvaluationAgent keeps per session for ranked_scenarios (0 = all)
+EVAL_TOP_K = int(os.getenv("TERRAFORMER_EVAL_TOP_K", "10"))
+# What EvaluationAgent scores reduction on: final (end state) | cumulative (emissions over the
+# horizon; turns on SIMULATION_TRAJECTORY)
+EVAL_SCORE_BASIS = os.getenv("TERRAFORMER_EVAL_SCORE_BASIS", "final")
+# EvaluationAgent mode: score (weighted ranking) | pareto (also the cost/reduction/jobs Pareto frontier)
+EVAL_MODE = os.getenv("TERRAFORMER_EVAL_MODE", "score")
+
+# Scenario scoring weights (tools.scoring_tool): reduction reward, budget and job-loss penalties
+SCORE_WEIGHT_REDUCTION = float(os.getenv("TERRAFORMER_SCORE_W_REDUCTION", "1.0"))
+SCORE_WEIGHT_BUDGET = float(os.getenv("TERRAFORMER_SCORE_W_BUDGET", "50.0"))
+SCORE_WEIGHT_JOBS = float(os.getenv("TERRAFORMER_SCORE_W_JOBS", "10.0"))
+
 LOG_FILE = LOGS_DIR / "agent_events.log"
 LOG_LEVEL = logging.INFO
 
@@ -8,12 +8,22 @@ MessageBus for registering agents and routing AgentMessage objects between them.
 from __future__ import annotations
 
 import logging
-from typing import Dict, List, Optional
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Optional, Tuple
 
 from core.models import AgentMessage
+from core.scheduler import FairShareScheduler, Scheduler
 
 logger = logging.getLogger(__name__)
 
+BACKPRESSURE_POLICIES = ("block", "raise")
+
+
+class BackpressureError(RuntimeError):
+    """Raised by MessageBus.send when a receiver's queue is full and the policy is 'raise'."""
+
 
 class MessageBus:
     """
@@ -23,11 +33,95 @@ class MessageBus:
     - register_agent(name, instance)
     - send(message)
     - run(session_id=None) to dispatch messages to agents.
+
+    Queued messages live in a Scheduler (core.scheduler) that picks the
+    next one to dispatch. The default FairShareScheduler keeps one FIFO
+    deque per session plus a round-robin ring of sessions, so dispatching
+    is O(1) per message no matter how many other sessions share the bus.
+    In concurrent mode the scheduler orders submission to the pool, and
+    run() only submits while a worker is free: the backlog stays in the
+    scheduler, where backpressure can see and drain it, instead of piling
+    up in the executor's queue.
+
+    Concurrent dispatch (opt-in, max_workers > 0) runs handlers on a
+    ThreadPoolExecutor. Agents opt in by declaring class attributes:
+    - thread_safe = True: handle_message may run on several threads at once.
+    - session_ordered = True (with thread_safe): messages of the same session
+      are still handled one at a time, in FIFO order.
+    Agents that are not thread-safe get one message at a time, in FIFO order,
+    in both modes.
+
+    Agents that hand work to their own pools keep a session open with
+    hold()/release() while results are outstanding, and may implement
+    `flush(session_id, bus) -> bool` to push out buffered work once the
+    session's queue runs dry (session_id None = all sessions).
+
+    Backpressure (opt-in): high_water_marks maps receiver -> max messages
+    queued for it per session ("*" = default for all receivers). Sending
+    into a full lane (receiver, session) applies the policy:
+    - "block": throttle the producer until the lane is back at half the
+      mark. A producer running inside a handler (the serial dispatcher or
+      a pool worker) or an agent's flush() yields to dispatch, handling
+      its session's pending messages inline. A worker that still can't get
+      there waits for the other workers, unless it is the last one not
+      waiting; a flush() never waits on the loop it runs on; producers
+      outside the bus just wait.
+    - "raise": send() raises BackpressureError and drops the message;
+      producers can check has_capacity() first.
+    Marks are soft: a send that can't be throttled without deadlocking
+    (nobody is running the session, or the lane can't be drained from
+    where the producer sits) is accepted over the mark and counted in
+    stats()["overflows"].
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        max_workers: int = 0,
+        high_water_marks: Optional[Dict[str, int]] = None,
+        backpressure: str = "block",
+        scheduler: Optional[Scheduler] = None,
+    ) -> None:
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(
+                f"Unknown backpressure policy '{backpressure}'. Expected one of {BACKPRESSURE_POLICIES}"
+            )
+
         self.agents: Dict[str, object] = {}
-        self.queue: List[AgentMessage] = []
+        self.max_workers = max_workers
+        self.high_water_marks: Dict[str, int] = dict(high_water_marks or {})
+        self.backpressure = backpressure
+        # Queue depths are only tracked when some mark is set
+        self._bounded = any(mark > 0 for mark in self.high_water_marks.values())
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Guards queues and in-flight bookkeeping; agents may send from worker threads
+        self._cond = threading.Condition(threading.RLock())
+        # Per-agent lock for agents that are not thread-safe
+        self._agent_locks: Dict[str, threading.RLock] = {}
+        # Serialized lanes currently executing: lane key -> messages waiting their turn
+        self._lanes: Dict[Tuple[str, Optional[str]], Deque[AgentMessage]] = {}
+        # session_id -> messages handed to workers but not finished yet
+        self._inflight: Dict[str, int] = {}
+        self._inflight_total = 0
+        # Concurrent mode: messages popped for the pool and not finished yet
+        # (executor queue, waiting on a busy lane, or running)
+        self._tasks = 0
+        # Pending messages and the order they are dispatched in
+        self.scheduler = scheduler if scheduler is not None else FairShareScheduler()
+
+        # (receiver, session_id) -> queued messages; marks apply per lane
+        self._depth: Dict[Tuple[str, str], int] = {}
+        # receiver -> queued messages, peak queued, peak of any one lane, throttled sends,
+        # sends over the mark
+        self._receiver_depth: Dict[str, int] = {}
+        self._peak_depth: Dict[str, int] = {}
+        self._peak_lane_depth: Dict[str, int] = {}
+        self._throttled: Dict[str, int] = {}
+        self._overflows: Dict[str, int] = {}
+        # session_id (None = all) -> active run() calls; workers blocked on backpressure
+        self._running: Dict[Optional[str], int] = {}
+        self._blocked_workers = 0
+        # Per-thread flags: dispatching inline, flushing, draining for backpressure, pool worker
+        self._local = threading.local()
 
     # --- Agent registration ---
 
@@ -39,12 +133,19 @@ class MessageBus:
         if name in self.agents:
             logger.warning("Overwriting existing agent registration: %s", name)
         self.agents[name] = agent
+        if getattr(agent, "thread_safe", False):
+            self._agent_locks.pop(name, None)
+        else:
+            self._agent_locks[name] = threading.RLock()
         logger.info("Registered agent: %s", name)
 
     # --- Message queue operations ---
 
     def send(self, msg: AgentMessage) -> None:
-        """Enqueue a message to be dispatched later."""
+        """
+        Enqueue a message to be dispatched later, applying backpressure if
+        the receiver's queue for this session is at its high-water mark.
+        """
         logger.debug(
             "Enqueued message %s from %s to %s (session %s)",
             msg.type,
@@ -52,62 +153,461 @@ class MessageBus:
             msg.receiver,
             msg.session_id,
         )
-        self.queue.append(msg)
+        if not self._bounded:
+            with self._cond:
+                self.scheduler.push(msg)
+                self._cond.notify_all()
+            return
+
+        lane = (msg.receiver, msg.session_id)
+        mark = self._high_water_mark(msg.receiver)
+        throttled = stuck = False
+        while True:
+            with self._cond:
+                # Check and enqueue under one lock, so racing producers can't overshoot
+                if mark is None or self._depth.get(lane, 0) < mark:
+                    self._enqueue(msg, lane)
+                    return
+                if stuck:
+                    # Backpressure could not make room: accept over the mark
+                    self._overflows[msg.receiver] = self._overflows.get(msg.receiver, 0) + 1
+                    self._enqueue(msg, lane)
+                    return
+                if not throttled:
+                    throttled = True
+                    self._throttled[msg.receiver] = self._throttled.get(msg.receiver, 0) + 1
+            # Retry for as long as backpressure gets the lane back to its low-water mark
+            stuck = not self._apply_backpressure(msg, mark)
+
+    def _enqueue(self, msg: AgentMessage, lane: Tuple[str, str]) -> None:
+        """Queue a message and count it against its lane. Caller holds self._cond."""
+        self.scheduler.push(msg)
+        lane_depth = self._depth[lane] = self._depth.get(lane, 0) + 1
+        if lane_depth > self._peak_lane_depth.get(msg.receiver, 0):
+            self._peak_lane_depth[msg.receiver] = lane_depth
+        depth = self._receiver_depth.get(msg.receiver, 0) + 1
+        self._receiver_depth[msg.receiver] = depth
+        if depth > self._peak_depth.get(msg.receiver, 0):
+            self._peak_depth[msg.receiver] = depth
+        self._cond.notify_all()
+
+    def has_capacity(self, receiver: str, session_id: str) -> bool:
+        """True if a message to `receiver` in this session can be sent without backpressure."""
+        mark = self._high_water_mark(receiver)
+        return mark is None or self._depth.get((receiver, session_id), 0) < mark
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Queued (not yet dispatched) messages per receiver, across sessions; {} if unbounded."""
+        with self._cond:
+            return {name: depth for name, depth in self._receiver_depth.items() if depth}
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Queue metrics per receiver: current and peak depth across sessions,
+        peak depth of a single (receiver, session) lane, throttled and
+        over-mark sends.
+        """
+        with self._cond:
+            return {
+                "depth": dict(self._receiver_depth),
+                "peak_depth": dict(self._peak_depth),
+                "peak_lane_depth": dict(self._peak_lane_depth),
+                "throttled": dict(self._throttled),
+                "overflows": dict(self._overflows),
+            }
+
+    # --- Backpressure ---
+
+    def _high_water_mark(self, receiver: str) -> Optional[int]:
+        # A receiver listed with 0 opts out of the "*" default
+        mark = self.high_water_marks.get(receiver, self.high_water_marks.get("*"))
+        return mark if mark and mark > 0 else None
+
+    def _apply_backpressure(self, msg: AgentMessage, mark: int) -> bool:
+        """Throttle a send into a full lane; True if the lane got down to half the mark."""
+        lane = (msg.receiver, msg.session_id)
+
+        if self.backpressure == "raise":
+            raise BackpressureError(
+                f"Queue for {msg.receiver} is full ({mark} messages); dropped {msg.type} "
+                f"(session {msg.session_id})"
+            )
+
+        if getattr(self._local, "dispatching", None) is not None:
+            # Called from a handler: yield to dispatch rather than just wait
+            if self._drain(lane, mark // 2):
+                return True
+            if getattr(self._local, "flushing", False):
+                # The run loop itself: nobody else would dispatch the lane
+                return False
+        if self.max_workers > 0 or getattr(self._local, "dispatching", None) is None:
+            return self._wait_for_capacity(lane, mark // 2)
+        return False
+
+    def _wait_for_capacity(self, lane: Tuple[str, str], low_water: int) -> bool:
+        """
+        Block until the lane is drained to `low_water`; False if it gave up
+        instead. Gives up if nobody is dispatching the lane's session, and
+        never blocks the last pool worker that isn't already waiting (with
+        one worker, workers never wait).
+        """
+        session_id = lane[1]
+        is_worker = getattr(self._local, "worker", False)
+        with self._cond:
+            if is_worker and self._blocked_workers >= self.max_workers - 1:
+                # Someone has to keep handling messages
+                return False
+
+            if is_worker:
+                self._blocked_workers += 1
+            try:
+                while self._depth.get(lane, 0) > low_water:
+                    if not (self._running.get(None) or self._running.get(session_id)):
+                        return False
+                    self._cond.wait()
+            finally:
+                if is_worker:
+                    self._blocked_workers -= 1
+        return True
+
+    def _drain(self, lane: Tuple[str, str], low_water: int) -> bool:
+        """
+        Yield to dispatch: handle the lane's session inline, in FIFO order,
+        until the lane is back at `low_water` (returns whether it got
+        there). Stops early rather than
+        re-entering a handler that is already on this thread's stack and
+        can't take nested calls, or a lane this thread is already draining.
+        In concurrent mode it also stops at a message whose serialized lane
+        is busy on another worker, and claims the lane while handling one.
+        """
+        local = self._local
+        draining = getattr(local, "draining", None)
+        if draining is None:
+            draining = local.draining = set()
+            local.handling = []
+        if lane in draining:
+            return False
+
+        concurrent = self.max_workers > 0
+        draining.add(lane)
+        try:
+            while self._depth.get(lane, 0) > low_water:
+                with self._cond:
+                    head = self.scheduler.peek(lane[1])
+                    if head is None or not self._reentrant(head.receiver):
+                        break
+                    head_lane = self._lane_key(head) if concurrent else None
+                    if head_lane is not None and head_lane in self._lanes:
+                        break
+                    msg = self._pop(lane[1])
+                    if concurrent:
+                        self._dequeued(msg)
+                        # Keeps run(session) from finishing while we handle it
+                        self.hold(msg.session_id)
+                        if head_lane is not None:
+                            self._lanes[head_lane] = deque()
+                local.handling.append(msg.receiver)
+                try:
+                    self._dispatch(msg)
+                finally:
+                    local.handling.pop()
+                    if concurrent:
+                        with self._cond:
+                            if head_lane is not None:
+                                self._release_lane(head_lane)
+                            self.release(msg.session_id)
+        finally:
+            draining.discard(lane)
+        return self._depth.get(lane, 0) <= low_water
+
+    def _reentrant(self, receiver: str) -> bool:
+        """True if `receiver` may be dispatched from a drain on this thread."""
+        agent = self.agents.get(receiver)
+        if getattr(agent, "thread_safe", False) and not getattr(agent, "session_ordered", False):
+            return True
+        return receiver != self._local.dispatching and receiver not in self._local.handling
+
+    def hold(self, session_id: str) -> None:
+        """
+        Mark work for a session as in flight outside the bus (e.g. on an
+        agent's own executor). run() waits for a matching release().
+        """
+        with self._cond:
+            self._inflight[session_id] = self._inflight.get(session_id, 0) + 1
+            self._inflight_total += 1
+
+    def release(self, session_id: str) -> None:
+        """Finish work registered with hold(); send its results first."""
+        with self._cond:
+            remaining = self._inflight[session_id] - 1
+            if remaining:
+                self._inflight[session_id] = remaining
+            else:
+                del self._inflight[session_id]
+            self._inflight_total -= 1
+            self._cond.notify_all()
+
+    def pending(self, session_id: Optional[str] = None) -> int:
+        """Number of queued messages, for one session or for the whole bus."""
+        with self._cond:
+            return self.scheduler.pending(session_id)
+
+    def __len__(self) -> int:
+        return len(self.scheduler)
+
+    def _pop(self, session_id: Optional[str]) -> Optional[AgentMessage]:
+        """
+        Pop the next message, either for a given session or across all
+        sessions, in scheduler order. Returns None when nothing is pending.
+        """
+        msg = self.scheduler.pop(session_id)
+        if msg is None:
+            return None
+        if self._bounded and self.max_workers <= 0:
+            self._dequeued(msg)
+        return msg
+
+    def _dequeued(self, msg: AgentMessage) -> None:
+        """
+        Take a message off its lane's depth once it is about to be handled.
+        Serial mode counts this at pop; concurrent mode when a worker starts
+        it, so messages waiting in the executor still count. Caller holds
+        self._cond.
+        """
+        lane = (msg.receiver, msg.session_id)
+        depth = self._depth[lane] - 1
+        if depth:
+            self._depth[lane] = depth
+        else:
+            del self._depth[lane]
+        self._receiver_depth[msg.receiver] -= 1
+        if self._throttled:
+            # A producer may be waiting for this lane to drain
+            self._cond.notify_all()
 
     # --- Dispatch loop ---
 
     def run(self, session_id: Optional[str] = None, max_steps: Optional[int] = None) -> None:
         """
-        Dispatch messages in FIFO order.
+        Dispatch messages in FIFO order (per session, round-robin across sessions).
+
+        Returns once the queue is drained, buffering agents have nothing left
+        to flush, and no handler or held work is still running.
 
         Args:
-            session_id: if provided, only messages for this session are processed.
+            session_id: if provided, only messages for this session are processed;
+                messages for other sessions stay queued untouched.
             max_steps: safety limit to avoid infinite loops; None = no limit.
         """
+        executor = self._get_executor()
+
+        with self._cond:
+            self._running[session_id] = self._running.get(session_id, 0) + 1
+        try:
+            self._run_loop(executor, session_id, max_steps)
+        finally:
+            with self._cond:
+                self._running[session_id] -= 1
+                if not self._running[session_id]:
+                    del self._running[session_id]
+                self._cond.notify_all()
+
+    def _run_loop(
+        self,
+        executor: Optional[ThreadPoolExecutor],
+        session_id: Optional[str],
+        max_steps: Optional[int],
+    ) -> None:
         steps = 0
 
-        while self.queue:
+        while True:
             if max_steps is not None and steps >= max_steps:
                 logger.warning("MessageBus reached max_steps=%d, stopping dispatch", max_steps)
                 break
 
-            msg = self.queue.pop(0)
+            with self._cond:
+                msg = None
+                while True:
+                    # Concurrent mode: only pop for a free worker
+                    free = executor is None or self._tasks < self.max_workers
+                    if free:
+                        msg = self._pop(session_id)
+                        if msg is not None:
+                            break
+                    # Running handlers may still produce messages for us
+                    if not self._busy(session_id) and (free or not self.scheduler.pending(session_id)):
+                        break
+                    self._cond.wait()
+                if msg is not None and executor is not None:
+                    self._submit(executor, msg)
 
-            if session_id is not None and msg.session_id != session_id:
-                # Put it back at the end of the queue for another run
-                self.queue.append(msg)
-                steps += 1
-                continue
+            if msg is None:
+                # Idle: give buffering agents a chance to push out their work
+                if self._flush(session_id):
+                    continue
+                break
+            if executor is None and self._bounded:
+                # Lets backpressure in this handler's sends yield to dispatch
+                self._local.dispatching = msg.receiver
+                try:
+                    self._dispatch(msg)
+                finally:
+                    self._local.dispatching = None
+            elif executor is None:
+                self._dispatch(msg)
+            steps += 1
+
+        if executor is not None:
+            with self._cond:
+                while self._busy(session_id):
+                    self._cond.wait()
 
-            receiver_name = msg.receiver
-            agent = self.agents.get(receiver_name)
-            if agent is None:
-                logger.error(
-                    "No registered agent named '%s' for message type %s (session %s)",
-                    receiver_name,
-                    msg.type,
-                    msg.session_id,
+    def close(self) -> None:
+        """Shut down the worker pool, if one was started, and agent-owned pools."""
+        with self._cond:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+        for agent in list(self.agents.values()):
+            close = getattr(agent, "close", None)
+            if callable(close):
+                close()
+
+    def __enter__(self) -> "MessageBus":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _get_executor(self) -> Optional[ThreadPoolExecutor]:
+        if self.max_workers <= 0:
+            return None
+        with self._cond:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="MessageBus",
                 )
-                steps += 1
+            return self._executor
+
+    def _flush(self, session_id: Optional[str]) -> bool:
+        """
+        Call flush() on agents that buffer work; True if any of them did.
+        Runs on the run loop's thread, so sends from a flush that hit
+        backpressure drain inline like a handler's, and never wait for
+        the loop they are blocking.
+        """
+        flushed = False
+        local = self._local
+        for name, agent in list(self.agents.items()):
+            flush = getattr(agent, "flush", None)
+            if not callable(flush):
                 continue
+            if self._bounded:
+                local.dispatching, local.flushing = name, True
+            try:
+                flushed = bool(flush(session_id, self)) or flushed
+            except Exception as e:  # noqa: BLE001
+                logger.exception("Error flushing agent %s: %s", name, e)
+            finally:
+                local.dispatching, local.flushing = None, False
+        return flushed
+
+    def _busy(self, session_id: Optional[str]) -> bool:
+        if session_id is None:
+            return self._inflight_total > 0
+        return self._inflight.get(session_id, 0) > 0
 
-            logger.debug(
-                "Dispatching message %s from %s to %s (session %s)",
+    def _lane_key(self, msg: AgentMessage) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        Serialization lane for a message, or None if it may run in parallel
+        with anything: non-thread-safe agents get one lane for all sessions,
+        session-ordered agents get one lane per session.
+        """
+        agent = self.agents.get(msg.receiver)
+        if not getattr(agent, "thread_safe", False):
+            return (msg.receiver, None)
+        if getattr(agent, "session_ordered", False):
+            return (msg.receiver, msg.session_id)
+        return None
+
+    def _submit(self, executor: ThreadPoolExecutor, msg: AgentMessage) -> None:
+        # Caller holds self._cond
+        self.hold(msg.session_id)
+        self._tasks += 1
+
+        lane = self._lane_key(msg)
+        if lane is not None:
+            if lane in self._lanes:
+                # Lane busy: the running task picks this up when it finishes
+                self._lanes[lane].append(msg)
+                return
+            self._lanes[lane] = deque()
+        executor.submit(self._execute, executor, msg, lane)
+
+    def _execute(
+        self,
+        executor: ThreadPoolExecutor,
+        msg: AgentMessage,
+        lane: Optional[Tuple[str, Optional[str]]],
+    ) -> None:
+        if self._bounded:
+            self._local.worker = True
+            with self._cond:
+                self._dequeued(msg)
+            # Lets backpressure in this handler's sends yield to dispatch
+            self._local.dispatching = msg.receiver
+        try:
+            self._dispatch(msg)
+        finally:
+            self._local.dispatching = None
+            with self._cond:
+                if lane is not None:
+                    self._release_lane(lane)
+                self._tasks -= 1
+                self.release(msg.session_id)
+
+    def _release_lane(self, lane: Tuple[str, Optional[str]]) -> None:
+        """Hand a serialized lane to its next waiting message, or free it. Caller holds self._cond."""
+        waiting = self._lanes[lane]
+        if waiting:
+            self._executor.submit(self._execute, self._executor, waiting.popleft(), lane)
+        else:
+            del self._lanes[lane]
+
+    def _dispatch(self, msg: AgentMessage) -> None:
+        receiver_name = msg.receiver
+        agent = self.agents.get(receiver_name)
+        if agent is None:
+            logger.error(
+                "No registered agent named '%s' for message type %s (session %s)",
+                receiver_name,
                 msg.type,
-                msg.sender,
-                msg.receiver,
                 msg.session_id,
             )
+            return
 
-            try:
-                # Agents are expected to implement handle_message(msg, bus)
-                agent.handle_message(msg, self)  # type: ignore[attr-defined]
-            except Exception as e:  # noqa: BLE001
-                logger.exception(
-                    "Error handling message %s by agent %s: %s",
-                    msg.type,
-                    receiver_name,
-                    e,
-                )
+        logger.debug(
+            "Dispatching message %s from %s to %s (session %s)",
+            msg.type,
+            msg.sender,
+            msg.receiver,
+            msg.session_id,
+        )
 
-            steps += 1
+        lock = self._agent_locks.get(receiver_name)
+        try:
+            # Agents are expected to implement handle_message(msg, bus)
+            if lock is None:
+                agent.handle_message(msg, self)  # type: ignore[attr-defined]
+            else:
+                with lock:
+                    agent.handle_message(msg, self)  # type: ignore[attr-defined]
+        except Exception as e:  # noqa: BLE001
+            logger.exception(
+                "Error handling message %s by agent %s: %s",
+                msg.type,
+                receiver_name,
+                e,
+            )
@@ -0,0 +1,369 @@
+# Dispatch order for queued bus messages
+"""
+core.scheduler
+
+Schedulers own the messages queued on a MessageBus and decide which one is
+dispatched next, either for one session (run(session_id)) or across all of
+them (run()). They are not thread-safe; the bus calls them under its lock.
+
+Policies:
+- fair (default): FIFO within a session, round-robin across sessions, so a
+  session with thousands of queued messages cannot starve the others.
+- fifo: global arrival order across sessions.
+- downstream: messages further down the pipeline first (REPORT_READY before
+  EVAL_SUMMARY before SIM_RESULT ... before START), round-robin across
+  sessions within a priority level. Finishing sessions complete before new
+  fan-out starts, which cuts time-to-first-report and the number of
+  messages held in memory. Sessions can be given a priority offset.
+- fair-downstream: round-robin across sessions like fair, but each session
+  dispatches its most downstream message first.
+
+Pick one with TERRAFORMER_BUS_SCHEDULER=<policy>, or pass a
+scheduler to MessageBus.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from core.models import AgentMessage
+
+SCHEDULER_POLICIES = ("fair", "fifo", "downstream", "fair-downstream")
+
+# Lower runs first. Types not listed run at DEFAULT_PRIORITY.
+DOWNSTREAM_PRIORITIES: Dict[str, int] = {
+    "REPORT_READY": 0,
+    "EVAL_SUMMARY": 1,
+    "CACHED_REPORT": 1,
+    "SIM_RESULT": 2,
+    "SIM_RESULT_BATCH": 2,
+    "SIM_ERROR": 2,
+    "SCENARIO_COUNT": 2,
+    "SCENARIO": 3,
+    "SCENARIO_BATCH": 3,
+    "EVOLVE_NEXT": 4,
+    "REGION_CONTEXT": 4,
+    "POLICY": 5,
+    "GOAL": 6,
+    "START": 7,
+}
+DEFAULT_PRIORITY = 4
+
+
+class Scheduler(ABC):
+    """
+    Scheduler
+
+    Queue of pending messages plus the policy picking the next one.
+    """
+
+    @abstractmethod
+    def push(self, msg: AgentMessage) -> None:
+        """Queue a message."""
+
+    @abstractmethod
+    def pop(self, session_id: Optional[str] = None) -> Optional[AgentMessage]:
+        """Next message for a session (or any session if None); None when empty."""
+
+    @abstractmethod
+    def peek(self, session_id: str) -> Optional[AgentMessage]:
+        """The message pop(session_id) would return, without removing it."""
+
+    @abstractmethod
+    def pending(self, session_id: Optional[str] = None) -> int:
+        """Queued messages for a session (or all sessions if None)."""
+
+    def __len__(self) -> int:
+        return self.pending()
+
+
+class FairShareScheduler(Scheduler):
+    """
+    FairShareScheduler
+
+    One FIFO deque per session, plus a round-robin ring of sessions that
+    have pending messages. Both pop modes are O(1) per message.
+    """
+
+    def __init__(self) -> None:
+        # session_id -> FIFO of pending messages for that session
+        self._queues: Dict[str, Deque[AgentMessage]] = {}
+        # Round-robin ring of session_ids that may have pending messages.
+        # Entries for sessions drained via pop(session_id) go stale and are
+        # skipped lazily; _in_ring keeps each session in the ring at most once.
+        self._ready: Deque[str] = deque()
+        self._in_ring: Set[str] = set()
+        self._size = 0
+
+    def push(self, msg: AgentMessage) -> None:
+        queue = self._queues.get(msg.session_id)
+        if queue is None:
+            queue = self._queues[msg.session_id] = deque()
+            if msg.session_id not in self._in_ring:
+                self._in_ring.add(msg.session_id)
+                self._ready.append(msg.session_id)
+        queue.append(msg)
+        self._size += 1
+
+    def pop(self, session_id: Optional[str] = None) -> Optional[AgentMessage]:
+        if session_id is None:
+            while self._ready:
+                session_id = self._ready.popleft()
+                queue = self._queues.get(session_id)
+                if queue:
+                    break
+                # Stale ring entry: the session was drained directly
+                self._in_ring.discard(session_id)
+            else:
+                return None
+
+            msg = queue.popleft()
+            if queue:
+                # Session still has work: move it to the back of the ring
+                self._ready.append(session_id)
+            else:
+                del self._queues[session_id]
+                self._in_ring.discard(session_id)
+        else:
+            queue = self._queues.get(session_id)
+            if not queue:
+                return None
+            msg = queue.popleft()
+            if not queue:
+                del self._queues[session_id]
+
+        self._size -= 1
+        return msg
+
+    def peek(self, session_id: str) -> Optional[AgentMessage]:
+        queue = self._queues.get(session_id)
+        return queue[0] if queue else None
+
+    def pending(self, session_id: Optional[str] = None) -> int:
+        if session_id is None:
+            return self._size
+        queue = self._queues.get(session_id)
+        return len(queue) if queue is not None else 0
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class FifoScheduler(Scheduler):
+    """
+    FifoScheduler
+
+    Global arrival order. Each session keeps its own FIFO of (seq, msg); a
+    heap holds one entry per non-empty session, keyed by the seq of its
+    head. Entries left behind by pop(session_id) are corrected lazily, so
+    the heap never holds more entries than there are sessions.
+    """
+
+    def __init__(self) -> None:
+        self._queues: Dict[str, Deque[Tuple[int, AgentMessage]]] = {}
+        self._heap: List[Tuple[int, str]] = []
+        self._in_heap: Set[str] = set()
+        self._seq = 0
+        self._size = 0
+
+    def push(self, msg: AgentMessage) -> None:
+        self._seq += 1
+        queue = self._queues.get(msg.session_id)
+        if queue is None:
+            queue = self._queues[msg.session_id] = deque()
+        queue.append((self._seq, msg))
+        if msg.session_id not in self._in_heap:
+            self._in_heap.add(msg.session_id)
+            heapq.heappush(self._heap, (self._seq, msg.session_id))
+        self._size += 1
+
+    def pop(self, session_id: Optional[str] = None) -> Optional[AgentMessage]:
+        if session_id is None:
+            while self._heap:
+                seq, session_id = heapq.heappop(self._heap)
+                queue = self._queues.get(session_id)
+                if not queue:
+                    self._in_heap.discard(session_id)
+                    continue
+                if queue[0][0] != seq:
+                    # Head moved on since this entry was pushed; re-key it
+                    heapq.heappush(self._heap, (queue[0][0], session_id))
+                    continue
+                break
+            else:
+                return None
+
+            _, msg = queue.popleft()
+            if queue:
+                heapq.heappush(self._heap, (queue[0][0], session_id))
+            else:
+                del self._queues[session_id]
+                self._in_heap.discard(session_id)
+        else:
+            queue = self._queues.get(session_id)
+            if not queue:
+                return None
+            _, msg = queue.popleft()
+            if not queue:
+                del self._queues[session_id]
+
+        self._size -= 1
+        return msg
+
+    def peek(self, session_id: str) -> Optional[AgentMessage]:
+        queue = self._queues.get(session_id)
+        return queue[0][1] if queue else None
+
+    def pending(self, session_id: Optional[str] = None) -> int:
+        if session_id is None:
+            return self._size
+        queue = self._queues.get(session_id)
+        return len(queue) if queue is not None else 0
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class PriorityScheduler(Scheduler):
+    """
+    PriorityScheduler
+
+    Messages go to a priority level: the priority of their type plus the
+    offset of their session (lower runs first). Within a session and level,
+    messages stay FIFO. Across sessions:
+    - round_robin=False: the lowest non-empty level is served first,
+      round-robin across its sessions. Keeps the fewest messages queued,
+      but a large fan-out delays the first stages of newer sessions.
+    - round_robin=True: sessions take turns, each dispatching its own
+      lowest level. Session offsets then only reorder within a session.
+    There are only a handful of levels, so pops are O(levels) per message.
+    """
+
+    def __init__(
+        self,
+        type_priorities: Optional[Dict[str, int]] = None,
+        default_priority: int = DEFAULT_PRIORITY,
+        round_robin: bool = False,
+    ) -> None:
+        self.type_priorities = dict(DOWNSTREAM_PRIORITIES if type_priorities is None else type_priorities)
+        self.default_priority = default_priority
+        self.round_robin = round_robin
+        self._session_priorities: Dict[str, int] = {}
+
+        # session_id -> level -> FIFO of pending messages
+        self._queues: Dict[str, Dict[int, Deque[AgentMessage]]] = {}
+        # level -> round-robin ring of sessions with (possibly) pending messages
+        # at that level; with round_robin, one ring (key 0) for all levels
+        self._rings: Dict[int, Deque[str]] = {}
+        self._in_ring: Set[Tuple[int, str]] = set()
+        # Sorted ring keys
+        self._levels: List[int] = []
+        self._size = 0
+
+    def set_session_priority(self, session_id: str, offset: int) -> None:
+        """
+        Shift a session's messages by `offset` levels (negative = sooner).
+        Applies to messages pushed from now on.
+        """
+        if offset:
+            self._session_priorities[session_id] = offset
+        else:
+            self._session_priorities.pop(session_id, None)
+
+    def _level(self, msg: AgentMessage) -> int:
+        return self.type_priorities.get(msg.type, self.default_priority) + self._session_priorities.get(
+            msg.session_id, 0
+        )
+
+    def push(self, msg: AgentMessage) -> None:
+        level = self._level(msg)
+        levels = self._queues.get(msg.session_id)
+        if levels is None:
+            levels = self._queues[msg.session_id] = {}
+        queue = levels.get(level)
+        if queue is None:
+            queue = levels[level] = deque()
+        queue.append(msg)
+
+        key = 0 if self.round_robin else level
+        if (key, msg.session_id) not in self._in_ring:
+            self._in_ring.add((key, msg.session_id))
+            ring = self._rings.get(key)
+            if ring is None:
+                ring = self._rings[key] = deque()
+                bisect.insort(self._levels, key)
+            ring.append(msg.session_id)
+        self._size += 1
+
+    def _take(self, session_id: str, level: int) -> AgentMessage:
+        levels = self._queues[session_id]
+        queue = levels[level]
+        msg = queue.popleft()
+        if not queue:
+            del levels[level]
+            if not levels:
+                del self._queues[session_id]
+        self._size -= 1
+        return msg
+
+    def pop(self, session_id: Optional[str] = None) -> Optional[AgentMessage]:
+        if session_id is not None:
+            levels = self._queues.get(session_id)
+            if not levels:
+                return None
+            return self._take(session_id, min(levels))
+
+        while self._levels:
+            key = self._levels[0]
+            ring = self._rings[key]
+            while ring:
+                sid = ring.popleft()
+                levels = self._queues.get(sid)
+                if self.round_robin:
+                    level = min(levels) if levels else None
+                else:
+                    level = key if levels and key in levels else None
+                if level is None:
+                    # Stale ring entry: drained directly via pop(session_id)
+                    self._in_ring.discard((key, sid))
+                    continue
+
+                msg = self._take(sid, level)
+                if sid in self._queues and (self.round_robin or level in levels):
+                    ring.append(sid)
+                else:
+                    self._in_ring.discard((key, sid))
+                return msg
+            del self._rings[key]
+            self._levels.pop(0)
+        return None
+
+    def peek(self, session_id: str) -> Optional[AgentMessage]:
+        levels = self._queues.get(session_id)
+        return levels[min(levels)][0] if levels else None
+
+    def pending(self, session_id: Optional[str] = None) -> int:
+        if session_id is None:
+            return self._size
+        levels = self._queues.get(session_id)
+        return sum(len(q) for q in levels.values()) if levels else 0
+
+    def __len__(self) -> int:
+        return self._size
+
+
+def make_scheduler(policy: str) -> Scheduler:
+    """Build a scheduler by policy name (see SCHEDULER_POLICIES)."""
+    if policy == "fair":
+        return FairShareScheduler()
+    if policy == "fifo":
+        return FifoScheduler()
+    if policy == "downstream":
+        return PriorityScheduler()
+    if policy == "fair-downstream":
+        return PriorityScheduler(round_robin=True)
+    raise ValueError(f"Unknown scheduler policy '{policy}'. Expected one of {SCHEDULER_POLICIES}")
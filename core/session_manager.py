@@ -3,29 +3,308 @@
 core.session_manager
 
 Session creation, saving, loading, and status updates.
+
+Storage is pluggable via SessionBackend:
+- JsonFileSessionBackend (default): one memory/sessions/<uuid>.json per session.
+- SqliteSessionBackend: a single SQLite database in WAL mode with indexes
+  on status, region and creation time, and single-statement status updates.
+
+Pick one with TERRAFORMER_SESSION_BACKEND=json|sqlite, or set_backend().
 """
 
 from __future__ import annotations
 
 import json
 import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from uuid import uuid4
 from datetime import datetime
 
-from core.config import SESSIONS_DIR, DEFAULT_REGION_ID
+from core.config import SESSION_BACKEND, SESSIONS_DB, SESSIONS_DIR, DEFAULT_REGION_ID
 from core.models import SessionState
 
 logger = logging.getLogger(__name__)
 
 
-def _session_path(session_id: str) -> Path:
-    return SESSIONS_DIR / f"{session_id}.json"
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+class SessionBackend(ABC):
+    """
+    SessionBackend
+
+    Storage interface for SessionState records.
+    """
+
+    @abstractmethod
+    def save(self, state: SessionState) -> None:
+        """Insert or replace a session."""
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[SessionState]:
+        """The stored session, or None if there is none."""
+
+    @abstractmethod
+    def update_status(self, session_id: str, status: str, updated_at: str) -> Optional[SessionState]:
+        """Set status and updated_at; the updated session, or None if there is none."""
+
+    @abstractmethod
+    def list_sessions(
+        self,
+        status: Optional[str] = None,
+        region_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[SessionState]:
+        """Matching sessions, newest first; creation time in [since, until)."""
+
+
+class JsonFileSessionBackend(SessionBackend):
+    """
+    JsonFileSessionBackend
+
+    One JSON file per session. Listing scans the whole directory.
+    """
+
+    def __init__(self, directory: Optional[Path] = None) -> None:
+        self.directory = directory or SESSIONS_DIR
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _session_path(self, session_id: str) -> Path:
+        return self.directory / f"{session_id}.json"
+
+    def save(self, state: SessionState) -> None:
+        path = self._session_path(state.session_id)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(state.to_dict(), f, indent=2)
+
+    def load(self, session_id: str) -> Optional[SessionState]:
+        path = self._session_path(session_id)
+        if not path.exists():
+            return None
+
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        return SessionState.from_dict(data)
+
+    def update_status(self, session_id: str, status: str, updated_at: str) -> Optional[SessionState]:
+        state = self.load(session_id)
+        if state is None:
+            return None
+
+        state.status = status
+        state.updated_at = updated_at
+        self.save(state)
+        return state
+
+    def list_sessions(
+        self,
+        status: Optional[str] = None,
+        region_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[SessionState]:
+        states: List[SessionState] = []
+        for path in self.directory.glob("*.json"):
+            try:
+                with path.open("r", encoding="utf-8") as f:
+                    state = SessionState.from_dict(json.load(f))
+            except (json.JSONDecodeError, TypeError):
+                logger.warning("Skipping unreadable session file %s", path)
+                continue
+
+            if status is not None and state.status != status:
+                continue
+            if region_id is not None and state.region_id != region_id:
+                continue
+            if since is not None and state.created_at < since:
+                continue
+            if until is not None and state.created_at >= until:
+                continue
+            states.append(state)
+
+        states.sort(key=lambda s: s.created_at, reverse=True)
+        return states[:limit] if limit is not None else states
+
+
+class SqliteSessionBackend(SessionBackend):
+    """
+    SqliteSessionBackend
+
+    All sessions in one SQLite database (WAL mode), one connection per
+    thread. ISO-8601 UTC timestamps sort lexicographically, so time-range
+    queries use the created_at indexes directly.
+    """
+
+    _COLUMNS = "session_id, goal_text, region_id, status, created_at, updated_at, metadata"
+
+    _SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            goal_text TEXT NOT NULL,
+            region_id TEXT NOT NULL,
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            metadata TEXT NOT NULL DEFAULT '{}'
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_sessions_status ON sessions (status, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_sessions_region ON sessions (region_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_sessions_created ON sessions (created_at)",
+    )
+
+    # UPDATE ... RETURNING needs SQLite 3.35+
+    _HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path or SESSIONS_DB
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._connect()
+        for statement in self._SCHEMA:
+            conn.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit: every statement is its own transaction
+            conn = sqlite3.connect(str(self.path), isolation_level=None, timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row_to_state(row: Tuple[Any, ...]) -> SessionState:
+        session_id, goal_text, region_id, status, created_at, updated_at, metadata = row
+        return SessionState(
+            session_id=session_id,
+            goal_text=goal_text,
+            region_id=region_id,
+            status=status,
+            created_at=created_at,
+            updated_at=updated_at,
+            metadata=json.loads(metadata),
+        )
+
+    def save(self, state: SessionState) -> None:
+        self._connect().execute(
+            f"INSERT OR REPLACE INTO sessions ({self._COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                state.session_id,
+                state.goal_text,
+                state.region_id,
+                state.status,
+                state.created_at,
+                state.updated_at,
+                json.dumps(state.metadata),
+            ),
+        )
+
+    def load(self, session_id: str) -> Optional[SessionState]:
+        row = self._connect().execute(
+            f"SELECT {self._COLUMNS} FROM sessions WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        return self._row_to_state(row) if row is not None else None
+
+    def update_status(self, session_id: str, status: str, updated_at: str) -> Optional[SessionState]:
+        conn = self._connect()
+        if self._HAS_RETURNING:
+            row = conn.execute(
+                "UPDATE sessions SET status = ?, updated_at = ? WHERE session_id = ? "
+                f"RETURNING {self._COLUMNS}",
+                (status, updated_at, session_id),
+            ).fetchone()
+            return self._row_to_state(row) if row is not None else None
+
+        cursor = conn.execute(
+            "UPDATE sessions SET status = ?, updated_at = ? WHERE session_id = ?",
+            (status, updated_at, session_id),
+        )
+        if cursor.rowcount == 0:
+            return None
+        return self.load(session_id)
+
+    def list_sessions(
+        self,
+        status: Optional[str] = None,
+        region_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[SessionState]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if region_id is not None:
+            clauses.append("region_id = ?")
+            params.append(region_id)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+
+        query = f"SELECT {self._COLUMNS} FROM sessions"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY created_at DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        rows = self._connect().execute(query, params).fetchall()
+        return [self._row_to_state(row) for row in rows]
+
 
+_BACKEND: Optional[SessionBackend] = None
+_BACKEND_LOCK = threading.Lock()
 
-def start_session(goal_text: str, region_id: Optional[str] = None) -> SessionState:
+
+def get_backend() -> SessionBackend:
+    """Return the process-wide session backend, creating it from config on first use."""
+    global _BACKEND
+    with _BACKEND_LOCK:
+        if _BACKEND is None:
+            if SESSION_BACKEND == "sqlite":
+                _BACKEND = SqliteSessionBackend()
+            elif SESSION_BACKEND == "json":
+                _BACKEND = JsonFileSessionBackend()
+            else:
+                raise ValueError(
+                    f"Unknown session backend '{SESSION_BACKEND}'. Expected 'json' or 'sqlite'"
+                )
+            logger.info("Using %s for sessions", type(_BACKEND).__name__)
+        return _BACKEND
+
+
+def set_backend(backend: SessionBackend) -> None:
+    """Replace the process-wide session backend."""
+    global _BACKEND
+    with _BACKEND_LOCK:
+        _BACKEND = backend
+
+
+def start_session(
+    goal_text: str,
+    region_id: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> SessionState:
     """
     Create a new session, save it to disk, and return its state.
     """
@@ -33,7 +312,7 @@ def start_session(goal_text: str, region_id: Optional[str] = None) -> SessionSta
         region_id = DEFAULT_REGION_ID
 
     session_id = str(uuid4())
-    now = datetime.utcnow().isoformat() + "Z"
+    now = _now()
 
     state = SessionState(
         session_id=session_id,
@@ -42,7 +321,7 @@ def start_session(goal_text: str, region_id: Optional[str] = None) -> SessionSta
         status="created",
         created_at=now,
         updated_at=now,
-        metadata={},
+        metadata=dict(metadata or {}),
     )
 
     save_session(state)
@@ -54,28 +333,21 @@ def load_session(session_id: str) -> Optional[SessionState]:
     """
     Load session state from disk. Returns None if not found.
     """
-    path = _session_path(session_id)
-    if not path.exists():
-        logger.warning("Session file not found for %s", session_id)
+    state = get_backend().load(session_id)
+    if state is None:
+        logger.warning("Session not found: %s", session_id)
         return None
 
-    with path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    state = SessionState.from_dict(data)
     logger.info("Loaded session %s (status=%s)", session_id, state.status)
     return state
 
 
 def save_session(state: SessionState) -> None:
     """
-    Save session state to disk as JSON.
+    Save session state to disk.
     """
-    path = _session_path(state.session_id)
-    state.updated_at = datetime.utcnow().isoformat() + "Z"
-
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(state.to_dict(), f, indent=2)
+    state.updated_at = _now()
+    get_backend().save(state)
 
     logger.debug("Saved session %s (status=%s)", state.session_id, state.status)
 
@@ -84,11 +356,30 @@ def update_session_status(session_id: str, status: str) -> Optional[SessionState
     """
     Convenience helper to update only the status field.
     """
-    state = load_session(session_id)
+    state = get_backend().update_status(session_id, status, _now())
     if state is None:
+        logger.warning("Session not found: %s", session_id)
         return None
 
-    state.status = status
-    save_session(state)
     logger.info("Updated session %s status -> %s", session_id, status)
     return state
+
+
+def list_sessions(
+    status: Optional[str] = None,
+    region_id: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> List[SessionState]:
+    """
+    List sessions, newest first, optionally filtered by status, region and
+    creation time range [since, until) given as ISO timestamps.
+    """
+    return get_backend().list_sessions(
+        status=status,
+        region_id=region_id,
+        since=since,
+        until=until,
+        limit=limit,
+    )
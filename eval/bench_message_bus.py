@@ -0,0 +1,174 @@
+# Micro-benchmark: MessageBus dispatch throughput
+"""
+eval.bench_message_bus
+
+Micro-benchmark for MessageBus dispatch throughput.
+
+Enqueues many messages spread across many sessions and measures how fast
+they are dispatched, comparing the per-session deque bus against the
+previous single-list implementation (kept here as LegacyMessageBus).
+
+Run via:
+    python -m eval.bench_message_bus
+    python -m eval.bench_message_bus --messages 100000 --sessions 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Ensure project root is on sys.path when executed as script
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.message_bus import MessageBus  # type: ignore  # noqa: E402
+from core.models import AgentMessage  # type: ignore  # noqa: E402
+
+
+class _SinkAgent:
+    """Agent that only counts the messages it receives."""
+
+    def __init__(self) -> None:
+        self.received = 0
+
+    def handle_message(self, msg: AgentMessage, bus: object) -> None:
+        self.received += 1
+
+
+class LegacyMessageBus:
+    """
+    The original list-backed bus: pop(0) per message and foreign-session
+    messages re-appended to the tail when running a single session.
+    """
+
+    def __init__(self) -> None:
+        self.agents: Dict[str, object] = {}
+        self.queue: List[AgentMessage] = []
+
+    def register_agent(self, name: str, agent: object) -> None:
+        self.agents[name] = agent
+
+    def send(self, msg: AgentMessage) -> None:
+        self.queue.append(msg)
+
+    def run(self, session_id: Optional[str] = None, max_steps: Optional[int] = None) -> None:
+        steps = 0
+        while self.queue:
+            if max_steps is not None and steps >= max_steps:
+                break
+            msg = self.queue.pop(0)
+            if session_id is not None and msg.session_id != session_id:
+                self.queue.append(msg)
+                steps += 1
+                continue
+            self.agents[msg.receiver].handle_message(msg, self)  # type: ignore[attr-defined]
+            steps += 1
+
+
+def _make_messages(num_messages: int, num_sessions: int) -> List[AgentMessage]:
+    # Fixed timestamp so message construction cost is not part of the numbers
+    return [
+        AgentMessage(
+            sender="Bench",
+            receiver="Sink",
+            type="BENCH",
+            payload={},
+            session_id=f"session-{i % num_sessions}",
+            timestamp="",
+        )
+        for i in range(num_messages)
+    ]
+
+
+def _bench_global(bus_cls: type, messages: List[AgentMessage]) -> float:
+    """Dispatch everything with run() and return messages per second."""
+    bus = bus_cls()
+    sink = _SinkAgent()
+    bus.register_agent("Sink", sink)
+    for msg in messages:
+        bus.send(msg)
+
+    start = time.perf_counter()
+    bus.run()
+    elapsed = time.perf_counter() - start
+
+    assert sink.received == len(messages)
+    return len(messages) / elapsed
+
+
+def _bench_per_session(
+    bus_cls: type,
+    messages: List[AgentMessage],
+    num_sessions: int,
+    sample_sessions: Optional[int],
+) -> float:
+    """
+    Drain sessions one at a time with run(session_id=...) and return
+    messages per second. For the legacy bus each run is bounded by the
+    queue length (one full rotation), since it would otherwise spin forever
+    on foreign-session messages.
+    """
+    bus = bus_cls()
+    sink = _SinkAgent()
+    bus.register_agent("Sink", sink)
+    for msg in messages:
+        bus.send(msg)
+
+    sessions = [f"session-{i}" for i in range(num_sessions)]
+    if sample_sessions is not None:
+        sessions = sessions[:sample_sessions]
+
+    start = time.perf_counter()
+    for session_id in sessions:
+        if isinstance(bus, LegacyMessageBus):
+            bus.run(session_id=session_id, max_steps=len(bus.queue))
+        else:
+            bus.run(session_id=session_id)
+    elapsed = time.perf_counter() - start
+
+    return sink.received / elapsed
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark MessageBus dispatch throughput.")
+    parser.add_argument("--messages", type=int, default=100_000, help="Messages to enqueue.")
+    parser.add_argument("--sessions", type=int, default=1_000, help="Sessions to spread them over.")
+    parser.add_argument(
+        "--legacy-session-sample",
+        type=int,
+        default=20,
+        help=(
+            "Sessions drained per-session on the legacy bus; it is quadratic, "
+            "so only a sample is timed and throughput is reported for that sample."
+        ),
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    messages = _make_messages(args.messages, args.sessions)
+
+    print(f"=== MessageBus dispatch: {args.messages:,} messages, {args.sessions:,} sessions ===")
+
+    legacy_global = _bench_global(LegacyMessageBus, messages)
+    new_global = _bench_global(MessageBus, messages)
+    print(f"run()            before: {legacy_global:>12,.0f} msg/s   after: {new_global:>12,.0f} msg/s")
+
+    legacy_session = _bench_per_session(
+        LegacyMessageBus, messages, args.sessions, args.legacy_session_sample
+    )
+    new_session = _bench_per_session(MessageBus, messages, args.sessions, None)
+    print(
+        f"run(session_id)  before: {legacy_session:>12,.0f} msg/s   after: {new_session:>12,.0f} msg/s"
+        f"   (before = first {args.legacy_session_sample} sessions)"
+    )
+
+
+if __name__ == "__main__":
+    main()
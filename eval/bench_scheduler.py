@@ -0,0 +1,171 @@
+# Benchmark: session latency per MessageBus scheduling policy
+"""
+eval.bench_scheduler
+
+Compares MessageBus scheduling policies (core.scheduler) under a mixed
+load: sessions arrive at a steady rate while earlier ones are still
+running, and a share of them fan out into many more scenarios than the
+rest. Each session runs a synthetic copy of the agent pipeline
+(START -> SCENARIO_COUNT + N x SCENARIO -> SIM_RESULT -> EVAL_SUMMARY ->
+REPORT_READY) with the real message types, so type priorities apply.
+
+Reports p50/p99/max session latency (START sent to REPORT_READY handled),
+time to the first report, and the peak number of queued messages.
+
+Run via:
+    python -m eval.bench_scheduler
+    python -m eval.bench_scheduler --sessions 400 --heavy-fanout 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Ensure project root is on sys.path when executed as script
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.message_bus import MessageBus  # type: ignore  # noqa: E402
+from core.models import AgentMessage  # type: ignore  # noqa: E402
+from core.scheduler import SCHEDULER_POLICIES, make_scheduler  # type: ignore  # noqa: E402
+
+
+def _send(bus: MessageBus, sender: str, receiver: str, msg_type: str, session_id: str, payload=None) -> None:
+    bus.send(
+        AgentMessage(
+            sender=sender,
+            receiver=receiver,
+            type=msg_type,
+            payload=payload or {},
+            session_id=session_id,
+            timestamp="",
+        )
+    )
+
+
+class _Pipeline:
+    """All pipeline stages in one object; each stage does a little busy work."""
+
+    thread_safe = True
+
+    def __init__(self, fanout: Dict[str, int], work: int) -> None:
+        self.fanout = fanout
+        self.work = work
+        self.expected: Dict[str, int] = {}
+        self.received: Dict[str, int] = {}
+        self.finished: Dict[str, float] = {}
+
+    def _busy(self) -> None:
+        total = 0
+        for i in range(self.work):
+            total += i
+        return None
+
+    def handle_message(self, msg: AgentMessage, bus: MessageBus) -> None:
+        sid = msg.session_id
+        self._busy()
+        if msg.type == "START":
+            count = self.fanout[sid]
+            _send(bus, "Pipeline", "Pipeline", "SCENARIO_COUNT", sid, {"count": count})
+            for _ in range(count):
+                _send(bus, "Pipeline", "Pipeline", "SCENARIO", sid)
+        elif msg.type == "SCENARIO":
+            _send(bus, "Pipeline", "Pipeline", "SIM_RESULT", sid)
+        elif msg.type in ("SCENARIO_COUNT", "SIM_RESULT"):
+            if msg.type == "SCENARIO_COUNT":
+                self.expected[sid] = msg.payload["count"]
+            else:
+                self.received[sid] = self.received.get(sid, 0) + 1
+            if self.received.get(sid, 0) == self.expected.get(sid):
+                _send(bus, "Pipeline", "Pipeline", "EVAL_SUMMARY", sid)
+        elif msg.type == "EVAL_SUMMARY":
+            _send(bus, "Pipeline", "Pipeline", "REPORT_READY", sid)
+        elif msg.type == "REPORT_READY":
+            self.finished[sid] = time.perf_counter()
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def _bench_policy(policy: str, args: argparse.Namespace) -> Dict[str, float]:
+    fanout = {
+        f"session-{i}": args.heavy_fanout if i % args.heavy_every == 0 else args.light_fanout
+        for i in range(args.sessions)
+    }
+    pipeline = _Pipeline(fanout, args.work)
+    bus = MessageBus(scheduler=make_scheduler(policy))
+    bus.register_agent("Pipeline", pipeline)
+
+    started: Dict[str, float] = {}
+    peak_pending = 0
+    t0 = time.perf_counter()
+    for session_id in fanout:
+        started[session_id] = time.perf_counter()
+        _send(bus, "Bench", "Pipeline", "START", session_id)
+        # New sessions keep arriving while earlier ones are still running
+        bus.run(max_steps=args.steps_per_arrival)
+        peak_pending = max(peak_pending, len(bus))
+    bus.run()
+
+    latencies = [pipeline.finished[sid] - started[sid] for sid in fanout]
+    return {
+        "p50": _percentile(latencies, 50),
+        "p99": _percentile(latencies, 99),
+        "max": max(latencies),
+        "first": min(pipeline.finished.values()) - t0,
+        "total": time.perf_counter() - t0,
+        "peak_pending": peak_pending,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark MessageBus scheduling policies.")
+    parser.add_argument("--sessions", type=int, default=200, help="Sessions to run.")
+    parser.add_argument("--light-fanout", type=int, default=10, help="Scenarios per light session.")
+    parser.add_argument("--heavy-fanout", type=int, default=500, help="Scenarios per heavy session.")
+    parser.add_argument("--heavy-every", type=int, default=10, help="Every Nth session is heavy.")
+    parser.add_argument(
+        "--steps-per-arrival",
+        type=int,
+        default=60,
+        help="Messages dispatched between session arrivals (arrival rate).",
+    )
+    parser.add_argument("--work", type=int, default=200, help="Busy-loop iterations per message.")
+    parser.add_argument(
+        "--policies",
+        nargs="+",
+        default=list(SCHEDULER_POLICIES),
+        choices=SCHEDULER_POLICIES,
+        help="Scheduling policies to compare.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    # run(max_steps=...) warns every time it pauses between arrivals
+    logging.getLogger("core.message_bus").setLevel(logging.ERROR)
+    print(
+        f"=== Scheduler latency: {args.sessions} sessions, fan-out {args.light_fanout} "
+        f"(every {args.heavy_every}th: {args.heavy_fanout}), {args.steps_per_arrival} steps/arrival ==="
+    )
+    print(f"{'policy':<17}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'first ms':>10}{'total s':>10}{'peak queued':>13}")
+    for policy in args.policies:
+        r = _bench_policy(policy, args)
+        print(
+            f"{policy:<17}{r['p50'] * 1e3:>10.1f}{r['p99'] * 1e3:>10.1f}{r['max'] * 1e3:>10.1f}"
+            f"{r['first'] * 1e3:>10.1f}{r['total']:>10.2f}{r['peak_pending']:>13,}"
+        )
+
+
+if __name__ == "__main__":
+    main()
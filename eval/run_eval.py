@@ -27,22 +27,13 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
 from core.config import setup_logging, DEFAULT_REGION_ID  # type: ignore  # noqa: E402
-from core.message_bus import MessageBus  # type: ignore  # noqa: E402
-from core.models import AgentMessage  # type: ignore  # noqa: E402
-from core.session_manager import start_session, update_session_status  # type: ignore  # noqa: E402
+from core.agent_system import get_agent_system  # type: ignore  # noqa: E402
 
 from tools.storage_tool import load_report  # type: ignore  # noqa: E402
 from tools.climate_data_tool import load_region  # type: ignore  # noqa: E402
-from tools.intervention_tool import load_interventions  # type: ignore  # noqa: E402
+from tools.intervention_tool import get_catalog  # type: ignore  # noqa: E402
 from tools.simulation_tool import simulate_scenario  # type: ignore  # noqa: E402
-
-from agents.orchestrator import Orchestrator  # type: ignore  # noqa: E402
-from agents.policy_agent import PolicyAgent  # type: ignore  # noqa: E402
-from agents.data_agent import DataAgent  # type: ignore  # noqa: E402
-from agents.scenario_agent import ScenarioAgent  # type: ignore  # noqa: E402
-from agents.simulation_agent import SimulationAgent  # type: ignore  # noqa: E402
-from agents.evaluation_agent import EvaluationAgent  # type: ignore  # noqa: E402
-from agents.report_agent import ReportAgent  # type: ignore  # noqa: E402
+from tools.scoring_tool import score_scenario  # type: ignore  # noqa: E402
 
 
 logger = logging.getLogger(__name__)
@@ -86,55 +77,8 @@ def _ensure_sample_scenarios() -> None:
     logger.warning("Created sample evaluation scenarios at %s", SCENARIOS_FILE)
 
 
-def build_system() -> MessageBus:
-    """
-    Build a fresh MessageBus with all agents registered.
-    """
-    bus = MessageBus()
-
-    orchestrator = Orchestrator()
-    policy_agent = PolicyAgent(default_region_id=DEFAULT_REGION_ID)
-    data_agent = DataAgent()
-    scenario_agent = ScenarioAgent()
-    simulation_agent = SimulationAgent()
-    evaluation_agent = EvaluationAgent()
-    report_agent = ReportAgent()
-
-    bus.register_agent("Orchestrator", orchestrator)
-    bus.register_agent("PolicyAgent", policy_agent)
-    bus.register_agent("DataAgent", data_agent)
-    bus.register_agent("ScenarioAgent", scenario_agent)
-    bus.register_agent("SimulationAgent", simulation_agent)
-    bus.register_agent("EvaluationAgent", evaluation_agent)
-    bus.register_agent("ReportAgent", report_agent)
-
-    return bus
-
-
-def run_agentic(goal_text: str, region_id: str) -> float:
-    """
-    Run the full multi-agent pipeline for a given goal and region.
-    Returns the best scenario score from the report.
-    """
-    state = start_session(goal_text, region_id)
-    session_id = state.session_id
-
-    update_session_status(session_id, "running")
-
-    bus = build_system()
-
-    start_msg = AgentMessage(
-        sender="Eval",
-        receiver="Orchestrator",
-        type="START",
-        payload={"goal_text": goal_text, "region_id": region_id},
-        session_id=session_id,
-    )
-    bus.send(start_msg)
-    bus.run(session_id=session_id)
-
-    update_session_status(session_id, "completed")
-
+def _report_score(session_id: str) -> float:
+    """Best scenario score from a session's saved report (0.0 if missing)."""
     report = load_report(session_id)
     if report is None:
         logger.error("No report generated for session %s", session_id)
@@ -145,6 +89,15 @@ def run_agentic(goal_text: str, region_id: str) -> float:
     return score
 
 
+def run_agentic(goal_text: str, region_id: str) -> float:
+    """
+    Run the full multi-agent pipeline for a given goal and region.
+    Returns the best scenario score from the report.
+    """
+    session_id = get_agent_system().run_session(goal_text, region_id, sender="Eval")
+    return _report_score(session_id)
+
+
 def baseline_scenario(region_id: str) -> Tuple[float, Dict[str, Any]]:
     """
     Simple baseline heuristic:
@@ -157,20 +110,13 @@ def baseline_scenario(region_id: str) -> Tuple[float, Dict[str, Any]]:
         (score, simulation_result_dict)
     """
     region = load_region(region_id)
-    interventions = load_interventions()
-
-    # Choose cheapest intervention per sector
-    by_sector: Dict[str, Dict[str, Any]] = {}
-    for iv in interventions.values():
-        sector = iv["sector"]
-        if sector not in by_sector or iv["base_cost_usd_per_unit"] < by_sector[sector][
-            "base_cost_usd_per_unit"
-        ]:
-            by_sector[sector] = iv
+    interventions = get_catalog()
 
+    # Choose cheapest intervention per sector (first one wins ties)
     actions: List[Dict[str, Any]] = []
-    for iv in by_sector.values():
-        actions.append({"id": iv["id"], "scale": "low"})
+    for positions in interventions.by_sector.values():
+        cheapest = min(positions, key=lambda i: interventions.cost[i])
+        actions.append({"id": interventions.ids[cheapest], "scale": "low"})
 
     scenario = {
         "scenario_id": "BASELINE",
@@ -190,41 +136,10 @@ def baseline_scenario(region_id: str) -> Tuple[float, Dict[str, Any]]:
         },
     }
 
-    score = _score_scenario(policy, sim)
+    score = score_scenario(policy, sim)
     return score, sim
 
 
-def _score_scenario(policy: Dict[str, Any], sim: Dict[str, Any]) -> float:
-    """
-    Same scoring design as EvaluationAgent._score_scenario.
-    """
-    targets = policy["targets"]
-    target_reduction = targets["co2_reduction_percent"]
-    reduction = sim["co2_reduction_percent"]
-
-    reduction_score = reduction - max(0.0, target_reduction - reduction)
-
-    budget_limit = targets.get("budget_limit_usd")
-    cost = sim["total_cost_usd"]
-    if budget_limit is not None and cost > budget_limit:
-        budget_overshoot = (cost - budget_limit) / max(budget_limit, 1.0)
-    else:
-        budget_overshoot = 0.0
-
-    job_limit = targets.get("job_loss_max_percent", 5)
-    jobs_change = sim.get("estimated_jobs_change_percent", 0.0)
-    jobs_penalty = 0.0
-    if jobs_change < -job_limit:
-        jobs_penalty = abs(jobs_change) - job_limit
-
-    w1 = 1.0
-    w2 = 50.0
-    w3 = 10.0
-
-    score = w1 * reduction_score - w2 * budget_overshoot - w3 * jobs_penalty
-    return score
-
-
 def run_evaluation() -> None:
     """
     Load scenarios, run both baseline and agentic systems, and save results.
@@ -236,7 +151,14 @@ def run_evaluation() -> None:
 
     results: List[Dict[str, Any]] = []
 
-    for sc in scenarios:
+    # All agentic sessions run concurrently on the shared AgentSystem
+    system = get_agent_system()
+    futures = [
+        system.submit(sc["goal"], sc.get("region_id", DEFAULT_REGION_ID), sender="Eval", seed=sc.get("seed"))
+        for sc in scenarios
+    ]
+
+    for sc, future in zip(scenarios, futures):
         name = sc["name"]
         region_id = sc.get("region_id", DEFAULT_REGION_ID)
         goal = sc["goal"]
@@ -244,7 +166,7 @@ def run_evaluation() -> None:
         logger.info("Evaluating scenario: %s (%s)", name, region_id)
 
         base_score, base_sim = baseline_scenario(region_id)
-        agentic_score = run_agentic(goal, region_id)
+        agentic_score = _report_score(future.result())
 
         result = {
             "name": name,
@@ -14,83 +14,20 @@ import logging
 from typing import Optional
 
 from core.config import setup_logging, DEFAULT_REGION_ID
-from core.message_bus import MessageBus
-from core.models import AgentMessage
-from core.session_manager import start_session, update_session_status
+from core.agent_system import get_agent_system
 from tools.storage_tool import load_report
 from tools.memory_tool import append_session_summary
 
-from agents.orchestrator import Orchestrator
-from agents.policy_agent import PolicyAgent
-from agents.data_agent import DataAgent
-from agents.scenario_agent import ScenarioAgent
-from agents.simulation_agent import SimulationAgent
-from agents.evaluation_agent import EvaluationAgent
-from agents.report_agent import ReportAgent
-
 
 logger = logging.getLogger(__name__)
 
 
-def build_system() -> MessageBus:
-    """
-    Instantiate the MessageBus and register all agents.
-    """
-    bus = MessageBus()
-
-    orchestrator = Orchestrator()
-    policy_agent = PolicyAgent(default_region_id=DEFAULT_REGION_ID)
-    data_agent = DataAgent()
-    scenario_agent = ScenarioAgent()
-    simulation_agent = SimulationAgent()
-    evaluation_agent = EvaluationAgent()
-    report_agent = ReportAgent()
-
-    bus.register_agent("Orchestrator", orchestrator)
-    bus.register_agent("PolicyAgent", policy_agent)
-    bus.register_agent("DataAgent", data_agent)
-    bus.register_agent("ScenarioAgent", scenario_agent)
-    bus.register_agent("SimulationAgent", simulation_agent)
-    bus.register_agent("EvaluationAgent", evaluation_agent)
-    bus.register_agent("ReportAgent", report_agent)
-
-    return bus
-
-
 def run_session(goal_text: str, region_id: Optional[str] = None) -> Optional[str]:
     """
     Create a session, run the agent pipeline, and return the session_id.
+    Uses the process-wide AgentSystem, so repeated calls reuse the same agents.
     """
-    if region_id is None:
-        region_id = DEFAULT_REGION_ID
-
-    state = start_session(goal_text, region_id)
-    session_id = state.session_id
-
-    update_session_status(session_id, "running")
-
-    bus = build_system()
-
-    # Kick off the process with a START message to Orchestrator
-    start_msg = AgentMessage(
-        sender="User",
-        receiver="Orchestrator",
-        type="START",
-        payload={
-            "goal_text": goal_text,
-            "region_id": region_id,
-        },
-        session_id=session_id,
-    )
-    bus.send(start_msg)
-
-    # Run until the queue is empty
-    bus.run(session_id=session_id)
-
-    update_session_status(session_id, "completed")
-
-    logger.info("Session %s completed", session_id)
-    return session_id
+    return get_agent_system().run_session(goal_text, region_id, sender="User")
 
 
 def print_report(session_id: str) -> None:
@@ -114,14 +51,15 @@ def print_report(session_id: str) -> None:
     co2_red = float(sim.get("co2_reduction_percent", 0.0))
     total_cost = float(sim.get("total_cost_usd", 0.0))
 
-    # Update long-term memory
-    append_session_summary(
-        session_id=session_id,
-        region_id=region_id,
-        co2_reduction_percent=co2_red,
-        total_cost_usd=total_cost,
-        score=score,
-    )
+    # Update long-term memory (not for sessions where every scenario failed)
+    if best:
+        append_session_summary(
+            session_id=session_id,
+            region_id=region_id,
+            co2_reduction_percent=co2_red,
+            total_cost_usd=total_cost,
+            score=score,
+        )
 
     print("=" * 80)
     print(title)
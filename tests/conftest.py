@@ -0,0 +1,115 @@
+"""
+Shared fixtures for the test suite.
+
+Run from the repo root:
+    python -m pytest -q
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure project root is on sys.path when pytest is run from elsewhere
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+
+@pytest.fixture
+def isolated_storage(tmp_path, monkeypatch):
+    """
+    Point every file the agents read or write (regions, interventions,
+    sessions, reports, caches, long-term memory) at a temporary directory,
+    with the sample data files created there.
+    """
+    import core.session_manager as session_manager
+    import tools.climate_data_tool as climate_data_tool
+    import tools.intervention_tool as intervention_tool
+    import tools.memory_tool as memory_tool
+    import tools.storage_tool as storage_tool
+
+    (tmp_path / "sessions").mkdir()
+    (tmp_path / "reports").mkdir()
+
+    monkeypatch.setattr(session_manager, "SESSIONS_DIR", tmp_path / "sessions")
+    # Rebuilt on first use, against the patched paths
+    monkeypatch.setattr(session_manager, "_BACKEND", None)
+    monkeypatch.setattr(climate_data_tool, "REGIONS_FILE", tmp_path / "regions.csv")
+    monkeypatch.setattr(intervention_tool, "INTERVENTIONS_FILE", tmp_path / "interventions.csv")
+    monkeypatch.setattr(storage_tool, "REPORTS_DIR", tmp_path / "reports")
+    monkeypatch.setattr(storage_tool, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(memory_tool, "LONG_TERM_FILE", tmp_path / "long_term.json")
+    for module, names in (
+        (climate_data_tool, ("REGIONS_NPY",)),
+        (memory_tool, ("LONG_TERM_LOG", "LONG_TERM_STATS")),
+        (session_manager, ("SESSIONS_DB",)),
+    ):
+        for name in names:
+            if hasattr(module, name):
+                monkeypatch.setattr(module, name, tmp_path / getattr(module, name).name)
+
+    climate_data_tool._ensure_sample_regions_file()
+    intervention_tool._ensure_sample_interventions_file()
+    return tmp_path
+
+
+@pytest.fixture
+def catalog(isolated_storage):
+    """The sample interventions catalog, compiled."""
+    from tools.intervention_tool import get_catalog
+
+    return get_catalog()
+
+
+@pytest.fixture
+def regions(isolated_storage):
+    """Every sample region."""
+    from tools.climate_data_tool import load_all_regions
+
+    return list(load_all_regions().values())
+
+
+@pytest.fixture
+def region(regions):
+    """The first sample region."""
+    return regions[0]
+
+
+@pytest.fixture
+def policy():
+    """A 10-year policy for the first sample region."""
+    return {
+        "region_id": "coastal_city_01",
+        "time_horizon_years": 10,
+        "targets": {"co2_reduction_percent": 40.0, "budget_limit_usd": 6e8, "job_loss_max_percent": 1.0},
+    }
+
+
+@pytest.fixture
+def make_scenarios(catalog):
+    """
+    Factory of `n` random scenarios over the catalog, each with
+    min_actions..max_actions actions (interventions may repeat).
+    """
+    import random
+
+    from tools.simulation_tool import SCALE_FACTORS
+
+    def make(n, min_actions=1, max_actions=4, seed=0):
+        rng = random.Random(seed)
+        ids = list(catalog)
+        return [
+            {
+                "scenario_id": f"S{i}",
+                "actions": [
+                    {"id": rng.choice(ids), "scale": rng.choice(list(SCALE_FACTORS))}
+                    for _ in range(rng.randint(min_actions, max_actions))
+                ],
+            }
+            for i in range(n)
+        ]
+
+    return make
@@ -0,0 +1,72 @@
+"""
+AccumulatorCache: cached accumulators equal accumulate() on canonical
+actions, entries are evicted LRU, and hill_climb gives the same portfolios
+and exact scores with a shared cache.
+"""
+
+from __future__ import annotations
+
+import random
+
+from tools.scoring_tool import score_scenario
+from tools.search_tool import hill_climb
+from tools.simulation_tool import AccumulatorCache, accumulate, canonical_actions
+
+
+def test_matches_accumulate_in_canonical_order(region, catalog, make_scenarios):
+    cache = AccumulatorCache()
+    for scenario in make_scenarios(50, max_actions=len(catalog)):
+        expected = accumulate(region, {"actions": canonical_actions(scenario["actions"])}, catalog)
+        assert cache.get(region, scenario, catalog) == expected
+
+        shuffled = {"scenario_id": "other", "actions": list(reversed(scenario["actions"]))}
+        assert cache.get(region, shuffled, catalog) is cache.get(region, scenario, catalog)
+
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 150
+    assert stats["entries"] == stats["misses"]
+
+
+def test_lru_eviction(region, catalog):
+    cache = AccumulatorCache(maxsize=2)
+    ids = list(catalog)
+    a, b, c = ({"actions": [{"id": iv_id, "scale": "low"}]} for iv_id in ids[:3])
+
+    cache.get(region, a, catalog)
+    cache.get(region, b, catalog)
+    cache.get(region, a, catalog)  # b is now least recently used
+    cache.get(region, c, catalog)
+    assert cache.stats()["entries"] == 2
+
+    hits = cache.hits
+    cache.get(region, a, catalog)
+    assert cache.hits == hits + 1
+    cache.get(region, b, catalog)
+    assert cache.hits == hits + 1
+
+
+def test_unversioned_catalog_is_not_cached(region, catalog):
+    plain = {iv_id: dict(iv) for iv_id, iv in catalog.items()}
+    cache = AccumulatorCache()
+    scenario = {"actions": [{"id": next(iter(plain)), "scale": "high"}]}
+    assert cache.get(region, scenario, plain) == accumulate(region, scenario, plain)
+    assert cache.stats()["entries"] == 0
+
+
+def test_hill_climb_with_shared_cache(policy, region, catalog):
+    fresh = hill_climb(region, policy, catalog, top_n=3, max_actions=3, restarts=4, rng=random.Random(5))
+
+    cache = AccumulatorCache()
+    first = hill_climb(
+        region, policy, catalog, top_n=3, max_actions=3, restarts=4, rng=random.Random(5), accumulators=cache
+    )
+    misses = cache.misses
+    second = hill_climb(
+        region, policy, catalog, top_n=3, max_actions=3, restarts=4, rng=random.Random(5), accumulators=cache
+    )
+
+    assert first == fresh == second
+    assert cache.misses == misses
+    for score, actions in first:
+        exact = accumulate(region, {"actions": canonical_actions(actions)}, catalog).result()
+        assert score == score_scenario(policy, exact)
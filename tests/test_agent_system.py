@@ -0,0 +1,153 @@
+"""
+End-to-end AgentSystem runs on the MessageBus and on the AsyncMessageBus:
+both buses produce the same reports for the same seeds, and so does the
+process simulation backend, with or without a high-water mark. Concurrent
+submits share the warm agents but keep their sessions' results apart.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from agents.scenario_agent import ScenarioAgent
+from agents.simulation_agent import SimulationAgent
+from core.agent_system import AgentSystem
+from core.session_manager import load_session
+from tools.storage_tool import load_report
+
+GOALS = [
+    "Cut emissions 30% under budget",
+    "Reduce CO2 by 50% while protecting jobs",
+    "Cheapest plan for a 20% reduction",
+]
+
+
+def _run_all(bus, sim_backend="inline"):
+    with AgentSystem(max_sessions=3, bus=bus) as system:
+        system.bus.register_agent("ScenarioAgent", ScenarioAgent(result_cache=False))
+        system.bus.register_agent("SimulationAgent", SimulationAgent(backend=sim_backend, chunk_size=4))
+        futures = [system.submit(goal, seed=seed) for seed, goal in enumerate(GOALS)]
+        session_ids = [f.result(timeout=120) for f in futures]
+    return session_ids
+
+
+def _best(session_id):
+    report = load_report(session_id)
+    best = report["best_scenario"]
+    return best["scenario"]["scenario_id"], best["score"], report["metrics"]["num_scenarios"]
+
+
+@pytest.mark.parametrize("sim_backend", ["inline", "thread"])
+def test_async_bus_matches_sync_bus(isolated_storage, sim_backend):
+    sync_ids = _run_all("sync")
+    async_ids = _run_all("async", sim_backend)
+
+    for sync_id, async_id in zip(sync_ids, async_ids):
+        assert load_session(async_id).status == "completed"
+        assert _best(async_id) == _best(sync_id)
+
+
+def _run_fan_out(sim_backend, high_water_mark):
+    """Six serial-bus sessions of one SCENARIO message per portfolio, seeds repeating."""
+    with AgentSystem(max_sessions=3, bus_workers=0, high_water_mark=high_water_mark) as system:
+        system.bus.register_agent(
+            "ScenarioAgent", ScenarioAgent(num_scenarios=300, batch_size=0, result_cache=False)
+        )
+        system.bus.register_agent("SimulationAgent", SimulationAgent(backend=sim_backend, chunk_size=16))
+        futures = [system.submit(GOALS[i % 2], seed=i % 2) for i in range(6)]
+        session_ids = [f.result(timeout=120) for f in futures]
+        stats = system.bus.stats()
+    return session_ids, stats
+
+
+@pytest.mark.parametrize("high_water_mark", [0, 8])
+def test_process_backend_session(isolated_storage, high_water_mark):
+    inline_ids, _ = _run_fan_out("inline", high_water_mark)
+    process_ids, stats = _run_fan_out("process", high_water_mark)
+
+    for inline_id, process_id in zip(inline_ids, process_ids):
+        assert load_session(process_id).status == "completed"
+        assert _best(process_id) == _best(inline_id)
+    if high_water_mark:
+        assert stats["throttled"].get("SimulationAgent")
+        assert stats["overflows"] == {}
+        assert all(peak <= high_water_mark for peak in stats["peak_lane_depth"].values())
+
+
+# (goal, region, seed): two regions, seeds shared across them
+SUBMISSIONS = [
+    (GOALS[0], "coastal_city_01", 1),
+    (GOALS[1], "industrial_region_02", 1),
+    (GOALS[2], "coastal_city_01", 2),
+    (GOALS[0], "industrial_region_02", 2),
+    (GOALS[1], "coastal_city_01", 3),
+    (GOALS[2], "industrial_region_02", 3),
+]
+
+
+def _register_pipeline(system):
+    system.bus.register_agent("ScenarioAgent", ScenarioAgent(num_scenarios=12, result_cache=False))
+    system.bus.register_agent("SimulationAgent", SimulationAgent(backend="thread", chunk_size=4))
+
+
+def _record_handlers(system):
+    """Wrap every agent's handle_message to log (agent name, agent, session_id)."""
+    seen = []
+    lock = threading.Lock()
+    for name, agent in system.bus.agents.items():
+        handle = agent.handle_message
+
+        def recording(msg, bus, name=name, agent=agent, handle=handle):
+            with lock:
+                seen.append((name, agent, msg.session_id))
+            return handle(msg, bus)
+
+        agent.handle_message = recording
+    return seen
+
+
+@pytest.mark.parametrize("bus_workers", [0, 4])
+def test_concurrent_submits_share_agents(isolated_storage, bus_workers):
+    expected = {}
+    for submission in SUBMISSIONS:
+        with AgentSystem(max_sessions=1) as fresh:
+            _register_pipeline(fresh)
+            expected[submission] = _best(fresh.run_session(*submission[:2], seed=submission[2]))
+
+    with AgentSystem(max_sessions=3, bus_workers=bus_workers) as system:
+        _register_pipeline(system)
+        agents = dict(system.bus.agents)
+        seen = _record_handlers(system)
+
+        session_ids = {}
+        pools = []
+        for wave in (SUBMISSIONS[:3], SUBMISSIONS[3:]):
+            futures = {sub: system.submit(sub[0], sub[1], seed=sub[2]) for sub in wave}
+            session_ids.update({sub: f.result(timeout=120) for sub, f in futures.items()})
+            pools.append(agents["SimulationAgent"]._executor)
+
+        # The same agent objects (and simulation pool) served every session
+        assert system.bus.agents == agents
+        assert pools[0] is not None and pools[1] is pools[0]
+        assert all(agent is agents[name] for name, agent, _ in seen)
+        for session_id in session_ids.values():
+            assert {name for name, _, sid in seen if sid == session_id} == set(agents)
+        # ...and no per-session state outlives its session
+        assert agents["ScenarioAgent"]._searches == {}
+        assert agents["SimulationAgent"]._buffers == {}
+        assert agents["EvaluationAgent"]._sessions == {}
+
+    assert len(set(session_ids.values())) == len(SUBMISSIONS)
+    for submission, session_id in session_ids.items():
+        report = load_report(session_id)
+        assert load_session(session_id).status == "completed"
+        assert report["best_scenario"]["policy"]["region_id"] == submission[1]
+        assert report["best_scenario"]["region"]["region_id"] == submission[1]
+        assert _best(session_id) == expected[submission]
+
+
+def test_unknown_bus():
+    with pytest.raises(ValueError):
+        AgentSystem(bus="carrier-pigeon")
@@ -0,0 +1,161 @@
+"""
+Region stores: RegionStore reloads when regions.csv changes, looks regions
+up singly or in bulk, and hands out read-only views; the columnar bundle
+built by the CLI serves the same regions and is bypassed while stale.
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+import pickle
+
+import pytest
+
+import tools.climate_data_tool as climate_data_tool
+from tools.climate_data_tool import RegionStore, region_to_dict
+
+HEADER = "region_id,name,population,current_emissions_mtco2,transport_share,industry_share,buildings_share\n"
+
+
+def _write(path, *rows):
+    path.write_text(HEADER + "".join(row + "\n" for row in rows), encoding="utf-8")
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "regions.csv"
+    _write(path, "a,Alpha,100,10.0,0.5,0.3,0.2", "b,Beta,200,20.0,0.2,0.6,0.2")
+    return path
+
+
+def test_get_converts_row(csv_path):
+    region = RegionStore(csv_path).get("a")
+    assert region_to_dict(region) == {
+        "region_id": "a",
+        "name": "Alpha",
+        "population": 100,
+        "current_emissions_mtco2": 10.0,
+        "sector_breakdown": {"transport": 0.5, "industry": 0.3, "buildings": 0.2},
+    }
+
+
+def test_reloads_on_size_change(csv_path):
+    store = RegionStore(csv_path)
+    assert len(store) == 2
+
+    _write(csv_path, "a,Alpha,100,10.0,0.5,0.3,0.2", "b,Beta,200,20.0,0.2,0.6,0.2", "c,Gamma,300,30.0,0.1,0.1,0.8")
+    assert len(store) == 3
+    assert store.get("c")["current_emissions_mtco2"] == 30.0
+
+
+def test_reloads_on_mtime_change_with_same_size(csv_path):
+    store = RegionStore(csv_path)
+    assert store.get("a")["current_emissions_mtco2"] == 10.0
+    stat = csv_path.stat()
+
+    _write(csv_path, "a,Alpha,100,19.0,0.5,0.3,0.2", "b,Beta,200,20.0,0.2,0.6,0.2")
+    assert csv_path.stat().st_size == stat.st_size
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert store.get("a")["current_emissions_mtco2"] == 19.0
+
+
+def test_unchanged_file_is_not_reparsed(csv_path, monkeypatch):
+    store = RegionStore(csv_path)
+    first = store.get("a")
+    monkeypatch.setattr(climate_data_tool, "_convert_region_row", lambda row: pytest.fail("re-parsed"))
+    assert store.get("a") is first
+    assert store.get_many(["a"])["a"] is first
+
+
+def test_get_many(csv_path):
+    store = RegionStore(csv_path)
+    found = store.get_many(["b", "a", "b"])
+    assert list(found) == ["b", "a"]
+    assert found["a"] is store.get("a")
+    assert found["b"] is store.get("b")
+    assert store.get_many([]) == {}
+
+
+@pytest.mark.parametrize("lookup", [lambda s: s.get("missing"), lambda s: s.get_many(["a", "missing"])])
+def test_missing_region_raises_key_error(csv_path, lookup):
+    with pytest.raises(KeyError, match="'missing' not found. Available: a, b"):
+        lookup(RegionStore(csv_path))
+
+
+def test_regions_are_read_only(csv_path):
+    store = RegionStore(csv_path)
+    region = store.get("a")
+    with pytest.raises(TypeError):
+        region["current_emissions_mtco2"] = 0.0
+    with pytest.raises(TypeError):
+        region["sector_breakdown"]["transport"] = 1.0
+    assert store.all()["a"] is region
+
+
+def test_region_to_dict_is_an_independent_plain_copy(csv_path):
+    region = RegionStore(csv_path).get("a")
+    plain = region_to_dict(region)
+    plain["sector_breakdown"]["transport"] = 1.0
+
+    assert region["sector_breakdown"]["transport"] == 0.5
+    assert pickle.loads(pickle.dumps(plain)) == plain
+    assert copy.deepcopy(plain) == plain
+
+
+def _build_columnar_cli(monkeypatch, *args):
+    monkeypatch.setattr("sys.argv", ["climate_data_tool", "build-columnar", *args])
+    climate_data_tool.main()
+
+
+def _set_mtime(path, mtime_ns):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_columnar_matches_csv_for_every_region(isolated_storage, monkeypatch):
+    _build_columnar_cli(monkeypatch)
+    assert climate_data_tool.REGIONS_NPY.exists()
+
+    csv_store = RegionStore(climate_data_tool.REGIONS_FILE)
+    columnar = climate_data_tool.get_region_store()
+    assert isinstance(columnar, climate_data_tool.ColumnarRegionStore)
+    assert len(columnar) == len(csv_store) == 2
+
+    expected = {region_id: region_to_dict(region) for region_id, region in csv_store.all().items()}
+    assert columnar.all() == expected
+    for region_id, region in expected.items():
+        assert columnar.get(region_id) == region
+    ids = sorted(expected, reverse=True)
+    assert columnar.get_many(ids) == {region_id: expected[region_id] for region_id in ids}
+    with pytest.raises(KeyError, match="'missing' not found"):
+        columnar.get("missing")
+
+
+def test_cli_paths(tmp_path, csv_path, monkeypatch):
+    out = tmp_path / "out" / "custom.npy"
+    _build_columnar_cli(monkeypatch, "--csv", str(csv_path), "--out", str(out))
+
+    columnar = climate_data_tool.ColumnarRegionStore(out)
+    assert columnar.all() == {i: region_to_dict(r) for i, r in RegionStore(csv_path).all().items()}
+
+
+def test_stale_columnar_falls_back_to_csv_until_rebuilt(isolated_storage, monkeypatch):
+    csv_file, npy_file = climate_data_tool.REGIONS_FILE, climate_data_tool.REGIONS_NPY
+    _build_columnar_cli(monkeypatch)
+    built = npy_file.stat().st_mtime_ns
+
+    # Edit the CSV after the bundle was built
+    text = csv_file.read_text(encoding="utf-8").replace(",15.0,", ",16.5,")
+    csv_file.write_text(text, encoding="utf-8")
+    _set_mtime(csv_file, built + 1_000_000_000)
+
+    store = climate_data_tool.get_region_store()
+    assert isinstance(store, RegionStore)
+    assert climate_data_tool.load_region("coastal_city_01")["current_emissions_mtco2"] == 16.5
+
+    _build_columnar_cli(monkeypatch)
+    _set_mtime(npy_file, built + 2_000_000_000)
+    store = climate_data_tool.get_region_store()
+    assert isinstance(store, climate_data_tool.ColumnarRegionStore)
+    assert climate_data_tool.load_region("coastal_city_01")["current_emissions_mtco2"] == 16.5
+    assert store.all() == {i: region_to_dict(r) for i, r in RegionStore(csv_file).all().items()}
@@ -0,0 +1,110 @@
+"""
+EvaluationAgent's streaming state: the bounded top-K heap ranks and breaks
+ties exactly like a stable full sort of every result, and the running
+metrics equal the batch values.
+"""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+
+from agents.evaluation_agent import EvaluationAgent
+from core.models import AgentMessage
+from tools.scoring_tool import score_scenario, score_simulations
+
+
+class Outbox:
+    """Stands in for the bus; keeps what the agent sends."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, msg):
+        self.sent.append(msg)
+
+
+def _simulations(n, seed):
+    rng = random.Random(seed)
+    # Few distinct values, so many results tie on score
+    return [
+        {
+            "co2_reduction_percent": rng.choice([10.0, 25.0, 40.0]),
+            "total_cost_usd": rng.choice([2e8, 5e8, 9e8]),
+            "estimated_jobs_change_percent": rng.choice([0.0, -0.5, -2.0]),
+            "cumulative_reduction_percent": rng.choice([8.0, 20.0]),
+        }
+        for _ in range(n)
+    ]
+
+
+def _feed(agent, policy, region, simulations, seed):
+    """Send every result in random singles and batches; return the scores in arrival order."""
+    rng = random.Random(seed)
+    bus = Outbox()
+    scenarios = [{"scenario_id": f"S{i}", "actions": []} for i in range(len(simulations))]
+    count = {"count": len(scenarios)}
+    agent.handle_message(AgentMessage("ScenarioAgent", "EvaluationAgent", "SCENARIO_COUNT", count, "s1"), bus)
+
+    scores = []
+    start = 0
+    while start < len(scenarios):
+        size = rng.choice([1, 1, 3, 7, 16])
+        chunk, sims = scenarios[start : start + size], simulations[start : start + size]
+        if size == 1:
+            payload = {"policy": policy, "region": region, "scenario": chunk[0], "simulation": sims[0]}
+            agent.handle_message(
+                AgentMessage("SimulationAgent", "EvaluationAgent", "SIM_RESULT", payload, "s1"), bus
+            )
+            scores.append(score_scenario(policy, sims[0], None, agent.score_basis))
+        else:
+            payload = {"policy": policy, "region": region, "scenarios": chunk, "simulations": sims}
+            agent.handle_message(
+                AgentMessage("SimulationAgent", "EvaluationAgent", "SIM_RESULT_BATCH", payload, "s1"), bus
+            )
+            scores.extend(score_simulations(policy, sims, None, agent.score_basis).tolist())
+        start += size
+
+    assert [m.type for m in bus.sent] == ["EVAL_SUMMARY"]
+    return scores, bus.sent[0].payload
+
+
+@pytest.mark.parametrize("basis", ["final", "cumulative"])
+@pytest.mark.parametrize("top_k", [0, 1, 5, 200])
+@pytest.mark.parametrize("seed", range(4))
+def test_top_k_matches_full_sort(policy, basis, top_k, seed):
+    n = 150
+    simulations = _simulations(n, seed)
+    agent = EvaluationAgent(top_k=top_k, score_basis=basis)
+    scores, summary = _feed(agent, policy, {"region_id": policy["region_id"]}, simulations, seed)
+
+    # Stable sort: equal scores keep arrival order
+    order = sorted(range(n), key=lambda i: -scores[i])
+    if top_k > 0:
+        order = order[:top_k]
+    ranked = summary["ranked_scenarios"]
+    assert [entry["scenario"]["scenario_id"] for entry in ranked] == [f"S{i}" for i in order]
+    assert [entry["score"] for entry in ranked] == [scores[i] for i in order]
+    assert len(set(scores)) < n  # ties were exercised
+
+    best = summary["best_scenario"]
+    assert best["scenario"]["scenario_id"] == f"S{order[0]}"
+    assert best["score"] == max(scores)
+
+
+@pytest.mark.parametrize("top_k", [0, 3])
+def test_running_metrics_equal_batch_values(policy, top_k):
+    simulations = _simulations(300, seed=11)
+    _, summary = _feed(EvaluationAgent(top_k=top_k), policy, {}, simulations, seed=11)
+
+    co2 = np.array([s["co2_reduction_percent"] for s in simulations])
+    cost = np.array([s["total_cost_usd"] for s in simulations])
+    metrics = summary["metrics"]
+    assert metrics["num_scenarios"] == 300
+    assert metrics["num_failed"] == 0
+    assert metrics["avg_co2_reduction_percent"] == pytest.approx(co2.mean())
+    assert metrics["avg_total_cost_usd"] == pytest.approx(cost.mean())
+    assert metrics["max_co2_reduction_percent"] == co2.max()
+    assert metrics["min_total_cost_usd"] == cost.min()
@@ -0,0 +1,183 @@
+"""
+Long-term memory: running aggregates stay exact across appends, process
+restarts, torn writes and concurrent writers.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import threading
+
+import pytest
+
+import tools.memory_tool as memory_tool
+
+
+@pytest.fixture
+def memory(isolated_storage, monkeypatch):
+    monkeypatch.setattr(memory_tool, "_STATS_CACHE", {})
+    monkeypatch.setattr(memory_tool, "_CHECKPOINTS", {})
+    monkeypatch.setattr(memory_tool, "_LEGACY_CHECKED", set())
+    return memory_tool
+
+
+def _append(memory, i, region="r1"):
+    memory.append_session_summary(f"s{i}", region, float(i), 100.0 * i, float(i))
+
+
+def _forget_process_state(memory):
+    """Simulate a fresh process: drop the in-memory aggregates."""
+    memory._STATS_CACHE.clear()
+    memory._CHECKPOINTS.clear()
+
+
+def test_aggregates_match_appends(memory):
+    for i in range(1, 11):
+        _append(memory, i, region=f"r{i % 3}")
+
+    summary = memory.summarize_patterns()
+    assert summary["num_sessions"] == 10
+    assert summary["avg_co2_reduction_percent"] == pytest.approx(5.5)
+    assert summary["best_score"] == 10.0
+    assert sum(r["num_sessions"] for r in summary["per_region"].values()) == 10
+    assert [s["session_id"] for s in memory.get_recent_summaries(3)] == ["s8", "s9", "s10"]
+
+
+def test_append_does_not_rewrite_sidecar(memory, monkeypatch):
+    writes = []
+    real_write = memory._write_json_atomic
+    monkeypatch.setattr(memory, "_write_json_atomic", lambda *a: (writes.append(a), real_write(*a)))
+
+    for i in range(50):
+        _append(memory, i)
+
+    assert writes == []
+    memory._checkpoint_at_exit()
+    with memory.LONG_TERM_STATS.open() as f:
+        assert json.load(f)["num_sessions"] == 50
+
+
+def test_restart_replays_tail_past_sidecar(memory):
+    for i in range(5):
+        _append(memory, i)
+    memory._checkpoint_at_exit()
+    for i in range(5, 8):
+        _append(memory, i)
+
+    _forget_process_state(memory)
+    assert memory.summarize_patterns()["num_sessions"] == 8
+
+
+def test_torn_last_line_is_truncated(memory):
+    for i in range(3):
+        _append(memory, i)
+    size = memory.LONG_TERM_LOG.stat().st_size
+    with memory.LONG_TERM_LOG.open("ab") as f:
+        f.write(b'{"session_id": "torn", "regi')
+
+    _forget_process_state(memory)
+    _append(memory, 3)
+
+    lines = memory.LONG_TERM_LOG.read_bytes().splitlines()
+    assert len(lines) == 4
+    assert json.loads(lines[-1])["session_id"] == "s3"
+    assert memory.LONG_TERM_LOG.stat().st_size > size
+    assert memory.summarize_patterns()["num_sessions"] == 4
+
+
+def test_stale_offset_after_compaction_elsewhere(memory):
+    for i in range(6):
+        _append(memory, i % 3)  # s0..s2 twice
+    # This process caches aggregates covering the uncompacted log
+    stale = memory._STATS_CACHE[str(memory.LONG_TERM_LOG)]
+
+    # Another process compacts and appends until the log outgrows the stale offset
+    _forget_process_state(memory)
+    memory.compact_long_term()
+    i = 100
+    while memory.LONG_TERM_LOG.stat().st_size <= stale["log_size"]:
+        _append(memory, i)
+        i += 1
+    expected = memory.summarize_patterns()
+
+    memory._STATS_CACHE[str(memory.LONG_TERM_LOG)] = stale
+    assert memory.summarize_patterns() == expected
+    assert expected["num_sessions"] == 3 + (i - 100)
+
+
+def _hold_lock_mid_append(started, release):
+    with memory_tool._log_lock():
+        with memory_tool.LONG_TERM_LOG.open("ab", buffering=0) as f:
+            f.write(b'{"session_id": "slow", "region_id": "r1", ')
+            started.set()
+            release.wait(30)
+            f.write(b'"co2_reduction_percent": 1.0, "total_cost_usd": 1.0, "score": 1.0}\n')
+
+
+@pytest.mark.skipif(
+    memory_tool.fcntl is None or "fork" not in multiprocessing.get_all_start_methods(),
+    reason="needs flock and fork",
+)
+def test_in_progress_append_is_not_truncated(memory):
+    _append(memory, 0)
+    _forget_process_state(memory)
+    ctx = multiprocessing.get_context("fork")
+    started, release = ctx.Event(), ctx.Event()
+    writer = ctx.Process(target=_hold_lock_mid_append, args=(started, release))
+    writer.start()
+    assert started.wait(30)
+
+    appender = threading.Thread(target=_append, args=(memory, 1))
+    appender.start()
+    appender.join(0.5)
+    assert appender.is_alive()  # waiting for the writer's lock, not truncating its line
+    release.set()
+    writer.join(30)
+    appender.join(30)
+    assert writer.exitcode == 0
+
+    sessions = [json.loads(line)["session_id"] for line in memory.LONG_TERM_LOG.read_bytes().splitlines()]
+    assert sessions == ["s0", "slow", "s1"]
+    assert memory.summarize_patterns()["num_sessions"] == 3
+
+
+def test_unreadable_legacy_file_warned_once(memory, caplog):
+    memory.LONG_TERM_FILE.parent.mkdir(parents=True, exist_ok=True)
+    memory.LONG_TERM_FILE.write_text("")
+
+    with caplog.at_level(logging.WARNING, logger=memory.__name__):
+        for _ in range(3):
+            assert memory.get_recent_summaries() == []
+            assert memory.summarize_patterns()["num_sessions"] == 0
+    assert len([r for r in caplog.records if "legacy" in r.getMessage()]) == 1
+
+
+def _append_many(start, count):
+    for i in range(start, start + count):
+        _append(memory_tool, i)
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork to share patched paths"
+)
+def test_concurrent_processes(memory):
+    _append(memory, 0)
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_append_many, args=(1 + 100 * w, 100)) for w in range(4)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(timeout=60)
+        assert w.exitcode == 0
+    _append(memory, 1000)
+
+    summary = memory.summarize_patterns()
+    assert summary["num_sessions"] == 402
+    expected = (0 + sum(range(1, 401)) + 1000) / 402
+    assert summary["avg_co2_reduction_percent"] == pytest.approx(expected)
+
+    # A fresh process rebuilding from the log agrees
+    _forget_process_state(memory)
+    assert memory.summarize_patterns() == summary
@@ -0,0 +1,192 @@
+"""
+MessageBus backpressure: with a high-water mark set, no (receiver,
+session) lane may ever hold more than the mark, in concurrent mode or when
+a serial run loop's flush() sends into a full lane.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from core.message_bus import MessageBus
+from core.models import AgentMessage
+from core.scheduler import SCHEDULER_POLICIES, make_scheduler
+
+MARK = 8
+FAN_OUT = 200
+
+
+class Producer:
+    """Fans one START out into FAN_OUT WORK messages."""
+
+    thread_safe = True
+
+    def handle_message(self, msg, bus):
+        for i in range(FAN_OUT):
+            bus.send(AgentMessage("Producer", "Worker", "WORK", {"i": i}, msg.session_id))
+
+
+class Worker:
+    """Forwards every WORK message to the Collector."""
+
+    thread_safe = True
+
+    def handle_message(self, msg, bus):
+        bus.send(AgentMessage("Worker", "Collector", "DONE", msg.payload, msg.session_id))
+
+
+class Collector:
+    """Counts DONE messages per session."""
+
+    thread_safe = True
+    session_ordered = True
+
+    def __init__(self):
+        self.seen = {}
+        self._lock = threading.Lock()
+
+    def handle_message(self, msg, bus):
+        with self._lock:
+            self.seen[msg.session_id] = self.seen.get(msg.session_id, 0) + 1
+
+
+def _make_bus(max_workers, scheduler="fair"):
+    bus = MessageBus(
+        max_workers=max_workers,
+        high_water_marks={"*": MARK},
+        scheduler=make_scheduler(scheduler),
+    )
+    collector = Collector()
+    bus.register_agent("Producer", Producer())
+    bus.register_agent("Worker", Worker())
+    bus.register_agent("Collector", collector)
+    return bus, collector
+
+
+def _start(bus, session_id):
+    bus.send(AgentMessage("User", "Producer", "START", {}, session_id))
+
+
+def _assert_bounded(bus):
+    stats = bus.stats()
+    assert stats["overflows"] == {}
+    for receiver, peak in stats["peak_lane_depth"].items():
+        assert peak <= MARK, f"{receiver} lane reached {peak} > {MARK}"
+
+
+@pytest.mark.parametrize("max_workers", [1, 2, 4])
+@pytest.mark.parametrize("scheduler", SCHEDULER_POLICIES)
+def test_lane_depth_never_exceeds_mark(max_workers, scheduler):
+    bus, collector = _make_bus(max_workers, scheduler)
+    sessions = [f"s{i}" for i in range(6)]
+    try:
+        for session_id in sessions:
+            _start(bus, session_id)
+        bus.run()
+    finally:
+        bus.close()
+
+    assert collector.seen == {session_id: FAN_OUT for session_id in sessions}
+    assert bus.stats()["throttled"]
+    _assert_bounded(bus)
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_lane_depth_bounded_with_per_session_run_loops(max_workers):
+    bus, collector = _make_bus(max_workers)
+    sessions = [f"s{i}" for i in range(6)]
+    errors = []
+
+    def run_session(session_id):
+        try:
+            _start(bus, session_id)
+            bus.run(session_id=session_id)
+        except Exception as exc:  # pragma: no cover - surfaced below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=run_session, args=(s,)) for s in sessions]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=60)
+        assert not any(t.is_alive() for t in threads), "run() loops deadlocked"
+    finally:
+        bus.close()
+
+    assert not errors
+    assert collector.seen == {session_id: FAN_OUT for session_id in sessions}
+    _assert_bounded(bus)
+
+
+def test_agent_pipeline_respects_mark(isolated_storage):
+    from core.agent_system import AgentSystem
+
+    with AgentSystem(max_sessions=4, bus_workers=4, high_water_mark=MARK) as system:
+        futures = [system.submit("Cut emissions 30% under budget", seed=i) for i in range(4)]
+        session_ids = [f.result(timeout=120) for f in futures]
+        stats = system.bus.stats()
+
+    assert len(set(session_ids)) == 4
+    assert stats["overflows"] == {}
+    assert all(peak <= MARK for peak in stats["peak_lane_depth"].values())
+
+
+
+class BufferingProducer:
+    """Buffers each START and fans it out into FAN_OUT WORK messages from flush()."""
+
+    thread_safe = True
+
+    def __init__(self):
+        self.buffered = []
+        self._lock = threading.Lock()
+
+    def handle_message(self, msg, bus):
+        with self._lock:
+            self.buffered.append(msg.session_id)
+
+    def flush(self, session_id, bus):
+        with self._lock:
+            ready = [s for s in self.buffered if session_id is None or s == session_id]
+            self.buffered = [s for s in self.buffered if s not in ready]
+        for sid in ready:
+            for i in range(FAN_OUT):
+                bus.send(AgentMessage("Producer", "Worker", "WORK", {"i": i}, sid))
+        return bool(ready)
+
+
+@pytest.mark.parametrize("per_session", [False, True])
+def test_serial_bus_flush_into_full_lane(per_session):
+    bus, collector = _make_bus(0)
+    bus.register_agent("Producer", BufferingProducer())
+    sessions = [f"s{i}" for i in range(6)]
+    errors = []
+
+    def run(session_id):
+        try:
+            if session_id is not None:
+                _start(bus, session_id)
+            bus.run(session_id=session_id)
+        except Exception as exc:  # pragma: no cover - surfaced below
+            errors.append(exc)
+
+    if per_session:
+        threads = [threading.Thread(target=run, args=(s,), daemon=True) for s in sessions]
+    else:
+        for session_id in sessions:
+            _start(bus, session_id)
+        threads = [threading.Thread(target=run, args=(None,), daemon=True)]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 60
+    for t in threads:
+        t.join(timeout=max(0.0, deadline - time.monotonic()))
+    assert not any(t.is_alive() for t in threads), "flush() deadlocked the run loop"
+
+    assert not errors
+    assert collector.seen == {session_id: FAN_OUT for session_id in sessions}
+    _assert_bounded(bus)
@@ -0,0 +1,69 @@
+"""
+simulate_monte_carlo: p5/p50/p95 are reproducible under a fixed seed and
+do not depend on how scenarios are batched.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from tools.intervention_tool import UNCERTAIN_COLUMNS
+from tools.simulation_tool import simulate_batch, simulate_monte_carlo, unpack_monte_carlo
+
+
+@pytest.fixture
+def scenarios(make_scenarios):
+    return make_scenarios(40, min_actions=3, max_actions=3)
+
+
+def _assert_identical(a, b):
+    assert a.keys() == b.keys()
+    for key in a:
+        np.testing.assert_array_equal(a[key], b[key], err_msg=key)
+
+
+def test_same_seed_same_percentiles(region, scenarios, catalog):
+    first = simulate_monte_carlo(region, scenarios, catalog, draws=500, seed=42)
+    second = simulate_monte_carlo(region, scenarios, catalog, draws=500, seed=42)
+    _assert_identical(first, second)
+
+    other = simulate_monte_carlo(region, scenarios, catalog, draws=500, seed=43)
+    assert not np.array_equal(first["total_cost_usd"], other["total_cost_usd"])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 256])
+def test_independent_of_chunking_and_batch(region, scenarios, catalog, chunk_size):
+    full = simulate_monte_carlo(region, scenarios, catalog, draws=300, seed=7)
+    chunked = simulate_monte_carlo(region, scenarios, catalog, draws=300, seed=7, chunk_size=chunk_size)
+    _assert_identical(full, chunked)
+
+    # A scenario's percentiles don't depend on the other scenarios in its batch
+    subset = scenarios[5:12]
+    alone = simulate_monte_carlo(region, subset, catalog, draws=300, seed=7)
+    _assert_identical(alone, {key: values[5:12] for key, values in full.items()})
+
+
+def test_percentiles_are_ordered(region, scenarios, catalog):
+    mc = simulate_monte_carlo(region, scenarios, catalog, draws=500, seed=0)
+    for key, values in mc.items():
+        assert np.all(np.diff(values, axis=1) >= 0), key
+
+    unpacked = unpack_monte_carlo(mc)
+    assert len(unpacked) == len(scenarios)
+    assert set(unpacked[0]["co2_reduction_percent"]) == {"p5", "p50", "p95"}
+
+
+def test_no_uncertainty_collapses_to_point_estimate(region, scenarios, catalog):
+    # Plain dict catalog without *_low / *_high bounds: every draw is the mode
+    plain = {
+        iv_id: {key: value for key, value in iv.items() if not key.endswith(("_low", "_high"))}
+        for iv_id, iv in catalog.items()
+    }
+    assert not any(f"{UNCERTAIN_COLUMNS[0]}_low" in iv for iv in plain.values())
+
+    mc = simulate_monte_carlo(region, scenarios, plain, draws=50, seed=1)
+    point = simulate_batch(region, scenarios, plain)
+    for key in ("projected_emissions_mtco2", "co2_reduction_percent", "total_cost_usd"):
+        for col in range(mc[key].shape[1]):
+            np.testing.assert_allclose(mc[key][:, col], point[key], rtol=1e-12, err_msg=key)
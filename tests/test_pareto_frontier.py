@@ -0,0 +1,61 @@
+"""
+pareto_frontier against an O(n^2) brute force, including ties and
+duplicates.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from tools.scoring_tool import pareto_frontier
+
+
+def _dominates(a, b):
+    """a = (reduction, cost, jobs) dominates b."""
+    at_least = a[0] >= b[0] and a[1] <= b[1] and a[2] >= b[2]
+    return at_least and (a[0] > b[0] or a[1] < b[1] or a[2] > b[2])
+
+
+def _brute_force(reduction, cost, jobs):
+    points = list(zip(reduction.tolist(), cost.tolist(), jobs.tolist()))
+    keep = set()
+    for i, p in enumerate(points):
+        if any(_dominates(q, p) for q in points):
+            continue
+        # Of identical points only the first is kept
+        if any(points[k] == p for k in range(i)):
+            continue
+        keep.add(i)
+    return keep
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("n", [1, 2, 10, 200])
+def test_matches_brute_force(seed, n):
+    rng = np.random.default_rng(seed)
+    # Few distinct values, so ties on every axis are common
+    reduction = rng.integers(0, 8, n).astype(np.float64)
+    cost = rng.integers(0, 8, n).astype(np.float64)
+    jobs = rng.integers(-4, 4, n).astype(np.float64)
+
+    frontier = pareto_frontier(reduction, cost, jobs)
+    assert set(frontier.tolist()) == _brute_force(reduction, cost, jobs)
+    assert len(frontier) == len(set(frontier.tolist()))
+    # Best reduction first
+    assert np.all(np.diff(reduction[frontier]) <= 0)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_continuous_values(seed):
+    rng = np.random.default_rng(seed)
+    reduction, cost, jobs = rng.normal(size=(3, 500))
+    assert set(pareto_frontier(reduction, cost, jobs).tolist()) == _brute_force(reduction, cost, jobs)
+
+
+def test_edge_cases():
+    assert pareto_frontier([], [], []).tolist() == []
+    # All identical: the first survives
+    assert pareto_frontier([1.0] * 4, [2.0] * 4, [0.0] * 4).tolist() == [0]
+    # A pure trade-off keeps everything, best reduction first
+    assert pareto_frontier([1.0, 2.0, 3.0], [1.0, 2.0, 3.0], [0.0, 0.0, 0.0]).tolist() == [2, 1, 0]
@@ -0,0 +1,59 @@
+"""
+ReportAgent's emissions pathway: the best scenario's year-by-year section
+matches simulate_trajectory over the policy's horizon, and is left out
+when the session ran without trajectories.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from agents.scenario_agent import ScenarioAgent
+from agents.simulation_agent import SimulationAgent
+from core.agent_system import AgentSystem
+from tools.intervention_tool import get_catalog
+from tools.simulation_tool import simulate_trajectory
+from tools.storage_tool import load_report
+
+GOAL = "Cut emissions 30% under budget"
+
+
+def _report(trajectory, sim_backend="inline"):
+    with AgentSystem(max_sessions=1) as system:
+        system.bus.register_agent("ScenarioAgent", ScenarioAgent(num_scenarios=20, result_cache=False))
+        system.bus.register_agent(
+            "SimulationAgent", SimulationAgent(backend=sim_backend, chunk_size=4, trajectory=trajectory)
+        )
+        session_id = system.submit(GOAL, seed=3).result(timeout=60)
+    return load_report(session_id)
+
+
+@pytest.mark.parametrize("sim_backend", ["inline", "thread"])
+def test_pathway_matches_simulate_trajectory(isolated_storage, sim_backend):
+    report = _report(True, sim_backend)
+    best = report["best_scenario"]
+    sim = best["simulation"]
+    years = best["policy"]["time_horizon_years"]
+
+    expected = simulate_trajectory(best["region"], [best["scenario"]], get_catalog(), years)
+    pathway = sim["trajectory"]
+    assert pathway["year"] == list(range(1, years + 1))
+    for key in ("emissions_mtco2", "cumulative_cost_usd", "jobs_change_percent"):
+        np.testing.assert_allclose(pathway[key], expected[key][0], rtol=1e-12)
+    assert sim["cumulative_emissions_mtco2"] == pytest.approx(expected["cumulative_emissions_mtco2"][0])
+    assert sim["cumulative_reduction_percent"] == pytest.approx(expected["cumulative_reduction_percent"][0])
+
+    body = report["body"]
+    assert "Emissions Pathway:" in body
+    for year in (1, years):
+        emissions = expected["emissions_mtco2"][0][year - 1]
+        cost = expected["cumulative_cost_usd"][0][year - 1]
+        assert f"- Year {year}: {emissions:.2f} MtCO2, cumulative cost ${cost:,.0f}," in body
+    assert f"({expected['cumulative_reduction_percent'][0]:.1f}% below baseline)" in body
+
+
+def test_no_pathway_without_trajectory(isolated_storage):
+    report = _report(False)
+    assert "trajectory" not in report["best_scenario"]["simulation"]
+    assert "Emissions Pathway:" not in report["body"]
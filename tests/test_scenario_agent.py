@@ -0,0 +1,96 @@
+"""
+ScenarioAgent's evolutionary strategy: portfolios stream to SimulationAgent
+while the search is still running, on the serial bus too, and every sent
+portfolio is evaluated once the search ends.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+import agents.scenario_agent as scenario_agent
+from agents.evaluation_agent import EvaluationAgent
+from agents.scenario_agent import ScenarioAgent
+from agents.simulation_agent import SimulationAgent
+from core.agent_system import AgentSystem
+from core.message_bus import MessageBus
+from core.models import AgentMessage
+from tools.storage_tool import load_report
+
+
+class Recorder:
+    """Logs the type of every message it receives."""
+
+    thread_safe = True
+
+    def __init__(self, name, log):
+        self.name = name
+        self.log = log
+
+    def handle_message(self, msg, bus):
+        self.log.append((self.name, msg.type))
+
+
+@pytest.fixture
+def log(monkeypatch):
+    """Event log; also records each step and the end of the evolutionary search."""
+    events = []
+    real = scenario_agent.evolutionary_search
+
+    def logged(*args, **kwargs):
+        for improved in real(*args, **kwargs):
+            events.append(("search", "step"))
+            yield improved
+        events.append(("search", "done"))
+
+    monkeypatch.setattr(scenario_agent, "evolutionary_search", logged)
+    return events
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+def test_streams_before_search_ends(policy, region, catalog, log, max_workers):
+    bus = MessageBus(max_workers=max_workers)
+    bus.register_agent(
+        "ScenarioAgent",
+        ScenarioAgent(strategy="evolutionary", population=8, generations=30, batch_size=0, result_cache=False),
+    )
+    bus.register_agent("SimulationAgent", Recorder("sim", log))
+    bus.register_agent("EvaluationAgent", Recorder("eval", log))
+
+    bus.send(AgentMessage("DataAgent", "ScenarioAgent", "REGION_CONTEXT", {"policy": policy, "region": region}, "s1"))
+    try:
+        bus.run()
+    finally:
+        bus.close()
+
+    done = log.index(("search", "done"))
+    sent = log.count(("sim", "SCENARIO"))
+    assert log.count(("search", "step")) > 1
+    assert ("sim", "SCENARIO") in log[:done], "nothing was dispatched while the search ran"
+    assert log[-1] == ("eval", "SCENARIO_COUNT")
+    assert sent > 0
+    assert not bus.agents["ScenarioAgent"]._searches
+
+
+@pytest.mark.parametrize("basis", ["final", "cumulative"])
+def test_evolutionary_session_evaluates_every_portfolio(isolated_storage, basis):
+    with AgentSystem(max_sessions=1) as system:
+        system.bus.register_agent(
+            "ScenarioAgent",
+            ScenarioAgent(
+                strategy="evolutionary",
+                num_scenarios=4,
+                population=12,
+                generations=15,
+                result_cache=False,
+                score_basis=basis,
+            ),
+        )
+        system.bus.register_agent("SimulationAgent", SimulationAgent(trajectory=basis == "cumulative"))
+        system.bus.register_agent("EvaluationAgent", EvaluationAgent(score_basis=basis))
+        session_id = system.run_session("Cut emissions 30% under budget", seed=3)
+
+    report = load_report(session_id)
+    assert report["best_scenario"]
+    assert report["metrics"]["num_failed"] == 0
+    assert report["metrics"]["num_scenarios"] >= 4
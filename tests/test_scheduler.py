@@ -0,0 +1,162 @@
+"""
+Scheduler invariants: every message is dispatched exactly once, counts
+stay consistent, and each policy keeps its ordering guarantees.
+"""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from core.models import AgentMessage
+from core.scheduler import (
+    DEFAULT_PRIORITY,
+    DOWNSTREAM_PRIORITIES,
+    SCHEDULER_POLICIES,
+    PriorityScheduler,
+    Scheduler,
+    make_scheduler,
+)
+
+TYPES = list(DOWNSTREAM_PRIORITIES) + ["CUSTOM"]
+
+
+def _msg(session_id, seq, msg_type="SIM_RESULT"):
+    return AgentMessage("A", "B", msg_type, {"seq": seq}, session_id)
+
+
+def _level(msg):
+    return DOWNSTREAM_PRIORITIES.get(msg.type, DEFAULT_PRIORITY)
+
+
+def test_scheduler_is_abstract():
+    with pytest.raises(TypeError):
+        Scheduler()  # type: ignore[abstract]
+
+    class Partial(Scheduler):
+        def push(self, msg):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()  # type: ignore[abstract]
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        make_scheduler("lifo")
+
+
+@pytest.mark.parametrize("policy", SCHEDULER_POLICIES)
+@pytest.mark.parametrize("seed", range(5))
+def test_every_message_dispatched_once(policy, seed):
+    rng = random.Random(seed)
+    scheduler = make_scheduler(policy)
+    sessions = [f"s{i}" for i in range(5)]
+    pushed = {}
+    popped = []
+    seq = 0
+
+    # Interleave pushes with both pop modes
+    for _ in range(2000):
+        if rng.random() < 0.6:
+            msg = _msg(rng.choice(sessions), seq, rng.choice(TYPES))
+            seq += 1
+            pushed[msg.payload["seq"]] = msg
+            scheduler.push(msg)
+        else:
+            session_id = rng.choice(sessions + [None])
+            if session_id is not None:
+                expected = scheduler.peek(session_id)
+            msg = scheduler.pop(session_id)
+            if session_id is not None:
+                assert msg is expected
+            if msg is not None:
+                assert session_id is None or msg.session_id == session_id
+                popped.append(msg)
+
+        in_queue = len(pushed) - len(popped)
+        assert len(scheduler) == scheduler.pending() == in_queue
+        assert sum(scheduler.pending(s) for s in sessions) == in_queue
+
+    while (msg := scheduler.pop()) is not None:
+        popped.append(msg)
+
+    assert sorted(m.payload["seq"] for m in popped) == sorted(pushed)
+    assert len(scheduler) == 0
+    assert all(scheduler.peek(s) is None and scheduler.pop(s) is None for s in sessions)
+
+
+@pytest.mark.parametrize("policy", SCHEDULER_POLICIES)
+def test_fifo_within_session_and_level(policy):
+    rng = random.Random(1)
+    scheduler = make_scheduler(policy)
+    for seq in range(500):
+        scheduler.push(_msg(f"s{rng.randrange(4)}", seq, rng.choice(TYPES)))
+
+    last = {}
+    while (msg := scheduler.pop()) is not None:
+        key = (msg.session_id, _level(msg)) if policy in ("downstream", "fair-downstream") else msg.session_id
+        assert msg.payload["seq"] > last.get(key, -1)
+        last[key] = msg.payload["seq"]
+
+
+def test_fair_round_robin():
+    scheduler = make_scheduler("fair")
+    # One session floods the queue before the others arrive
+    for seq in range(100):
+        scheduler.push(_msg("big", seq))
+    scheduler.push(_msg("a", 100))
+    scheduler.push(_msg("b", 101))
+
+    first = [scheduler.pop().session_id for _ in range(4)]
+    assert first == ["big", "a", "b", "big"]
+
+
+def test_fifo_global_arrival_order():
+    rng = random.Random(2)
+    scheduler = make_scheduler("fifo")
+    for seq in range(300):
+        scheduler.push(_msg(f"s{rng.randrange(5)}", seq))
+    # Popping one session directly must not disturb the global order of the rest
+    direct = [scheduler.pop("s0") for _ in range(10)]
+    assert all(m.session_id == "s0" for m in direct)
+
+    order = []
+    while (msg := scheduler.pop()) is not None:
+        order.append(msg.payload["seq"])
+    assert order == sorted(order)
+
+
+def test_downstream_serves_lowest_level_first():
+    rng = random.Random(3)
+    scheduler = make_scheduler("downstream")
+    for seq in range(300):
+        scheduler.push(_msg(f"s{rng.randrange(5)}", seq, rng.choice(TYPES)))
+
+    levels = []
+    while (msg := scheduler.pop()) is not None:
+        levels.append(_level(msg))
+    assert levels == sorted(levels)
+
+
+def test_fair_downstream_round_robin_with_per_session_priority():
+    scheduler = make_scheduler("fair-downstream")
+    for session_id in ("a", "b"):
+        scheduler.push(_msg(session_id, 0, "START"))
+        scheduler.push(_msg(session_id, 1, "REPORT_READY"))
+
+    popped = [(m.session_id, m.type) for m in iter(scheduler.pop, None)]
+    assert popped == [("a", "REPORT_READY"), ("b", "REPORT_READY"), ("a", "START"), ("b", "START")]
+
+
+def test_session_priority_offset():
+    scheduler = PriorityScheduler()
+    scheduler.set_session_priority("urgent", -10)
+    scheduler.push(_msg("normal", 0, "REPORT_READY"))
+    scheduler.push(_msg("urgent", 1, "START"))
+    assert scheduler.pop().session_id == "urgent"
+
+    scheduler.set_session_priority("urgent", 0)
+    scheduler.push(_msg("urgent", 2, "START"))
+    assert scheduler.pop().session_id == "normal"
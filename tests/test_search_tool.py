@@ -0,0 +1,140 @@
+"""
+Portfolio search scores on the pipeline's basis: branch_and_bound,
+hill_climb and evolutionary_search agree with simulating and scoring every
+portfolio the way SimulationAgent and EvaluationAgent do, on the final and
+cumulative bases.
+"""
+
+from __future__ import annotations
+
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from agents.scenario_agent import ScenarioAgent
+from agents.simulation_agent import _simulate_chunk
+from tools.intervention_tool import InterventionCatalog
+from tools.scoring_tool import ScoringWeights, score_simulations
+from tools.search_tool import branch_and_bound, evolutionary_search, hill_climb
+from tools.simulation_tool import SCALE_FACTORS
+
+WEIGHTS = ScoringWeights(reduction=2.0, budget=30.0, jobs=5.0)
+BASES = ["final", "cumulative"]
+
+
+def _brute_force(policy, region, catalog, max_actions, basis):
+    """Every portfolio of 1..max_actions distinct interventions, scored as the pipeline does."""
+    portfolios = []
+    for k in range(1, max_actions + 1):
+        for ids in itertools.combinations(catalog.ids, k):
+            for labels in itertools.product(SCALE_FACTORS, repeat=k):
+                portfolios.append([{"id": iv_id, "scale": label} for iv_id, label in zip(ids, labels)])
+    years = policy["time_horizon_years"] if basis == "cumulative" else 0
+    scenarios = [{"scenario_id": f"S{i}", "actions": actions} for i, actions in enumerate(portfolios)]
+    scores = score_simulations(policy, _simulate_chunk(region, scenarios, catalog, years=years), WEIGHTS, basis)
+    return portfolios, scores
+
+
+def _key(actions):
+    return tuple(sorted((action["id"], action["scale"]) for action in actions))
+
+
+def _scaled(catalog, factor, negative=None):
+    """The catalog with reductions scaled by `factor`, optionally one made negative."""
+    rows = []
+    for iv_id in catalog.ids:
+        row = dict(catalog[iv_id])
+        for key in [k for k in row if k.startswith("base_reduction_percent_per_unit")]:
+            row[key] = row[key] * (-factor if iv_id == negative else factor)
+        rows.append(row)
+    return InterventionCatalog(rows, version=f"{catalog.version}-x{factor}-{negative}")
+
+
+@pytest.fixture(params=["sample", "clipped", "negative"])
+def search_catalog(request, catalog):
+    if request.param == "sample":
+        return catalog
+    # Strong enough that some portfolios cut more than the baseline in some years
+    return _scaled(catalog, 12.0, catalog.ids[1] if request.param == "negative" else None)
+
+
+@pytest.mark.parametrize("basis", BASES)
+def test_branch_and_bound_matches_brute_force(policy, region, search_catalog, basis):
+    portfolios, scores = _brute_force(policy, region, search_catalog, 3, basis)
+    ranked = branch_and_bound(region, policy, search_catalog, top_n=5, max_actions=3, weights=WEIGHTS, basis=basis)
+
+    expected = np.sort(scores)[::-1][:5]
+    np.testing.assert_allclose([score for score, _ in ranked], expected, rtol=1e-9, atol=1e-9)
+    by_portfolio = {_key(p): s for p, s in zip(portfolios, scores.tolist())}
+    for score, actions in ranked:
+        assert by_portfolio[_key(actions)] == pytest.approx(score, rel=1e-9)
+
+
+@pytest.mark.parametrize("basis", BASES)
+def test_hill_climb_scores_on_basis(policy, region, search_catalog, basis):
+    portfolios, scores = _brute_force(policy, region, search_catalog, 3, basis)
+    ranked = hill_climb(
+        region,
+        policy,
+        search_catalog,
+        top_n=3,
+        max_actions=3,
+        restarts=20,
+        weights=WEIGHTS,
+        rng=random.Random(1),
+        basis=basis,
+    )
+
+    # Small catalog: local search from 20 starts finds the optimum
+    assert ranked[0][0] == pytest.approx(scores.max(), rel=1e-9)
+    by_portfolio = {_key(p): s for p, s in zip(portfolios, scores.tolist())}
+    for score, actions in ranked:
+        assert by_portfolio[_key(actions)] == pytest.approx(score, rel=1e-9)
+
+
+@pytest.mark.parametrize("basis", BASES)
+def test_evolutionary_search_scores_on_basis(policy, region, search_catalog, basis):
+    portfolios, scores = _brute_force(policy, region, search_catalog, 3, basis)
+    by_portfolio = {_key(p): s for p, s in zip(portfolios, scores.tolist())}
+    streamed = [
+        entry
+        for improved in evolutionary_search(
+            region,
+            policy,
+            search_catalog,
+            top_n=3,
+            max_actions=3,
+            population=16,
+            generations=10,
+            weights=WEIGHTS,
+            rng=random.Random(2),
+            basis=basis,
+        )
+        for entry in improved
+    ]
+
+    assert streamed
+    for score, actions in streamed:
+        assert by_portfolio[_key(actions)] == pytest.approx(score, rel=1e-9)
+
+
+def test_cumulative_basis_changes_the_optimum(policy, region, catalog):
+    # Slow ramps count for less over the horizon than at the end state
+    final = branch_and_bound(region, policy, catalog, top_n=10, max_actions=2, weights=WEIGHTS)
+    cumulative = branch_and_bound(
+        region, policy, catalog, top_n=10, max_actions=2, weights=WEIGHTS, basis="cumulative"
+    )
+    assert [a for _, a in final] != [a for _, a in cumulative]
+
+
+def test_unknown_basis(policy, region, catalog):
+    with pytest.raises(ValueError):
+        branch_and_bound(region, policy, catalog, basis="average")
+    with pytest.raises(ValueError):
+        hill_climb(region, policy, catalog, basis="average")
+    with pytest.raises(ValueError):
+        next(evolutionary_search(region, policy, catalog, basis="average"))
+    with pytest.raises(ValueError):
+        ScenarioAgent(score_basis="average")
@@ -0,0 +1,89 @@
+"""
+sensitivity_tool scores like EvaluationAgent: same basis, same weights,
+same best scenario; perturbed scores match re-simulating a modified
+catalog.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from agents.evaluation_agent import EvaluationAgent
+from agents.scenario_agent import ScenarioAgent
+from agents.simulation_agent import SimulationAgent, _simulate_chunk
+from core.agent_system import AgentSystem
+from tools.scoring_tool import ScoringWeights, score_simulations
+from tools.sensitivity_tool import analyze_report, sensitivity_analysis
+from tools.storage_tool import load_report
+
+WEIGHTS = ScoringWeights(reduction=2.0, budget=30.0, jobs=5.0)
+
+
+@pytest.fixture
+def scenarios(make_scenarios):
+    return make_scenarios(25)
+
+
+def _scores(policy, region, scenarios, catalog, basis):
+    years = policy["time_horizon_years"] if basis == "cumulative" else 0
+    simulations = _simulate_chunk(region, scenarios, catalog, years=years)
+    return score_simulations(policy, simulations, WEIGHTS, basis)
+
+
+@pytest.mark.parametrize("basis", ["final", "cumulative"])
+def test_best_matches_pipeline_scoring(policy, region, scenarios, catalog, basis):
+    expected = _scores(policy, region, scenarios, catalog, basis)
+    result = sensitivity_analysis(policy, region, scenarios, catalog, weights=WEIGHTS, basis=basis)
+
+    best = int(np.argmax(expected))
+    assert result["scenario_id"] == scenarios[best]["scenario_id"]
+    assert result["score"] == pytest.approx(expected[best], rel=1e-9)
+
+
+@pytest.mark.parametrize("basis", ["final", "cumulative"])
+def test_perturbed_scores_match_resimulation(policy, region, scenarios, catalog, basis):
+    result = sensitivity_analysis(policy, region, scenarios, catalog, perturbation=0.2, weights=WEIGHTS, basis=basis)
+    best = next(i for i, sc in enumerate(scenarios) if sc["scenario_id"] == result["scenario_id"])
+
+    for entry in result["rankings"]:
+        for end in ("low", "high"):
+            modified = {iv_id: dict(iv) for iv_id, iv in catalog.items()}
+            modified[entry["intervention"]][entry["parameter"]] = entry[end]
+            scores = _scores(policy, region, scenarios, modified, basis)
+            assert entry[f"score_{end}"] == pytest.approx(scores[best], rel=1e-9, abs=1e-9), (entry, end)
+            assert entry[f"best_at_{end}"] == scenarios[int(np.argmax(scores))]["scenario_id"]
+
+
+def test_unknown_basis(policy, region, scenarios, catalog):
+    with pytest.raises(ValueError):
+        sensitivity_analysis(policy, region, scenarios, catalog, basis="average")
+
+
+@pytest.mark.parametrize("basis", ["final", "cumulative"])
+def test_analyze_report_uses_session_basis_and_weights(isolated_storage, basis):
+    with AgentSystem(max_sessions=1) as system:
+        system.bus.register_agent("ScenarioAgent", ScenarioAgent(num_scenarios=40, result_cache=False))
+        system.bus.register_agent("SimulationAgent", SimulationAgent(trajectory=basis == "cumulative"))
+        system.bus.register_agent(
+            "EvaluationAgent", EvaluationAgent(top_k=0, weights=WEIGHTS, score_basis=basis)
+        )
+        session_id = system.run_session("Cut emissions 40% under budget", seed=3)
+
+    report = load_report(session_id)
+    assert report["metrics"]["score_weights"] == {"reduction": 2.0, "budget": 30.0, "jobs": 5.0}
+
+    result = analyze_report(session_id)
+    best = report["best_scenario"]
+    assert result["scenario_id"] == best["scenario"]["scenario_id"]
+    assert result["score"] == pytest.approx(best["score"], rel=1e-9)
+
+
+def test_analyze_report_refuses_failed_session(isolated_storage, monkeypatch):
+    import tools.sensitivity_tool as sensitivity_tool
+
+    monkeypatch.setattr(
+        sensitivity_tool, "load_report", lambda session_id: {"best_scenario": {}, "error": "RuntimeError: boom"}
+    )
+    with pytest.raises(ValueError, match="boom"):
+        analyze_report("s1")
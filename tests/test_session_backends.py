@@ -0,0 +1,144 @@
+"""
+Session backends: SessionState round-trips and identical query results
+from the JSON and SQLite stores.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+import core.session_manager as session_manager
+from core.models import SessionState
+from core.session_manager import JsonFileSessionBackend, SessionBackend, SqliteSessionBackend
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "json":
+        return JsonFileSessionBackend(tmp_path / "sessions")
+    return SqliteSessionBackend(tmp_path / "sessions.db")
+
+
+def _state(i, status="created", region_id="r1"):
+    created = f"2026-01-{1 + i // 24:02d}T{i % 24:02d}:00:00Z"
+    return SessionState(
+        session_id=f"s{i:03d}",
+        goal_text=f"goal {i} — ünïcode",
+        region_id=region_id,
+        status=status,
+        created_at=created,
+        updated_at=created,
+        metadata={"seed": i, "nested": {"tags": ["a", "b"], "ratio": 0.1 * i}, "none": None},
+    )
+
+
+def test_session_backend_is_abstract():
+    with pytest.raises(TypeError):
+        SessionBackend()  # type: ignore[abstract]
+
+
+def test_round_trip(backend):
+    state = _state(1)
+    backend.save(state)
+    assert backend.load(state.session_id) == state
+    assert backend.load("missing") is None
+
+
+def test_save_replaces(backend):
+    state = _state(1)
+    backend.save(state)
+    state.goal_text = "new goal"
+    state.metadata["seed"] = 99
+    backend.save(state)
+    assert backend.load(state.session_id) == state
+    assert len(backend.list_sessions()) == 1
+
+
+def test_update_status(backend):
+    state = _state(1)
+    backend.save(state)
+
+    updated = backend.update_status(state.session_id, "completed", "2026-02-01T00:00:00Z")
+    assert updated.status == "completed"
+    assert updated.updated_at == "2026-02-01T00:00:00Z"
+    assert updated.metadata == state.metadata
+    assert backend.load(state.session_id) == updated
+    assert backend.update_status("missing", "completed", "2026-02-01T00:00:00Z") is None
+
+
+def test_list_sessions_filters(backend):
+    states = [
+        _state(i, status=("completed" if i % 3 else "error"), region_id=f"r{i % 2}") for i in range(50)
+    ]
+    for state in reversed(states):
+        backend.save(state)
+
+    def ids(result):
+        return [s.session_id for s in result]
+
+    newest_first = sorted(states, key=lambda s: s.created_at, reverse=True)
+    assert ids(backend.list_sessions()) == ids(newest_first)
+    assert ids(backend.list_sessions(limit=5)) == ids(newest_first[:5])
+    assert ids(backend.list_sessions(status="error")) == ids(s for s in newest_first if s.status == "error")
+    assert ids(backend.list_sessions(region_id="r1", status="completed")) == ids(
+        s for s in newest_first if s.region_id == "r1" and s.status == "completed"
+    )
+
+    since, until = states[10].created_at, states[20].created_at
+    assert ids(backend.list_sessions(since=since, until=until)) == ids(
+        s for s in newest_first if since <= s.created_at < until
+    )
+
+
+def test_backends_agree(tmp_path):
+    json_backend = JsonFileSessionBackend(tmp_path / "sessions")
+    sqlite_backend = SqliteSessionBackend(tmp_path / "sessions.db")
+    for i in range(30):
+        state = _state(i, status=("running" if i % 2 else "completed"), region_id=f"r{i % 3}")
+        json_backend.save(state)
+        sqlite_backend.save(state)
+
+    for query in ({}, {"status": "running"}, {"region_id": "r2", "limit": 3}, {"since": _state(7).created_at}):
+        assert json_backend.list_sessions(**query) == sqlite_backend.list_sessions(**query)
+
+
+def test_sqlite_concurrent_writers(tmp_path):
+    backend = SqliteSessionBackend(tmp_path / "sessions.db")
+    errors = []
+
+    def write(start):
+        try:
+            for i in range(start, start + 50):
+                backend.save(_state(i))
+                backend.update_status(f"s{i:03d}", "completed", "2026-03-01T00:00:00Z")
+        except Exception as exc:  # pragma: no cover - surfaced below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write, args=(50 * t,)) for t in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert len(backend.list_sessions(status="completed")) == 200
+
+    # A second handle on the same file sees every row
+    assert len(SqliteSessionBackend(tmp_path / "sessions.db").list_sessions()) == 200
+
+
+def test_module_api_uses_configured_backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_manager, "_BACKEND", None)
+    monkeypatch.setattr(session_manager, "SESSION_BACKEND", "sqlite")
+    monkeypatch.setattr(session_manager, "SESSIONS_DB", tmp_path / "sessions.db")
+
+    state = session_manager.start_session("goal", "r1", metadata={"seed": 3})
+    assert isinstance(session_manager.get_backend(), SqliteSessionBackend)
+    session_manager.update_session_status(state.session_id, "completed")
+
+    loaded = session_manager.load_session(state.session_id)
+    assert loaded.status == "completed"
+    assert loaded.metadata == {"seed": 3}
+    assert [s.session_id for s in session_manager.list_sessions(status="completed")] == [state.session_id]
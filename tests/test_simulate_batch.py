@@ -0,0 +1,47 @@
+"""
+simulate_batch must reproduce simulate_scenario bit for bit, for compiled
+and plain-dict catalogs alike.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from tools.simulation_tool import simulate_batch, simulate_scenario, unpack_batch
+
+
+@pytest.mark.parametrize("plain_dict", [False, True])
+def test_batch_matches_scalar_bit_for_bit(catalog, regions, make_scenarios, plain_dict):
+    scenarios = make_scenarios(300, min_actions=0, max_actions=6)
+    if plain_dict:
+        catalog = {iv_id: dict(iv) for iv_id, iv in catalog.items()}
+
+    for region in regions:
+        batch = unpack_batch(simulate_batch(region, scenarios, catalog))
+        for scenario, result in zip(scenarios, batch):
+            # == on floats: no tolerance
+            assert result == simulate_scenario(region, scenario, catalog), scenario
+
+
+def test_edge_cases(catalog, regions):
+    region = regions[0]
+    iv_id = next(iter(catalog))
+    scenarios = [
+        {"scenario_id": "empty", "actions": []},
+        {"scenario_id": "default-scale", "actions": [{"id": iv_id}]},
+        {"scenario_id": "unknown", "actions": [{"id": "NOPE", "scale": "high"}, {"id": iv_id, "scale": "low"}]},
+        {"scenario_id": "repeated", "actions": [{"id": iv_id, "scale": "high"}] * 5},
+    ]
+    batch = unpack_batch(simulate_batch(region, scenarios, catalog))
+    assert batch == [simulate_scenario(region, scenario, catalog) for scenario in scenarios]
+
+
+def test_non_positive_baseline(catalog, regions, make_scenarios):
+    region = dict(regions[0], current_emissions_mtco2=0.0)
+    scenarios = make_scenarios(20, min_actions=0, max_actions=6, seed=1)
+    batch = unpack_batch(simulate_batch(region, scenarios, catalog))
+    assert batch == [simulate_scenario(region, scenario, catalog) for scenario in scenarios]
+
+
+def test_empty_batch(catalog, regions):
+    assert unpack_batch(simulate_batch(regions[0], [], catalog)) == []
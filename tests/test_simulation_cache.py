@@ -0,0 +1,107 @@
+"""
+SimulationCache: canonical keys, LRU eviction and isolation of cached
+results from callers.
+"""
+
+from __future__ import annotations
+
+import copy
+
+import pytest
+
+from agents.simulation_agent import _simulate_chunk
+from tools.simulation_tool import SimulationCache, canonical_scenario_key, simulate_scenario
+
+
+@pytest.fixture
+def ids(catalog):
+    return list(catalog)
+
+
+def _scenario(scenario_id, *actions):
+    return {"scenario_id": scenario_id, "actions": [{"id": iv, "scale": scale} for iv, scale in actions]}
+
+
+def test_canonical_key_ignores_order_id_and_default_scale(ids):
+    a = _scenario("A", (ids[0], "high"), (ids[1], "medium"))
+    b = {"scenario_id": "B", "actions": [{"id": ids[1]}, {"id": ids[0], "scale": "high"}]}
+    assert canonical_scenario_key(a) == canonical_scenario_key(b)
+    assert canonical_scenario_key(a) != canonical_scenario_key(_scenario("C", (ids[0], "low"), (ids[1], "medium")))
+
+
+def test_equivalent_scenarios_share_one_entry(catalog, region, ids):
+    cache = SimulationCache()
+    a = _scenario("A", (ids[0], "high"), (ids[1], "low"))
+    b = _scenario("B", (ids[1], "low"), (ids[0], "high"))
+
+    first = cache.simulate(region, [a, b], catalog)
+    assert cache.stats()["entries"] == 1
+    assert cache.misses == 2 and cache.hits == 0
+    assert first[0] == first[1]
+
+    again = cache.simulate(region, [b], catalog)
+    assert cache.hits == 1
+    assert again[0] == first[0]
+    # Misses are simulated in canonical order
+    canonical = {"scenario_id": "A", "actions": [dict(zip(("id", "scale"), p)) for p in canonical_scenario_key(a)]}
+    assert first[0] == simulate_scenario(region, canonical, catalog)
+
+
+def test_key_includes_region_context_and_catalog_version(catalog, region, ids):
+    cache = SimulationCache()
+    scenario = _scenario("A", (ids[0], "medium"))
+    cache.simulate(region, [scenario], catalog)
+    cache.simulate(dict(region, current_emissions_mtco2=region["current_emissions_mtco2"] * 2), [scenario], catalog)
+    cache.simulate(region, [scenario], catalog, context=(10,))
+    assert cache.stats()["entries"] == 3
+    assert cache.hits == 0
+
+    # Plain dict catalogs carry no version and are never cached
+    plain = {iv_id: dict(iv) for iv_id, iv in catalog.items()}
+    cache.simulate(region, [scenario], plain)
+    cache.simulate(region, [scenario], plain)
+    assert cache.stats()["entries"] == 3
+
+
+def test_lru_eviction(catalog, region, ids):
+    cache = SimulationCache(maxsize=3)
+    a, b, c, d = (_scenario(name, (iv, "medium")) for name, iv in zip("ABCD", ids))
+
+    cache.simulate(region, [a, b, c], catalog)
+    cache.simulate(region, [a], catalog)  # A is now most recently used
+    cache.simulate(region, [d], catalog)  # evicts B, the least recently used
+    assert cache.stats()["entries"] == 3
+
+    hits = cache.hits
+    cache.simulate(region, [a, c, d], catalog)
+    assert cache.hits == hits + 3
+    cache.simulate(region, [b], catalog)
+    assert cache.hits == hits + 3
+
+
+def test_zero_maxsize_caches_nothing(catalog, region, ids):
+    cache = SimulationCache(maxsize=0)
+    cache.simulate(region, [_scenario("A", (ids[0], "low"))], catalog)
+    assert cache.stats()["entries"] == 0
+
+
+def test_cached_results_are_isolated(catalog, region, ids):
+    cache = SimulationCache()
+    scenario = _scenario("A", (ids[0], "high"), (ids[1], "low"))
+
+    def simulate(region, scenarios, catalog):
+        return _simulate_chunk(region, scenarios, catalog, mc_draws=50, years=5)
+
+    first = cache.simulate(region, [scenario, scenario], catalog, simulate)
+    pristine = copy.deepcopy(cache.simulate(region, [scenario], catalog, simulate)[0])
+    assert first[0] == pristine
+
+    first[0]["trajectory"]["emissions_mtco2"][0] = -1.0
+    first[0]["uncertainty"]["total_cost_usd"]["p50"] = -1.0
+    first[0]["co2_reduction_percent"] = -1.0
+    assert first[1] == pristine
+
+    later = cache.simulate(region, [scenario], catalog, simulate)[0]
+    assert later == pristine
+    later["trajectory"]["year"].append(99)
+    assert cache.simulate(region, [scenario], catalog, simulate)[0] == pristine
@@ -0,0 +1,86 @@
+"""
+A session whose simulations fail still finishes: SimulationAgent reports
+the failed scenarios as SIM_ERROR and EvaluationAgent counts them.
+"""
+
+from __future__ import annotations
+
+import itertools
+import threading
+
+import pytest
+
+import agents.simulation_agent as simulation_agent
+from agents.scenario_agent import ScenarioAgent
+from agents.simulation_agent import SimulationAgent
+from core.agent_system import AgentSystem
+from tools.storage_tool import load_report
+
+GOAL = "Cut emissions 30% under budget"
+
+
+def _run(backend, batch_size, bus_workers=0):
+    with AgentSystem(max_sessions=1, bus_workers=bus_workers) as system:
+        system.bus.register_agent("ScenarioAgent", ScenarioAgent(batch_size=batch_size))
+        system.bus.register_agent(
+            "SimulationAgent", SimulationAgent(backend=backend, chunk_size=4, cache_size=0)
+        )
+        session_id = system.submit(GOAL, seed=7).result(timeout=60)
+    return load_report(session_id)
+
+
+def _failing_every(monkeypatch, nth):
+    """Make every nth simulation call raise (nth=1: all of them)."""
+    calls = itertools.count()
+    lock = threading.Lock()
+
+    def flaky(real):
+        def wrapper(*args, **kwargs):
+            with lock:
+                call = next(calls)
+            if call % nth == 0:
+                raise RuntimeError("simulation exploded")
+            return real(*args, **kwargs)
+
+        return wrapper
+
+    for name in ("_simulate_chunk", "simulate_scenario"):
+        monkeypatch.setattr(simulation_agent, name, flaky(getattr(simulation_agent, name)))
+
+
+@pytest.mark.parametrize("backend", ["inline", "thread"])
+@pytest.mark.parametrize("batch_size", [0, 8])
+def test_all_failed_session_reports_failure(isolated_storage, monkeypatch, backend, batch_size):
+    _failing_every(monkeypatch, 1)
+    report = _run(backend, batch_size)
+
+    assert report is not None
+    assert report["best_scenario"] == {}
+    assert report["metrics"]["num_scenarios"] == 0
+    assert report["metrics"]["num_failed"] > 0
+    assert "simulation exploded" in report["error"]
+
+
+@pytest.mark.parametrize("backend", ["inline", "thread"])
+def test_partially_failed_session_reports_survivors(isolated_storage, monkeypatch, backend):
+    _failing_every(monkeypatch, 3)
+    # One scenario per batch, so only some of them fail
+    report = _run(backend, 1)
+
+    assert report["best_scenario"]["scenario"]["scenario_id"]
+    metrics = report["metrics"]
+    assert metrics["num_scenarios"] > 0
+    assert metrics["num_failed"] > 0
+    assert "simulation exploded" in report["error"]
+
+
+def test_failed_send_is_reported(isolated_storage, monkeypatch):
+    # Results that can't be sent as a batch are still accounted for
+    def broken_send(self, *args, **kwargs):
+        raise ValueError("cannot send")
+
+    monkeypatch.setattr(SimulationAgent, "_send_batch_result", broken_send)
+    report = _run("thread", 8, bus_workers=2)
+
+    assert report["best_scenario"] == {}
+    assert "cannot send" in report["error"]
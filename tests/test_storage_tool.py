@@ -0,0 +1,42 @@
+"""
+Result cache writes: concurrent writers of one key never tear the entry
+or fail, and leave no temporary files behind.
+"""
+
+from __future__ import annotations
+
+import threading
+
+from tools.storage_tool import load_cached_report, result_cache_key, save_cached_report
+
+
+def test_concurrent_writers_same_key(isolated_storage):
+    key = result_cache_key(policy={"region_id": "r1"}, seed=1)
+    reports = [{"writer": i, "rows": [{"i": i, "j": j} for j in range(200)]} for i in range(8)]
+    barrier = threading.Barrier(len(reports))
+    errors = []
+
+    def write(report):
+        try:
+            barrier.wait()
+            for _ in range(20):
+                save_cached_report(key, report)
+        except Exception as exc:  # pragma: no cover - surfaced below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write, args=(report,)) for report in reports]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert load_cached_report(key) in reports
+    assert [p.name for p in (isolated_storage / "cache").iterdir()] == [f"{key}_report.json"]
+
+
+def test_miss_and_round_trip(isolated_storage):
+    key = result_cache_key(seed=2)
+    assert load_cached_report(key) is None
+    save_cached_report(key, {"best_scenario": {"score": 1.5}})
+    assert load_cached_report(key) == {"best_scenario": {"score": 1.5}}
@@ -3,18 +3,46 @@
 tools.climate_data_tool
 
 Utility functions for loading regional climate / baseline data.
+
+Regions are served from a RegionStore that parses regions.csv once, keeps
+an id index, and reloads only when the file changes. Its regions are
+shared read-only views; region_to_dict() gives a plain copy for callers
+that need to mutate, pickle or serialize one.
+
+For large catalogs, regions.csv can be converted into a columnar NumPy
+bundle (regions.npy, rows sorted by region_id) that is memory-mapped and
+searched by id without materializing rows:
+
+    python -m tools.climate_data_tool build-columnar
+
+When regions.npy exists and is at least as new as regions.csv, it is used
+instead of the CSV.
 """
 
+import argparse
 import csv
 import logging
+import threading
 from pathlib import Path
-from typing import Dict
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
 
 from core.config import DATA_DIR
 
 logger = logging.getLogger(__name__)
 
 REGIONS_FILE = DATA_DIR / "regions.csv"
+REGIONS_NPY = DATA_DIR / "regions.npy"
+
+# Numeric columns of the columnar format, in regions.csv naming
+_COLUMNAR_FLOATS = (
+    "current_emissions_mtco2",
+    "transport_share",
+    "industry_share",
+    "buildings_share",
+)
 
 
 def _ensure_sample_regions_file() -> None:
@@ -87,33 +115,296 @@ def _convert_region_row(row: Dict[str, str]) -> Dict:
     return region
 
 
-def load_all_regions() -> Dict[str, Dict]:
+def _freeze_region(region: Dict) -> Mapping[str, Any]:
+    """Read-only view of a region dict, sector breakdown included."""
+    return MappingProxyType(dict(region, sector_breakdown=MappingProxyType(region["sector_breakdown"])))
+
+
+def region_to_dict(region: Mapping[str, Any]) -> Dict:
+    """Plain, mutable copy of a region (e.g. a RegionStore view)."""
+    return dict(region, sector_breakdown=dict(region["sector_breakdown"]))
+
+
+def _missing_region_error(
+    region_id: str,
+    available: Iterable[str],
+    total: Optional[int] = None,
+) -> KeyError:
+    ids = list(available)
+    if total is None:
+        total = len(ids)
+    shown = ", ".join(ids[:20])
+    if total > 20:
+        shown += f", ... ({total - 20} more)"
+    msg = f"Region '{region_id}' not found. Available: {shown}"
+    logger.error(msg)
+    return KeyError(msg)
+
+
+class RegionStore:
     """
-    Load all regions from regions.csv as a mapping from region_id to dict.
+    RegionStore
+
+    In-memory index of a regions CSV (region_id -> region). The file is
+    parsed on first use and re-parsed only when its mtime or size changes.
+    Regions are shared between callers, so they are returned as read-only
+    mappings (see region_to_dict for a mutable copy).
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._regions: Dict[str, Mapping[str, Any]] = {}
+
+    def _refresh(self) -> Dict[str, Mapping[str, Any]]:
+        if self.path == REGIONS_FILE:
+            _ensure_sample_regions_file()
+
+        stat = self.path.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if stamp != self._stamp:
+                regions: Dict[str, Mapping[str, Any]] = {}
+                with self.path.open("r", newline="", encoding="utf-8") as f:
+                    reader = csv.DictReader(f)
+                    for row in reader:
+                        region_id = row["region_id"]
+                        regions[region_id] = _freeze_region(_convert_region_row(row))
+
+                self._regions = regions
+                self._stamp = stamp
+                logger.info("Loaded %d regions from %s", len(regions), self.path)
+            return self._regions
+
+    def get(self, region_id: str) -> Mapping[str, Any]:
+        """Return one region. Raises KeyError if not found."""
+        regions = self._refresh()
+        region = regions.get(region_id)
+        if region is None:
+            raise _missing_region_error(region_id, regions)
+        return region
+
+    def get_many(self, region_ids: Iterable[str]) -> Dict[str, Mapping[str, Any]]:
+        """
+        Return {region_id: region} for several regions with a single
+        freshness check. Raises KeyError on the first unknown id.
+        """
+        regions = self._refresh()
+        found: Dict[str, Mapping[str, Any]] = {}
+        for region_id in region_ids:
+            region = regions.get(region_id)
+            if region is None:
+                raise _missing_region_error(region_id, regions)
+            found[region_id] = region
+        return found
+
+    def all(self) -> Dict[str, Mapping[str, Any]]:
+        """Return a new mapping of every region_id to its region."""
+        return dict(self._refresh())
+
+    def __len__(self) -> int:
+        return len(self._refresh())
+
+
+def _columnar_row_to_region(row: np.void) -> Dict:
+    return {
+        "region_id": str(row["region_id"]),
+        "name": str(row["name"]),
+        "population": int(row["population"]),
+        "current_emissions_mtco2": float(row["current_emissions_mtco2"]),
+        "sector_breakdown": {
+            "transport": float(row["transport_share"]),
+            "industry": float(row["industry_share"]),
+            "buildings": float(row["buildings_share"]),
+        },
+    }
+
+
+class ColumnarRegionStore:
+    """
+    ColumnarRegionStore
+
+    Read-only view of a regions.npy bundle built by build_columnar_regions.
+    The structured array is memory-mapped and sorted by region_id, so a
+    lookup is a binary search that only converts the matching rows to dicts.
+    Same interface as RegionStore.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._table: Optional[np.ndarray] = None
+
+    def _refresh(self) -> np.ndarray:
+        stat = self.path.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if stamp != self._stamp or self._table is None:
+                self._table = np.load(self.path, mmap_mode="r")
+                self._stamp = stamp
+                logger.info("Memory-mapped %d regions from %s", len(self._table), self.path)
+            return self._table
+
+    def _positions(self, table: np.ndarray, region_ids: List[str]) -> np.ndarray:
+        ids = table["region_id"]
+        positions = np.searchsorted(ids, np.asarray(region_ids, dtype=ids.dtype))
+        for region_id, pos in zip(region_ids, positions):
+            if pos >= len(ids) or ids[pos] != region_id:
+                raise _missing_region_error(region_id, (str(i) for i in ids[:20]), len(ids))
+        return positions
+
+    def get(self, region_id: str) -> Dict:
+        """Return one region. Raises KeyError if not found."""
+        table = self._refresh()
+        pos = self._positions(table, [region_id])[0]
+        return _columnar_row_to_region(table[pos])
+
+    def get_many(self, region_ids: Iterable[str]) -> Dict[str, Dict]:
+        """Return {region_id: region}. Raises KeyError on the first unknown id."""
+        table = self._refresh()
+        region_ids = list(region_ids)
+        if not region_ids:
+            return {}
+        positions = self._positions(table, region_ids)
+        return {
+            region_id: _columnar_row_to_region(table[pos])
+            for region_id, pos in zip(region_ids, positions)
+        }
+
+    def all(self) -> Dict[str, Dict]:
+        """Return a new mapping of every region_id to its region (materializes all rows)."""
+        table = self._refresh()
+        return {str(row["region_id"]): _columnar_row_to_region(row) for row in table}
+
+    def __len__(self) -> int:
+        return len(self._refresh())
+
+
+def build_columnar_regions(
+    csv_path: Optional[Path] = None,
+    npy_path: Optional[Path] = None,
+) -> Path:
+    """
+    Convert a regions CSV into the columnar regions.npy format (rows sorted
+    by region_id; values converted exactly as load_region would).
+    Returns the path written.
+    """
+    csv_path = csv_path or REGIONS_FILE
+    npy_path = npy_path or REGIONS_NPY
+
+    regions = RegionStore(csv_path).all()
+    ids = sorted(regions)
+
+    id_width = max((len(i) for i in ids), default=1)
+    name_width = max((len(regions[i]["name"] or "") for i in ids), default=1)
+    dtype = np.dtype(
+        [("region_id", f"U{id_width}"), ("name", f"U{name_width}"), ("population", "i8")]
+        + [(column, "f8") for column in _COLUMNAR_FLOATS]
+    )
+
+    table = np.empty(len(ids), dtype=dtype)
+    for pos, region_id in enumerate(ids):
+        region = regions[region_id]
+        sectors = region["sector_breakdown"]
+        table[pos] = (
+            region_id,
+            region["name"] or "",
+            region["population"],
+            region["current_emissions_mtco2"],
+            sectors["transport"],
+            sectors["industry"],
+            sectors["buildings"],
+        )
+
+    npy_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write via a temp file so readers never map a half-written bundle
+    tmp_path = npy_path.with_name(npy_path.name + ".tmp")
+    with tmp_path.open("wb") as f:
+        np.save(f, table)
+    tmp_path.replace(npy_path)
+
+    logger.info("Wrote %d regions in columnar format to %s", len(table), npy_path)
+    return npy_path
+
+
+# path -> store, so every caller shares one parsed index per file
+_STORES: Dict[str, Union[RegionStore, ColumnarRegionStore]] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def _use_columnar() -> bool:
+    """Prefer regions.npy when it exists and is not older than regions.csv."""
+    try:
+        npy_mtime = REGIONS_NPY.stat().st_mtime_ns
+    except FileNotFoundError:
+        return False
+    try:
+        return npy_mtime >= REGIONS_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return True
+
+
+def get_region_store(path: Optional[Path] = None) -> Union[RegionStore, ColumnarRegionStore]:
+    """
+    Return the shared store for `path`. By default this is the columnar
+    regions.npy store when it is up to date, otherwise the regions.csv store.
     """
-    _ensure_sample_regions_file()
+    if path is None:
+        path = REGIONS_NPY if _use_columnar() else REGIONS_FILE
+    with _STORES_LOCK:
+        store = _STORES.get(str(path))
+        if store is None:
+            store_cls = ColumnarRegionStore if path.suffix == ".npy" else RegionStore
+            store = _STORES[str(path)] = store_cls(path)
+        return store
 
-    regions: Dict[str, Dict] = {}
-    with REGIONS_FILE.open("r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            region_id = row["region_id"]
-            regions[region_id] = _convert_region_row(row)
 
-    logger.info("Loaded %d regions from %s", len(regions), REGIONS_FILE)
-    return regions
+def load_all_regions() -> Dict[str, Dict]:
+    """
+    Load all regions from regions.csv as a mapping from region_id to dict.
+    """
+    return get_region_store().all()
 
 
 def load_region(region_id: str) -> Dict:
     """
     Load a single region by id. Raises KeyError if not found.
     """
-    regions = load_all_regions()
-    if region_id not in regions:
-        available = ", ".join(regions.keys())
-        msg = f"Region '{region_id}' not found. Available: {available}"
-        logger.error(msg)
-        raise KeyError(msg)
-
+    region = get_region_store().get(region_id)
     logger.debug("Loaded region %s", region_id)
-    return regions[region_id]
+    return region
+
+
+def load_regions(region_ids: Iterable[str]) -> Dict[str, Dict]:
+    """
+    Load several regions by id as a mapping from region_id to dict.
+    Raises KeyError if any is not found.
+    """
+    return get_region_store().get_many(region_ids)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Regional data utilities.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser(
+        "build-columnar",
+        help="Convert regions.csv into the memory-mapped regions.npy format.",
+    )
+    build.add_argument("--csv", type=Path, default=None, help="Source CSV (default: data/regions.csv).")
+    build.add_argument("--out", type=Path, default=None, help="Output file (default: data/regions.npy).")
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    if args.command == "build-columnar":
+        path = build_columnar_regions(args.csv, args.out)
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,27 @@
 tools.intervention_tool
 
 Utility functions for loading the catalog of possible interventions.
+
+The catalog is compiled once into an immutable InterventionCatalog and
+shared process-wide; it is reloaded only when interventions.csv changes.
+
+Each numeric column may have optional <column>_low / <column>_high
+columns giving its uncertainty range (for Monte Carlo simulation).
+Missing or empty bounds default to the column's own value. An optional
+ramp_up_years column gives the years an intervention takes to reach its
+full effect (0 or missing = immediate), for trajectory simulation.
 """
 
 import csv
+import hashlib
+import io
 import logging
-from typing import Dict
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
 
 from core.config import DATA_DIR
 
@@ -15,6 +31,13 @@ logger = logging.getLogger(__name__)
 
 INTERVENTIONS_FILE = DATA_DIR / "interventions.csv"
 
+# Numeric per-unit columns that may carry _low / _high uncertainty bounds
+UNCERTAIN_COLUMNS = (
+    "base_reduction_percent_per_unit",
+    "base_cost_usd_per_unit",
+    "job_impact_percent_per_unit",
+)
+
 
 def _ensure_sample_interventions_file() -> None:
     """
@@ -37,6 +60,13 @@ def _ensure_sample_interventions_file() -> None:
             "base_reduction_percent_per_unit": "5.0",
             "base_cost_usd_per_unit": "100000000",
             "job_impact_percent_per_unit": "-0.2",
+            "base_reduction_percent_per_unit_low": "3.0",
+            "base_reduction_percent_per_unit_high": "6.5",
+            "base_cost_usd_per_unit_low": "80000000",
+            "base_cost_usd_per_unit_high": "140000000",
+            "job_impact_percent_per_unit_low": "-0.4",
+            "job_impact_percent_per_unit_high": "0.0",
+            "ramp_up_years": "3",
         },
         {
             "id": "PUBLIC_TRANSIT_EXPANSION",
@@ -45,6 +75,13 @@ def _ensure_sample_interventions_file() -> None:
             "base_reduction_percent_per_unit": "8.0",
             "base_cost_usd_per_unit": "200000000",
             "job_impact_percent_per_unit": "0.5",
+            "base_reduction_percent_per_unit_low": "6.0",
+            "base_reduction_percent_per_unit_high": "9.0",
+            "base_cost_usd_per_unit_low": "170000000",
+            "base_cost_usd_per_unit_high": "280000000",
+            "job_impact_percent_per_unit_low": "0.3",
+            "job_impact_percent_per_unit_high": "0.7",
+            "ramp_up_years": "6",
         },
         {
             "id": "BUILDING_RETROFIT",
@@ -53,6 +90,13 @@ def _ensure_sample_interventions_file() -> None:
             "base_reduction_percent_per_unit": "10.0",
             "base_cost_usd_per_unit": "250000000",
             "job_impact_percent_per_unit": "0.1",
+            "base_reduction_percent_per_unit_low": "7.0",
+            "base_reduction_percent_per_unit_high": "11.0",
+            "base_cost_usd_per_unit_low": "220000000",
+            "base_cost_usd_per_unit_high": "320000000",
+            "job_impact_percent_per_unit_low": "0.0",
+            "job_impact_percent_per_unit_high": "0.2",
+            "ramp_up_years": "8",
         },
         {
             "id": "INDUSTRIAL_EFFICIENCY",
@@ -61,6 +105,13 @@ def _ensure_sample_interventions_file() -> None:
             "base_reduction_percent_per_unit": "7.0",
             "base_cost_usd_per_unit": "180000000",
             "job_impact_percent_per_unit": "0.2",
+            "base_reduction_percent_per_unit_low": "5.0",
+            "base_reduction_percent_per_unit_high": "8.0",
+            "base_cost_usd_per_unit_low": "160000000",
+            "base_cost_usd_per_unit_high": "230000000",
+            "job_impact_percent_per_unit_low": "0.1",
+            "job_impact_percent_per_unit_high": "0.3",
+            "ramp_up_years": "4",
         },
     ]
 
@@ -80,7 +131,7 @@ def _convert_intervention_row(row: Dict[str, str]) -> Dict:
     def _float(name: str, default: float = 0.0) -> float:
         try:
             return float(row.get(name, default))
-        except ValueError:
+        except (TypeError, ValueError):
             return default
 
     iv = {
@@ -91,21 +142,129 @@ def _convert_intervention_row(row: Dict[str, str]) -> Dict:
         "base_cost_usd_per_unit": _float("base_cost_usd_per_unit"),
         "job_impact_percent_per_unit": _float("job_impact_percent_per_unit"),
     }
+
+    for name in UNCERTAIN_COLUMNS:
+        # Bounds must bracket the point value (it is the mode of the draws)
+        iv[f"{name}_low"] = min(_float(f"{name}_low", iv[name]), iv[name])
+        iv[f"{name}_high"] = max(_float(f"{name}_high", iv[name]), iv[name])
+    iv["ramp_up_years"] = max(_float("ramp_up_years"), 0.0)
     return iv
 
 
-def load_interventions() -> Dict[str, Dict]:
+class InterventionCatalog(Mapping[str, Mapping[str, Any]]):
     """
-    Load interventions from interventions.csv as a mapping from id -> dict.
+    InterventionCatalog
+
+    Immutable, compiled view of the interventions catalog. Behaves like the
+    old id -> dict mapping (rows are read-only), and additionally exposes:
+    - ids / index: intervention ids in file order and id -> position
+    - by_sector: sector -> positions of its interventions
+    - reduction / cost / jobs: per-unit numeric columns as read-only arrays
+    - bounds: column name -> (low, high) read-only arrays of uncertainty
+      bounds (equal to the column where the CSV gives none)
+    - ramp_up: years to full effect per intervention (0 = immediate)
+    - version: content hash of the source CSV, for cache keys
     """
-    _ensure_sample_interventions_file()
 
-    catalog: Dict[str, Dict] = {}
-    with INTERVENTIONS_FILE.open("r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            iv_id = row["id"]
-            catalog[iv_id] = _convert_intervention_row(row)
+    def __init__(self, rows: List[Dict[str, Any]], version: str = "") -> None:
+        self._rows: Dict[str, Mapping[str, Any]] = {
+            row["id"]: MappingProxyType(dict(row)) for row in rows
+        }
+        self.ids: Tuple[str, ...] = tuple(self._rows)
+        self.index: Mapping[str, int] = MappingProxyType(
+            {iv_id: i for i, iv_id in enumerate(self.ids)}
+        )
+
+        by_sector: Dict[str, List[int]] = {}
+        for i, iv in enumerate(self._rows.values()):
+            by_sector.setdefault(iv["sector"], []).append(i)
+        self.by_sector: Mapping[str, Tuple[int, ...]] = MappingProxyType(
+            {sector: tuple(idx) for sector, idx in by_sector.items()}
+        )
+
+        self.reduction = self._column("base_reduction_percent_per_unit")
+        self.cost = self._column("base_cost_usd_per_unit")
+        self.jobs = self._column("job_impact_percent_per_unit")
+        self.ramp_up = self._column("ramp_up_years", default=0.0)
+        self.bounds: Mapping[str, Tuple[np.ndarray, np.ndarray]] = MappingProxyType(
+            {
+                name: (self._column(f"{name}_low", name), self._column(f"{name}_high", name))
+                for name in UNCERTAIN_COLUMNS
+            }
+        )
+        self.version = version
+
+    def _column(self, name: str, fallback: Optional[str] = None, default: Optional[float] = None) -> np.ndarray:
+        if fallback is not None:
+            values = np.asarray(
+                [iv.get(name, iv[fallback]) for iv in self._rows.values()], dtype=np.float64
+            )
+        elif default is not None:
+            values = np.asarray([iv.get(name, default) for iv in self._rows.values()], dtype=np.float64)
+        else:
+            values = np.asarray([iv[name] for iv in self._rows.values()], dtype=np.float64)
+        values.setflags(write=False)
+        return values
+
+    def __getitem__(self, iv_id: str) -> Mapping[str, Any]:
+        return self._rows[iv_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __reduce__(self):
+        # Rebuild from plain rows so the catalog can be shipped to worker processes
+        return (InterventionCatalog, ([dict(iv) for iv in self._rows.values()], self.version))
+
+    def __repr__(self) -> str:
+        return f"InterventionCatalog({len(self)} interventions, version={self.version!r})"
+
 
-    logger.info("Loaded %d interventions from %s", len(catalog), INTERVENTIONS_FILE)
+# path -> (mtime_ns, size, catalog)
+_CATALOG_CACHE: Dict[str, Tuple[int, int, InterventionCatalog]] = {}
+_CATALOG_LOCK = threading.Lock()
+
+
+def _parse_catalog(path: Path) -> InterventionCatalog:
+    raw = path.read_bytes()
+    version = hashlib.sha256(raw).hexdigest()[:16]
+
+    rows = [
+        _convert_intervention_row(row)
+        for row in csv.DictReader(io.StringIO(raw.decode("utf-8"), newline=""))
+    ]
+    catalog = InterventionCatalog(rows, version=version)
+    logger.info("Loaded %d interventions from %s", len(catalog), path)
     return catalog
+
+
+def get_catalog(path: Optional[Path] = None) -> InterventionCatalog:
+    """
+    Return the shared compiled catalog for `path` (default: interventions.csv).
+    The file is re-parsed only when its mtime or size changes.
+    """
+    if path is None:
+        _ensure_sample_interventions_file()
+        path = INTERVENTIONS_FILE
+
+    stat = path.stat()
+    key = str(path)
+    with _CATALOG_LOCK:
+        cached = _CATALOG_CACHE.get(key)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        catalog = _parse_catalog(path)
+        _CATALOG_CACHE[key] = (stat.st_mtime_ns, stat.st_size, catalog)
+        return catalog
+
+
+def load_interventions() -> InterventionCatalog:
+    """
+    Load interventions from interventions.csv as a mapping from id -> dict.
+    Returns the shared compiled catalog; see get_catalog().
+    """
+    return get_catalog()
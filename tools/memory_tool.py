@@ -6,36 +6,264 @@ Simple "long-term memory" utilities for Agentic Terraformer.
 
 Stores compact summaries of runs and provides basic retrieval and
 context compaction.
+
+Summaries are appended to an append-only JSONL log (long_term.jsonl),
+one write per line, so concurrent processes never interleave entries.
+Running aggregates (count, sums, best score, per-region stats) are kept
+in memory and checkpointed to a small sidecar file (long_term_stats.json)
+once the log has grown _CHECKPOINT_BYTES past it, and at exit, so an
+append costs O(1) and summaries never need to re-scan the log. The
+sidecar records the log size it covers; whatever the log gained since
+(other processes' appends, or ours before a crash) is replayed from
+there. A torn last line left by a crash mid-append is cut off the log.
+
+Appends, torn-line truncation, compaction and sidecar writes hold an
+exclusive flock on long_term.jsonl.lock (a separate file, since compaction
+replaces the log), so a torn tail is always a crashed writer's, never one
+still in progress. Cached aggregates record the log's inode, so after
+another process compacts the log they are rebuilt rather than replayed
+from an offset into a different file.
+
+Compact the log (drop malformed lines and duplicate sessions) with:
+
+    python -m tools.memory_tool compact
 """
 
+import argparse
+import atexit
+import contextlib
 import json
 import logging
+import os
+import threading
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Set
 
 from core.config import MEMORY_DIR
 
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialised within a process
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
+# Legacy single-document store; migrated into the JSONL log on first use
 LONG_TERM_FILE = MEMORY_DIR / "long_term.json"
+LONG_TERM_LOG = MEMORY_DIR / "long_term.jsonl"
+LONG_TERM_STATS = MEMORY_DIR / "long_term_stats.json"
+
+_LOCK = threading.RLock()
+# In-process copy of the sidecar, keyed by log path so path overrides stay coherent
+_STATS_CACHE: Dict[str, Dict[str, Any]] = {}
+# Log path -> log size covered by the sidecar on disk
+_CHECKPOINTS: Dict[str, int] = {}
+# Rewrite the sidecar once the log has grown this many bytes past it
+_CHECKPOINT_BYTES = 64 * 1024
+# Legacy files already looked at, so an unreadable one is reported once
+_LEGACY_CHECKED: Set[str] = set()
+
+
+@contextlib.contextmanager
+def _log_lock(shared: bool = False) -> Iterator[None]:
+    """Hold _LOCK and an flock on the log's lock file. Not reentrant."""
+    with _LOCK:
+        if fcntl is None:
+            yield
+            return
+        LONG_TERM_LOG.parent.mkdir(parents=True, exist_ok=True)
+        with LONG_TERM_LOG.with_name(LONG_TERM_LOG.name + ".lock").open("ab") as f:
+            # Released when the file is closed
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            yield
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {
+        "log_size": 0,
+        "log_inode": None,
+        "num_sessions": 0,
+        "sum_co2_reduction_percent": 0.0,
+        "sum_total_cost_usd": 0.0,
+        "best_score": None,
+        "best_session_id": None,
+        "regions": {},
+    }
+
+
+def _apply_summary(stats: Dict[str, Any], summary: Dict[str, Any]) -> None:
+    """Fold one session summary into the running aggregates."""
+    score = summary["score"]
+
+    stats["num_sessions"] += 1
+    stats["sum_co2_reduction_percent"] += summary["co2_reduction_percent"]
+    stats["sum_total_cost_usd"] += summary["total_cost_usd"]
+    if stats["best_score"] is None or score > stats["best_score"]:
+        stats["best_score"] = score
+        stats["best_session_id"] = summary["session_id"]
+
+    region = stats["regions"].setdefault(
+        summary["region_id"],
+        {
+            "num_sessions": 0,
+            "sum_co2_reduction_percent": 0.0,
+            "sum_total_cost_usd": 0.0,
+            "best_score": None,
+        },
+    )
+    region["num_sessions"] += 1
+    region["sum_co2_reduction_percent"] += summary["co2_reduction_percent"]
+    region["sum_total_cost_usd"] += summary["total_cost_usd"]
+    if region["best_score"] is None or score > region["best_score"]:
+        region["best_score"] = score
 
 
-def _load_long_term() -> Dict[str, Any]:
-    if not LONG_TERM_FILE.exists():
-        return {"sessions": []}
+def _parse_line(line: bytes) -> Optional[Dict[str, Any]]:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        summary = json.loads(line)
+    except json.JSONDecodeError:
+        logger.warning("Skipping malformed long-term memory line: %r", line[:200])
+        return None
+    if not isinstance(summary, dict):
+        return None
+    return summary
+
+
+def _replay(stats: Dict[str, Any], start: int, end: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Fold log entries from byte offset `start` to `end` (default: the end of
+    the log) into `stats`. A last line without a newline was torn by a
+    crash mid-append; it is cut off so the next append starts a clean line.
+    Caller holds _log_lock(), so no other writer can be mid-append.
+    """
+    torn = False
+    with LONG_TERM_LOG.open("rb") as f:
+        stats["log_inode"] = os.fstat(f.fileno()).st_ino
+        f.seek(start)
+        offset = start
+        for line in f:
+            if end is not None and offset >= end:
+                break
+            if not line.endswith(b"\n"):
+                torn = True
+                logger.warning("Truncating torn last line of long-term memory log: %r", line[:200])
+                break
+            offset += len(line)
+            summary = _parse_line(line)
+            if summary is not None:
+                _apply_summary(stats, summary)
+    if torn:
+        os.truncate(LONG_TERM_LOG, offset)
+    stats["log_size"] = offset
+    return stats
+
+
+def _write_json_atomic(path: Path, data: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _checkpoint(stats: Dict[str, Any], force: bool = False) -> None:
+    """Write the sidecar if the log grew _CHECKPOINT_BYTES past it (or force). Caller holds _log_lock()."""
+    key = str(LONG_TERM_LOG)
+    if stats["log_size"] == _CHECKPOINTS.get(key):
+        return
+    if force or stats["log_size"] - _CHECKPOINTS.get(key, 0) >= _CHECKPOINT_BYTES:
+        _write_json_atomic(LONG_TERM_STATS, stats)
+        _CHECKPOINTS[key] = stats["log_size"]
 
-    with LONG_TERM_FILE.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-    if "sessions" not in data or not isinstance(data["sessions"], list):
-        data["sessions"] = []
-    return data
 
+def _checkpoint_at_exit() -> None:
+    if str(LONG_TERM_LOG) not in _STATS_CACHE:
+        return
+    with _log_lock():
+        stats = _STATS_CACHE.get(str(LONG_TERM_LOG))
+        if stats is not None:
+            _checkpoint(stats, force=True)
 
-def _save_long_term(data: Dict[str, Any]) -> None:
-    LONG_TERM_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with LONG_TERM_FILE.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-    logger.debug("Saved long-term memory to %s", LONG_TERM_FILE)
+
+atexit.register(_checkpoint_at_exit)
+
+
+def _migrate_legacy() -> None:
+    """Move sessions from the old long_term.json into the JSONL log, once. Caller holds _log_lock()."""
+    key = str(LONG_TERM_FILE)
+    if key in _LEGACY_CHECKED or LONG_TERM_LOG.exists() or not LONG_TERM_FILE.exists():
+        return
+    _LEGACY_CHECKED.add(key)
+
+    try:
+        with LONG_TERM_FILE.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+    except json.JSONDecodeError:
+        logger.warning("Ignoring unreadable legacy long-term memory at %s", LONG_TERM_FILE)
+        return
+
+    sessions = data.get("sessions") if isinstance(data, dict) else None
+    if not isinstance(sessions, list) or not sessions:
+        return
+
+    LONG_TERM_LOG.parent.mkdir(parents=True, exist_ok=True)
+    with LONG_TERM_LOG.open("w", encoding="utf-8") as f:
+        for summary in sessions:
+            f.write(json.dumps(summary) + "\n")
+    logger.info("Migrated %d sessions from %s to %s", len(sessions), LONG_TERM_FILE, LONG_TERM_LOG)
+
+
+def _covers(stats: Dict[str, Any], log_inode: Optional[int], log_size: int) -> bool:
+    """Whether `stats` describe a prefix of the current log, ending on a line boundary."""
+    offset = stats.get("log_size", 0)
+    if stats.get("log_inode") != log_inode or offset > log_size:
+        return False
+    if offset == 0:
+        return True
+    with LONG_TERM_LOG.open("rb") as f:
+        f.seek(offset - 1)
+        return f.read(1) == b"\n"
+
+
+def _load_stats() -> Dict[str, Any]:
+    """
+    Return running aggregates that cover the whole log, catching up from the
+    sidecar's recorded log size if needed. Caller holds _log_lock().
+    """
+    _migrate_legacy()
+    st = LONG_TERM_LOG.stat() if LONG_TERM_LOG.exists() else None
+    log_size = st.st_size if st else 0
+    log_inode = st.st_ino if st else None
+
+    key = str(LONG_TERM_LOG)
+    stats = _STATS_CACHE.get(key)
+    if stats is not None and not _covers(stats, log_inode, log_size):
+        # Another process compacted (replaced) the log; its sidecar may be current
+        stats = None
+        _CHECKPOINTS.pop(key, None)
+    if stats is None and LONG_TERM_STATS.exists():
+        try:
+            with LONG_TERM_STATS.open("r", encoding="utf-8") as f:
+                stats = json.load(f)
+            _CHECKPOINTS[key] = stats.get("log_size", 0)
+        except json.JSONDecodeError:
+            logger.warning("Long-term memory sidecar is corrupted; rebuilding from log")
+            stats = None
+
+    if stats is None or not _covers(stats, log_inode, log_size):
+        # No sidecar, or the log was replaced/truncated underneath it
+        stats = _empty_stats()
+        _CHECKPOINTS.pop(key, None)
+
+    if stats["log_size"] < log_size:
+        stats = _replay(stats, stats["log_size"])
+        _checkpoint(stats)
+
+    _STATS_CACHE[str(LONG_TERM_LOG)] = stats
+    return stats
 
 
 def append_session_summary(
@@ -48,7 +276,6 @@ def append_session_summary(
     """
     Append a compact summary for a completed session.
     """
-    data = _load_long_term()
     summary = {
         "session_id": session_id,
         "region_id": region_id,
@@ -56,8 +283,22 @@ def append_session_summary(
         "total_cost_usd": total_cost_usd,
         "score": score,
     }
-    data["sessions"].append(summary)
-    _save_long_term(data)
+    line = (json.dumps(summary) + "\n").encode("utf-8")
+
+    with _log_lock():
+        # Catches up on other processes' appends and cuts off a torn last line
+        stats = _load_stats()
+
+        LONG_TERM_LOG.parent.mkdir(parents=True, exist_ok=True)
+        # Unbuffered append: one write(), so concurrent appends don't interleave
+        with LONG_TERM_LOG.open("ab", buffering=0) as f:
+            f.write(line)
+            end = f.tell()
+
+        # Fold in our line plus anything other processes appended since _load_stats
+        _replay(stats, stats["log_size"], end)
+        _checkpoint(stats)
+
     logger.info(
         "Appended long-term memory summary for session %s (region=%s)",
         session_id,
@@ -68,37 +309,136 @@ def append_session_summary(
 def get_recent_summaries(limit: int = 10) -> List[Dict[str, Any]]:
     """
     Return most recent `limit` session summaries.
+    Reads the log backwards from the end, so cost depends on `limit` only.
     """
-    data = _load_long_term()
-    sessions = data.get("sessions", [])
-    return sessions[-limit:]
+    with _log_lock():
+        _migrate_legacy()
+    if limit <= 0 or not LONG_TERM_LOG.exists():
+        return []
+
+    block_size = 64 * 1024
+    summaries: List[Dict[str, Any]] = []
+    with LONG_TERM_LOG.open("rb") as f:
+        with _log_lock(shared=True):
+            # No append is in progress, so the end is a line boundary
+            position = f.seek(0, os.SEEK_END)
+        tail = b""
+        while position > 0 and len(summaries) < limit:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            chunk = f.read(read_size) + tail
+            lines = chunk.split(b"\n")
+            # The first piece may be the end of a line from the previous block
+            tail = lines.pop(0) if position > 0 else b""
+            for line in reversed(lines):
+                summary = _parse_line(line)
+                if summary is not None:
+                    summaries.append(summary)
+                    if len(summaries) >= limit:
+                        break
+
+    summaries.reverse()
+    return summaries
 
 
 def summarize_patterns() -> Dict[str, Any]:
     """
     Produce a very simple "context compaction" summary: averages and best values.
+    Served from the running aggregates; per-region averages are included.
     """
-    data = _load_long_term()
-    sessions = data.get("sessions", [])
-    if not sessions:
-        return {
-            "num_sessions": 0,
-            "avg_co2_reduction_percent": 0.0,
-            "avg_total_cost_usd": 0.0,
-            "best_score": None,
-        }
+    with _log_lock():
+        stats = _load_stats()
+        n = stats["num_sessions"]
+        if not n:
+            return {
+                "num_sessions": 0,
+                "avg_co2_reduction_percent": 0.0,
+                "avg_total_cost_usd": 0.0,
+                "best_score": None,
+            }
 
-    n = len(sessions)
-    total_red = sum(s["co2_reduction_percent"] for s in sessions)
-    total_cost = sum(s["total_cost_usd"] for s in sessions)
-    best_score = max(s["score"] for s in sessions)
+        per_region = {
+            region_id: {
+                "num_sessions": r["num_sessions"],
+                "avg_co2_reduction_percent": r["sum_co2_reduction_percent"] / r["num_sessions"],
+                "avg_total_cost_usd": r["sum_total_cost_usd"] / r["num_sessions"],
+                "best_score": r["best_score"],
+            }
+            for region_id, r in stats["regions"].items()
+        }
 
-    summary = {
-        "num_sessions": n,
-        "avg_co2_reduction_percent": total_red / n,
-        "avg_total_cost_usd": total_cost / n,
-        "best_score": best_score,
-    }
+        summary = {
+            "num_sessions": n,
+            "avg_co2_reduction_percent": stats["sum_co2_reduction_percent"] / n,
+            "avg_total_cost_usd": stats["sum_total_cost_usd"] / n,
+            "best_score": stats["best_score"],
+            "per_region": per_region,
+        }
 
     logger.debug("Computed long-term summary: %s", summary)
     return summary
+
+
+def compact_long_term() -> Dict[str, int]:
+    """
+    Rewrite the log without malformed lines and keep only the latest entry
+    per session_id, then rebuild the aggregates from scratch.
+    Returns counts of lines kept and dropped.
+    """
+    with _log_lock():
+        _migrate_legacy()
+        if not LONG_TERM_LOG.exists():
+            return {"kept": 0, "dropped": 0}
+
+        latest: Dict[str, Dict[str, Any]] = {}
+        total = 0
+        with LONG_TERM_LOG.open("rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                total += 1
+                summary = _parse_line(line)
+                if summary is None or "session_id" not in summary:
+                    continue
+                # Re-insert so the surviving entry keeps its latest position
+                latest.pop(summary["session_id"], None)
+                latest[summary["session_id"]] = summary
+
+        tmp_path = LONG_TERM_LOG.with_name(LONG_TERM_LOG.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            for summary in latest.values():
+                f.write(json.dumps(summary) + "\n")
+        os.replace(tmp_path, LONG_TERM_LOG)
+
+        _STATS_CACHE.pop(str(LONG_TERM_LOG), None)
+        _CHECKPOINTS.pop(str(LONG_TERM_LOG), None)
+        stats = _replay(_empty_stats(), 0)
+        _checkpoint(stats, force=True)
+        _STATS_CACHE[str(LONG_TERM_LOG)] = stats
+
+    result = {"kept": len(latest), "dropped": total - len(latest)}
+    logger.info("Compacted long-term memory log %s: %s", LONG_TERM_LOG, result)
+    return result
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Long-term memory utilities.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser(
+        "compact",
+        help="Drop malformed and duplicate entries from the long-term memory log.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    if args.command == "compact":
+        result = compact_long_term()
+        print(f"Kept {result['kept']} sessions, dropped {result['dropped']} lines")
+
+
+if __name__ == "__main__":
+    main()
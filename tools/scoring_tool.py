@@ -0,0 +1,210 @@
+# Scenario scoring against policy targets
+"""
+tools.scoring_tool
+
+Scores simulated scenarios against a policy's targets:
+
+    score = w_reduction * reduction_score
+            - w_budget * budget_overshoot
+            - w_jobs * jobs_penalty
+
+where reduction_score rewards getting close to or above the CO2 target,
+budget_overshoot is the cost above budget as a fraction of the budget,
+and jobs_penalty is the job loss beyond the allowed maximum.
+
+score_scenario scores one simulation result; score_arrays / score_batch
+score whole columns of results in one NumPy pass. Both use the same
+operations in the same order, so they agree bit for bit.
+
+The reduction scored depends on the basis: "final" uses the end-state
+co2_reduction_percent, "cumulative" the cut in cumulative emissions over
+the horizon (cumulative_reduction_percent from a trajectory). Results
+without a trajectory take full effect at once, so for them both agree.
+
+pareto_frontier skips the weights altogether: it finds the results no
+other result beats on reduction, cost and jobs at once, with a sort and
+a sweep over a (cost, jobs) staircase instead of pairwise comparisons.
+"""
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.config import SCORE_WEIGHT_BUDGET, SCORE_WEIGHT_JOBS, SCORE_WEIGHT_REDUCTION
+
+
+@dataclass(frozen=True)
+class ScoringWeights:
+    """Weights of the reduction reward and the budget / job-loss penalties."""
+
+    reduction: float = SCORE_WEIGHT_REDUCTION
+    budget: float = SCORE_WEIGHT_BUDGET
+    jobs: float = SCORE_WEIGHT_JOBS
+
+
+DEFAULT_WEIGHTS = ScoringWeights()
+
+SCORE_BASES = ("final", "cumulative")
+
+
+def _reduction_key(basis: str) -> str:
+    if basis == "final":
+        return "co2_reduction_percent"
+    if basis == "cumulative":
+        return "cumulative_reduction_percent"
+    raise ValueError(f"Unknown score basis '{basis}'. Expected one of {SCORE_BASES}")
+
+
+def _targets(policy: Mapping[str, Any]) -> Tuple[float, Optional[float], float]:
+    targets = policy["targets"]
+    return (
+        targets["co2_reduction_percent"],
+        targets.get("budget_limit_usd"),
+        targets.get("job_loss_max_percent", 5),
+    )
+
+
+def score_scenario(
+    policy: Mapping[str, Any],
+    sim: Mapping[str, Any],
+    weights: Optional[ScoringWeights] = None,
+    basis: str = "final",
+) -> float:
+    """Score one simulation result against the policy targets."""
+    weights = weights or DEFAULT_WEIGHTS
+    target_reduction, budget_limit, job_limit = _targets(policy)
+
+    reduction = sim.get(_reduction_key(basis), sim["co2_reduction_percent"])
+    # reward getting close to or above target
+    reduction_score = reduction - max(0.0, target_reduction - reduction)
+
+    cost = sim["total_cost_usd"]
+    if budget_limit is not None and cost > budget_limit:
+        budget_overshoot = (cost - budget_limit) / max(budget_limit, 1.0)
+    else:
+        budget_overshoot = 0.0
+
+    jobs_change = sim.get("estimated_jobs_change_percent", 0.0)
+    jobs_penalty = 0.0
+    if jobs_change < -job_limit:
+        jobs_penalty = abs(jobs_change) - job_limit
+
+    return weights.reduction * reduction_score - weights.budget * budget_overshoot - weights.jobs * jobs_penalty
+
+
+def score_arrays(
+    policy: Mapping[str, Any],
+    reduction: np.ndarray,
+    cost: np.ndarray,
+    jobs: np.ndarray,
+    weights: Optional[ScoringWeights] = None,
+) -> np.ndarray:
+    """
+    Vectorized score_scenario over columns of CO2 reduction percent, total
+    cost and jobs change percent. Returns a float64 array of scores.
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    target_reduction, budget_limit, job_limit = _targets(policy)
+
+    reduction = np.asarray(reduction, dtype=np.float64)
+    cost = np.asarray(cost, dtype=np.float64)
+    jobs = np.asarray(jobs, dtype=np.float64)
+
+    reduction_score = reduction - np.maximum(0.0, target_reduction - reduction)
+
+    if budget_limit is not None:
+        budget_overshoot = np.where(cost > budget_limit, (cost - budget_limit) / max(budget_limit, 1.0), 0.0)
+    else:
+        budget_overshoot = np.zeros_like(cost)
+
+    jobs_penalty = np.where(jobs < -job_limit, np.abs(jobs) - job_limit, 0.0)
+
+    return weights.reduction * reduction_score - weights.budget * budget_overshoot - weights.jobs * jobs_penalty
+
+
+def score_batch(
+    policy: Mapping[str, Any],
+    batch: Mapping[str, np.ndarray],
+    weights: Optional[ScoringWeights] = None,
+    basis: str = "final",
+) -> np.ndarray:
+    """Score a column batch, e.g. the result of simulation_tool.simulate_batch."""
+    n = len(batch["co2_reduction_percent"])
+    jobs = batch.get("estimated_jobs_change_percent")
+    reduction = batch.get(_reduction_key(basis))
+    return score_arrays(
+        policy,
+        reduction if reduction is not None else batch["co2_reduction_percent"],
+        batch["total_cost_usd"],
+        jobs if jobs is not None else np.zeros(n),
+        weights,
+    )
+
+
+def simulation_columns(simulations: Sequence[Mapping[str, Any]], basis: str = "final") -> Dict[str, np.ndarray]:
+    """
+    Column batch of per-scenario simulation result dicts, with the basis
+    reduction under "co2_reduction_percent".
+    """
+    n = len(simulations)
+    key = _reduction_key(basis)
+    columns: Dict[str, np.ndarray] = {
+        "co2_reduction_percent": np.fromiter(
+            (sim.get(key, sim["co2_reduction_percent"]) for sim in simulations), dtype=np.float64, count=n
+        ),
+        "total_cost_usd": np.fromiter((sim["total_cost_usd"] for sim in simulations), dtype=np.float64, count=n),
+        "estimated_jobs_change_percent": np.fromiter(
+            (sim.get("estimated_jobs_change_percent", 0.0) for sim in simulations), dtype=np.float64, count=n
+        ),
+    }
+    return columns
+
+
+def score_simulations(
+    policy: Mapping[str, Any],
+    simulations: Sequence[Mapping[str, Any]],
+    weights: Optional[ScoringWeights] = None,
+    basis: str = "final",
+) -> np.ndarray:
+    """Score a list of per-scenario simulation result dicts in one pass."""
+    return score_batch(policy, simulation_columns(simulations, basis), weights)
+
+
+def pareto_frontier(reduction: np.ndarray, cost: np.ndarray, jobs: np.ndarray) -> np.ndarray:
+    """
+    Indices of the non-dominated results, by decreasing reduction.
+
+    A result is dominated when another has at least its reduction, at most
+    its cost and at least its jobs change, and is strictly better on one.
+    Of identical results only the first is kept.
+
+    Results are sorted by reduction (best first), so each is dominated
+    exactly when an earlier kept result beats it on (cost, jobs). The
+    kept results' 2-D non-dominated set is a staircase, ascending in both
+    cost and jobs; one binary search finds the best jobs at or below a
+    result's cost, so the sweep is O(n log n).
+    """
+    reduction = np.asarray(reduction, dtype=np.float64)
+    cost = np.asarray(cost, dtype=np.float64)
+    jobs = np.asarray(jobs, dtype=np.float64)
+
+    # Best reduction first; ties by lower cost, then higher jobs, then input order
+    order = np.lexsort((-jobs, cost, -reduction))
+
+    stair_cost: List[float] = []
+    stair_jobs: List[float] = []
+    frontier: List[int] = []
+    for i, c, j in zip(order.tolist(), cost[order].tolist(), jobs[order].tolist()):
+        k = bisect_right(stair_cost, c)
+        if k and stair_jobs[k - 1] >= j:
+            continue
+        frontier.append(i)
+        # Drop the steps the new point covers: cost >= c with jobs <= j
+        lo = bisect_left(stair_cost, c)
+        hi = bisect_right(stair_jobs, j, lo)
+        stair_cost[lo:hi] = [c]
+        stair_jobs[lo:hi] = [j]
+
+    return np.asarray(frontier, dtype=np.intp)
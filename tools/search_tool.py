@@ -0,0 +1,585 @@
+# Portfolio search over the intervention catalog
+"""
+tools.search_tool
+
+Searches the intervention x scale space for the best-scoring portfolios,
+instead of sampling random ones.
+
+A portfolio is a set of distinct interventions, each at a scale (low,
+medium, high). It is simulated with simulation_tool semantics and scored
+with scoring_tool, exactly as SimulationAgent and EvaluationAgent would,
+on the same score basis. On the cumulative basis every action's reduction
+is weighted by its mean ramp-up over the policy's time_horizon_years;
+summed, these give the cumulative reduction, except for portfolios that
+cut more than the baseline in some year, which are rescored year by year.
+
+branch_and_bound enumerates portfolios depth-first in catalog order and
+prunes a subtree when even its most optimistic completion cannot beat
+the current N-th best score. The optimistic completion adds the largest
+remaining reductions, the largest cost savings and the largest job gains,
+each taken independently. That bounds the score from above because the
+score never decreases with more reduction, less cost or more jobs (for
+non-negative weights). The search is exact unless it hits `max_nodes`.
+
+evolutionary_search is for catalogs too large to enumerate. It evolves a
+population of portfolios with tournament selection, crossover on action
+sets and scale/swap/resize mutation. Each generation is simulated and
+scored in one vectorized call (simulate_compiled + score_batch). It yields
+the portfolios that entered the top N after each generation, so callers
+can stream them on as the search runs. It stops after `generations`, or
+earlier once the evaluation or wall-clock budget is spent.
+
+hill_climb is steepest-ascent local search from random starts. A step
+scores every one-action edit of the current portfolio (add, remove,
+rescale, swap) through O(1) simulation_tool.apply_delta updates rather
+than re-simulating, and moves to the best improving one. Portfolios it
+settles on are re-anchored on exact totals from an AccumulatorCache, which
+callers can share across searches.
+"""
+
+import heapq
+import logging
+import random
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from tools.intervention_tool import InterventionCatalog
+from tools.scoring_tool import DEFAULT_WEIGHTS, SCORE_BASES, ScoringWeights, score_batch, score_scenario
+from tools.simulation_tool import (
+    SCALE_FACTORS,
+    AccumulatorCache,
+    ScenarioAccumulator,
+    action_terms,
+    apply_delta,
+    baseline_emissions,
+    catalog_ramp_up,
+    ramp_fractions,
+    simulate_compiled,
+    simulate_trajectory,
+)
+
+logger = logging.getLogger(__name__)
+
+# (score, actions) with actions in catalog order, best first
+RankedPortfolio = Tuple[float, List[Dict[str, str]]]
+
+# Bounds are summed in a different order than the exact totals
+_BOUND_TOLERANCE = 1e-9
+
+
+class _Objective:
+    """
+    Scores portfolios from their running totals on a score basis.
+
+    weighted(i, reduction) is an action's reduction as it counts on the
+    basis: as is for "final", times intervention i's mean ramp-up for
+    "cumulative". Portfolios carry the sum of these next to their
+    ScenarioAccumulator; score() also takes the portfolio's
+    (intervention, reduction) pairs, read only when a year may be clipped
+    at zero emissions.
+    """
+
+    def __init__(
+        self,
+        region: Mapping[str, Any],
+        policy: Mapping[str, Any],
+        interventions_catalog: InterventionCatalog,
+        weights: ScoringWeights,
+        basis: str,
+    ) -> None:
+        if basis not in SCORE_BASES:
+            raise ValueError(f"Unknown score basis '{basis}'. Expected one of {SCORE_BASES}")
+        self.policy = policy
+        self.weights = weights
+        self.basis = basis
+        self.baseline = baseline_emissions(region)
+        self.cumulative = basis == "cumulative"
+        if self.cumulative:
+            years = max(1, int(policy.get("time_horizon_years", 1)))
+            self.curves = ramp_fractions(catalog_ramp_up(interventions_catalog), years)
+            self.ramp: List[float] = self.curves.mean(axis=1).tolist()
+            # With no negative reductions no year cuts more than the end state
+            self.monotone = bool(np.all(interventions_catalog.reduction >= 0))
+
+    def weighted(self, i: int, reduction: float) -> float:
+        return reduction * self.ramp[i] if self.cumulative else reduction
+
+    def score(
+        self,
+        acc: ScenarioAccumulator,
+        weighted: float,
+        portfolio: Callable[[], Iterable[Tuple[int, float]]],
+    ) -> float:
+        sim = acc.result()
+        if self.cumulative:
+            baseline = self.baseline
+            if self.monotone and acc.total_reduction <= baseline:
+                reduction = weighted / baseline * 100.0
+            else:
+                yearly = np.zeros(self.curves.shape[1])
+                for i, amount in portfolio():
+                    yearly += amount * self.curves[i]
+                total = baseline * len(yearly)
+                reduction = (total - np.maximum(baseline - yearly, 0.0).sum()) / total * 100.0
+            sim["cumulative_reduction_percent"] = float(reduction)
+        return score_scenario(self.policy, sim, self.weights, self.basis)
+
+
+def _top_suffix_sums(values: Sequence[float], depth: int) -> List[List[float]]:
+    """
+    For each start position k, cumulative sums of the `depth` largest
+    positive values among values[k:]: sums[k][m] = best total from m picks.
+    """
+    sums: List[List[float]] = [[0.0] * (depth + 1) for _ in range(len(values) + 1)]
+    best: List[float] = []
+    for k in range(len(values) - 1, -1, -1):
+        if values[k] > 0:
+            best = sorted(best + [values[k]], reverse=True)[:depth]
+        running = 0.0
+        row = sums[k]
+        for m in range(1, depth + 1):
+            if m <= len(best):
+                running += best[m - 1]
+            row[m] = running
+    return sums
+
+
+def branch_and_bound(
+    region: Mapping[str, Any],
+    policy: Mapping[str, Any],
+    interventions_catalog: InterventionCatalog,
+    top_n: int = 3,
+    min_actions: int = 1,
+    max_actions: int = 4,
+    weights: Optional[ScoringWeights] = None,
+    max_nodes: int = 2_000_000,
+    basis: str = "final",
+) -> List[RankedPortfolio]:
+    """
+    Return the `top_n` best-scoring portfolios of min_actions..max_actions
+    distinct interventions, best first, scored on `basis`. Ties keep
+    enumeration order.
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    if min(weights.reduction, weights.budget, weights.jobs) < 0:
+        raise ValueError("branch_and_bound needs non-negative scoring weights")
+
+    n = len(interventions_catalog.ids)
+    max_actions = max(1, min(max_actions, n))
+    min_actions = max(1, min(min_actions, max_actions))
+    if n == 0 or top_n <= 0:
+        return []
+
+    objective = _Objective(region, policy, interventions_catalog, weights, basis)
+    baseline = objective.baseline
+    scales = sorted(SCALE_FACTORS.items(), key=lambda item: item[1], reverse=True)
+
+    # Per intervention and scale, the exact terms simulate_scenario adds up,
+    # plus the reduction as weighted on the score basis
+    terms: List[List[Tuple[str, float, float, float, float]]] = []
+    for i, iv_id in enumerate(interventions_catalog.ids):
+        iv = interventions_catalog[iv_id]
+        for_scales = []
+        for label, _ in scales:
+            reduction, cost, jobs = action_terms(iv, label, baseline)
+            for_scales.append((label, reduction, cost, jobs, objective.weighted(i, reduction)))
+        terms.append(for_scales)
+
+    # The weighted reduction never falls short of the scored one
+    best_reduction = _top_suffix_sums([max(t[4] for t in ts) for ts in terms], max_actions)
+    best_saving = _top_suffix_sums([-min(t[2] for t in ts) for ts in terms], max_actions)
+    best_jobs = _top_suffix_sums([max(t[3] for t in ts) for ts in terms], max_actions)
+
+    # Min-heap of (score, -order, actions): the root is the worst kept portfolio
+    top: List[Tuple[float, int, List[Dict[str, str]]]] = []
+    counters = {"order": 0, "nodes": 0}
+    chosen: List[Dict[str, str]] = []
+    # (catalog position, reduction) of each chosen action
+    chosen_terms: List[Tuple[int, float]] = []
+
+    def bound(k: int, slots: int, weighted: float, total_cost: float, jobs_impact: float) -> float:
+        acc = ScenarioAccumulator(
+            baseline,
+            weighted + best_reduction[k][slots],
+            total_cost - best_saving[k][slots],
+            jobs_impact + best_jobs[k][slots],
+        )
+        return score_scenario(policy, acc.result(), weights)
+
+    def visit(k: int, total_reduction: float, total_cost: float, jobs_impact: float, weighted: float) -> None:
+        slots = max_actions - len(chosen)
+        if len(top) >= top_n:
+            if bound(k, slots, weighted, total_cost, jobs_impact) < top[0][0] - _BOUND_TOLERANCE * (
+                1.0 + abs(top[0][0])
+            ):
+                return
+
+        for i in range(k, n):
+            for label, reduction, cost, jobs, weighted_reduction in terms[i]:
+                counters["nodes"] += 1
+                if counters["nodes"] > max_nodes:
+                    return
+
+                chosen.append({"id": interventions_catalog.ids[i], "scale": label})
+                chosen_terms.append((i, reduction))
+                r = total_reduction + reduction
+                c = total_cost + cost
+                j = jobs_impact + jobs
+                w = weighted + weighted_reduction
+
+                if len(chosen) >= min_actions:
+                    score = objective.score(ScenarioAccumulator(baseline, r, c, j), w, lambda: chosen_terms)
+                    counters["order"] += 1
+                    entry = (score, -counters["order"], list(chosen))
+                    if len(top) < top_n:
+                        heapq.heappush(top, entry)
+                    elif entry[:2] > top[0][:2]:
+                        heapq.heapreplace(top, entry)
+
+                if len(chosen) < max_actions:
+                    visit(i + 1, r, c, j, w)
+                chosen.pop()
+                chosen_terms.pop()
+
+    visit(0, 0.0, 0.0, 0.0, 0.0)
+
+    if counters["nodes"] > max_nodes:
+        logger.warning(
+            "branch_and_bound stopped after %d nodes; results are the best found, not guaranteed optimal",
+            max_nodes,
+        )
+    else:
+        logger.debug("branch_and_bound explored %d nodes over %d interventions", counters["nodes"], n)
+
+    ranked = sorted(top, key=lambda e: e[:2], reverse=True)
+    return [(score, actions) for score, _, actions in ranked]
+
+
+# (catalog position, scale label) pairs sorted by position: one portfolio
+Genome = Tuple[Tuple[int, str], ...]
+
+
+def _genome_actions(genome: Genome, interventions_catalog: InterventionCatalog) -> List[Dict[str, str]]:
+    return [{"id": interventions_catalog.ids[i], "scale": label} for i, label in genome]
+
+
+def _score_genomes(
+    genomes: Sequence[Genome],
+    region: Mapping[str, Any],
+    baseline: float,
+    policy: Mapping[str, Any],
+    interventions_catalog: InterventionCatalog,
+    max_actions: int,
+    weights: ScoringWeights,
+    basis: str,
+) -> np.ndarray:
+    """
+    Simulate and score a generation in one vectorized pass; on the
+    cumulative basis, with trajectories over the policy horizon.
+    """
+    iv_index = np.full((len(genomes), max_actions), -1, dtype=np.int64)
+    scale = np.zeros((len(genomes), max_actions), dtype=np.float64)
+    for row, genome in enumerate(genomes):
+        for col, (i, label) in enumerate(genome):
+            iv_index[row, col] = i
+            scale[row, col] = SCALE_FACTORS[label]
+
+    batch = simulate_compiled(
+        baseline,
+        iv_index,
+        scale,
+        interventions_catalog.reduction,
+        interventions_catalog.cost,
+        interventions_catalog.jobs,
+    )
+    if basis == "cumulative":
+        years = max(1, int(policy.get("time_horizon_years", 1)))
+        scenarios = [{"actions": _genome_actions(genome, interventions_catalog)} for genome in genomes]
+        trajectory = simulate_trajectory(region, scenarios, interventions_catalog, years)
+        batch["cumulative_reduction_percent"] = trajectory["cumulative_reduction_percent"]
+    return score_batch(policy, batch, weights, basis)
+
+
+def evolutionary_search(
+    region: Mapping[str, Any],
+    policy: Mapping[str, Any],
+    interventions_catalog: InterventionCatalog,
+    top_n: int = 3,
+    min_actions: int = 1,
+    max_actions: int = 4,
+    population: int = 64,
+    generations: int = 50,
+    max_evaluations: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    mutation_rate: float = 0.3,
+    weights: Optional[ScoringWeights] = None,
+    rng: Optional[random.Random] = None,
+    basis: str = "final",
+) -> Iterator[List[RankedPortfolio]]:
+    """
+    Evolve portfolios of min_actions..max_actions distinct interventions,
+    scored on `basis`.
+
+    After each generation, yields the portfolios that newly entered the top
+    `top_n`, best first (generations that improve nothing yield nothing).
+    Every distinct portfolio is evaluated at most once; `max_evaluations`
+    caps those evaluations and `time_budget` (seconds) caps wall-clock time.
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    rng = rng or random.Random()
+    if basis not in SCORE_BASES:
+        raise ValueError(f"Unknown score basis '{basis}'. Expected one of {SCORE_BASES}")
+    n = len(interventions_catalog.ids)
+    if n == 0 or top_n <= 0:
+        return
+
+    max_actions = max(1, min(max_actions, n))
+    min_actions = max(1, min(min_actions, max_actions))
+    population = max(2, population)
+    n_elite = max(1, population // 10)
+    labels = list(SCALE_FACTORS)
+    baseline = baseline_emissions(region)
+    deadline = time.monotonic() + time_budget if time_budget else None
+
+    def random_genome() -> Genome:
+        k = rng.randint(min_actions, max_actions)
+        return tuple(sorted((i, rng.choice(labels)) for i in rng.sample(range(n), k)))
+
+    def crossover(a: Genome, b: Genome) -> Dict[int, str]:
+        pool: Dict[int, str] = dict(a)
+        for i, label in b:
+            if i not in pool or rng.random() < 0.5:
+                pool[i] = label
+        k = rng.randint(min_actions, max_actions)
+        keep = rng.sample(list(pool), min(k, len(pool)))
+        return {i: pool[i] for i in keep}
+
+    def mutate(actions: Dict[int, str]) -> None:
+        op = rng.random()
+        if op < 0.4 and actions:
+            # Scale mutation
+            i = rng.choice(list(actions))
+            actions[i] = rng.choice([label for label in labels if label != actions[i]] or labels)
+        elif op < 0.7 and actions and len(actions) < n:
+            # Swap one intervention for one not in the portfolio
+            del actions[rng.choice(list(actions))]
+            actions[rng.choice([i for i in range(n) if i not in actions])] = rng.choice(labels)
+        elif len(actions) < max_actions and (len(actions) <= min_actions or rng.random() < 0.5):
+            actions[rng.choice([i for i in range(n) if i not in actions])] = rng.choice(labels)
+        elif len(actions) > min_actions:
+            del actions[rng.choice(list(actions))]
+
+    def tournament(ranked: List[Tuple[float, Genome]]) -> Genome:
+        return max(rng.sample(ranked, min(3, len(ranked))), key=lambda e: e[0])[1]
+
+    seen: Dict[Genome, float] = {}
+    # Min-heap of (score, -order, genome); the root is the worst kept
+    top: List[Tuple[float, int, Genome]] = []
+    emitted: Set[Genome] = set()
+    evaluations = 0
+
+    current = [random_genome() for _ in range(population)]
+    for generation in range(generations):
+        fresh = list(dict.fromkeys(g for g in current if g not in seen))
+        if max_evaluations is not None:
+            fresh = fresh[: max(0, max_evaluations - evaluations)]
+        if fresh:
+            scores = _score_genomes(
+                fresh, region, baseline, policy, interventions_catalog, max_actions, weights, basis
+            )
+            for genome, score in zip(fresh, scores.tolist()):
+                evaluations += 1
+                seen[genome] = score
+                entry = (score, -evaluations, genome)
+                if len(top) < top_n:
+                    heapq.heappush(top, entry)
+                elif entry[:2] > top[0][:2]:
+                    heapq.heapreplace(top, entry)
+
+        improved = sorted((e for e in top if e[2] not in emitted), key=lambda e: e[:2], reverse=True)
+        if improved:
+            emitted.update(e[2] for e in improved)
+            logger.debug(
+                "evolutionary_search generation %d: %d new top portfolios, best %.3f",
+                generation,
+                len(improved),
+                improved[0][0],
+            )
+            yield [(score, _genome_actions(genome, interventions_catalog)) for score, _, genome in improved]
+
+        if max_evaluations is not None and evaluations >= max_evaluations:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+
+        ranked = sorted(((seen[g], g) for g in current if g in seen), key=lambda e: e[0], reverse=True)
+        if not ranked:
+            break
+        next_generation: List[Genome] = [g for _, g in ranked[:n_elite]]
+        while len(next_generation) < population:
+            child = crossover(tournament(ranked), tournament(ranked))
+            if rng.random() < mutation_rate or len(child) < min_actions:
+                mutate(child)
+            while len(child) < min_actions:
+                child[rng.choice([i for i in range(n) if i not in child])] = rng.choice(labels)
+            next_generation.append(tuple(sorted(child.items())))
+        current = next_generation
+
+    logger.debug("evolutionary_search evaluated %d portfolios over %d interventions", evaluations, n)
+
+
+# One edit of a portfolio: (catalog position, old scale or None, new scale or None)
+Edit = Tuple[int, Optional[str], Optional[str]]
+
+
+def hill_climb(
+    region: Mapping[str, Any],
+    policy: Mapping[str, Any],
+    interventions_catalog: InterventionCatalog,
+    top_n: int = 3,
+    min_actions: int = 1,
+    max_actions: int = 4,
+    restarts: int = 8,
+    max_steps: int = 100,
+    weights: Optional[ScoringWeights] = None,
+    rng: Optional[random.Random] = None,
+    accumulators: Optional[AccumulatorCache] = None,
+    basis: str = "final",
+) -> List[RankedPortfolio]:
+    """
+    Return the `top_n` best portfolios of min_actions..max_actions distinct
+    interventions seen over `restarts` climbs, best first, scored on
+    `basis`.
+
+    Each climb starts from a random portfolio and takes the best improving
+    neighbour until none improves or `max_steps` is reached. Neighbours are
+    scored from delta-updated accumulators. Start points, accepted moves and
+    the returned portfolios use exact accumulators from `accumulators` (a
+    fresh AccumulatorCache by default), so delta rounding never carries over
+    a step and the returned scores are exact.
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    rng = rng or random.Random()
+    cache = accumulators if accumulators is not None else AccumulatorCache()
+    n = len(interventions_catalog.ids)
+    if n == 0 or top_n <= 0:
+        return []
+
+    max_actions = max(1, min(max_actions, n))
+    min_actions = max(1, min(min_actions, max_actions))
+    ids = interventions_catalog.ids
+    labels = list(SCALE_FACTORS)
+    objective = _Objective(region, policy, interventions_catalog, weights, basis)
+    # (catalog position, scale) -> (reduction, reduction weighted on the basis)
+    reductions: Dict[Tuple[int, str], Tuple[float, float]] = {}
+    for i, iv_id in enumerate(ids):
+        for label in labels:
+            reduction = action_terms(interventions_catalog[iv_id], label, objective.baseline)[0]
+            reductions[(i, label)] = (reduction, objective.weighted(i, reduction))
+
+    def exact(actions: Mapping[int, str]) -> Tuple[ScenarioAccumulator, float]:
+        genome: Genome = tuple(sorted(actions.items()))
+        scenario = {"actions": _genome_actions(genome, interventions_catalog)}
+        weighted = sum(reductions[item][1] for item in genome)
+        return cache.get(region, scenario, interventions_catalog), weighted
+
+    def pairs(actions: Mapping[int, str], edits: Sequence[Edit] = ()) -> Iterator[Tuple[int, float]]:
+        portfolio = dict(actions)
+        for i, _, new in edits:
+            if new is None:
+                del portfolio[i]
+            else:
+                portfolio[i] = new
+        return ((i, reductions[(i, label)][0]) for i, label in portfolio.items())
+
+    # Min-heap of (score, -order, genome); the root is the worst kept
+    top: List[Tuple[float, int, Genome]] = []
+    kept: Set[Genome] = set()
+    counters = {"order": 0, "evaluations": 0}
+
+    def record(score: float, actions: Dict[int, str], edits: Sequence[Edit]) -> None:
+        counters["evaluations"] += 1
+        if len(top) >= top_n and score <= top[0][0]:
+            return
+        portfolio = dict(actions)
+        for i, _, new in edits:
+            if new is None:
+                del portfolio[i]
+            else:
+                portfolio[i] = new
+        genome: Genome = tuple(sorted(portfolio.items()))
+        if genome in kept:
+            return
+        counters["order"] += 1
+        entry = (score, -counters["order"], genome)
+        if len(top) < top_n:
+            heapq.heappush(top, entry)
+        else:
+            kept.discard(heapq.heapreplace(top, entry)[2])
+        kept.add(genome)
+
+    def neighbours(actions: Dict[int, str]) -> Iterator[Sequence[Edit]]:
+        outside = [j for j in range(n) if j not in actions]
+        for i, old in actions.items():
+            for label in labels:
+                if label != old:
+                    yield ((i, old, label),)
+            if len(actions) > min_actions:
+                yield ((i, old, None),)
+            for j in outside:
+                for label in labels:
+                    yield ((i, old, None), (j, None, label))
+        if len(actions) < max_actions:
+            for j in outside:
+                for label in labels:
+                    yield ((j, None, label),)
+
+    for _ in range(max(1, restarts)):
+        k = rng.randint(min_actions, max_actions)
+        actions = {i: rng.choice(labels) for i in sorted(rng.sample(range(n), k))}
+        acc, weighted = exact(actions)
+        score = objective.score(acc, weighted, partial(pairs, actions))
+        record(score, actions, ())
+
+        for _ in range(max_steps):
+            best: Optional[Tuple[float, Sequence[Edit]]] = None
+            for edits in neighbours(actions):
+                candidate, candidate_weighted = acc, weighted
+                for i, old, new in edits:
+                    candidate = apply_delta(candidate, interventions_catalog, ids[i], old, new)
+                    if old is not None:
+                        candidate_weighted -= reductions[(i, old)][1]
+                    if new is not None:
+                        candidate_weighted += reductions[(i, new)][1]
+                candidate_score = objective.score(candidate, candidate_weighted, partial(pairs, actions, edits))
+                record(candidate_score, actions, edits)
+                if candidate_score > (score if best is None else best[0]):
+                    best = (candidate_score, edits)
+            if best is None:
+                break
+            for i, _, new in best[1]:
+                if new is None:
+                    del actions[i]
+                else:
+                    actions[i] = new
+            acc, weighted = exact(actions)
+            score = objective.score(acc, weighted, partial(pairs, actions))
+
+    logger.debug(
+        "hill_climb scored %d portfolios over %d interventions in %d restarts",
+        counters["evaluations"],
+        n,
+        restarts,
+    )
+
+    # Deltas drift by rounding; report scores for the portfolios as simulated
+    ranked = []
+    for _, order, genome in top:
+        actions_list = _genome_actions(genome, interventions_catalog)
+        acc, weighted = exact(dict(genome))
+        ranked.append((objective.score(acc, weighted, partial(pairs, dict(genome))), order, actions_list))
+    ranked.sort(key=lambda e: e[:2], reverse=True)
+    return [(score, actions_list) for score, _, actions_list in ranked]
@@ -0,0 +1,275 @@
+# Sensitivity of scenario scores to catalog parameters
+"""
+tools.sensitivity_tool
+
+Finds which intervention parameters in interventions.csv drive a
+session's result. Each per-unit parameter (reduction, cost, job impact)
+of each intervention the ranked scenarios use is moved down and up, one
+at a time, and the scenarios are re-simulated and re-scored. Parameters
+are ranked by the swing they cause in the best scenario's score, as in
+a tornado chart, with the scenario that would win at each end.
+
+The simulation model is linear in every parameter, so a perturbed total
+is the unperturbed total plus the parameter change times the
+intervention's summed scale in the scenario. The catalog and scenarios
+are compiled once and every perturbation is evaluated in one broadcast
+pass, without re-running the agent pipeline.
+
+Run on a saved report:
+
+    python -m tools.sensitivity_tool analyze <session_id> [--perturbation 0.1 | --bounds]
+
+Scores use the session's score basis and weights, as recorded in the
+report's metrics. On the "cumulative" basis, reduction is the cut in
+cumulative emissions over the policy's horizon: per-year totals follow
+each intervention's ramp-up, as in simulation_tool.simulate_trajectory,
+and stay linear in every parameter.
+"""
+
+import argparse
+import json
+import logging
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+
+from tools.intervention_tool import UNCERTAIN_COLUMNS, get_catalog
+from tools.scoring_tool import SCORE_BASES, ScoringWeights, score_arrays
+from tools.simulation_tool import (
+    baseline_emissions,
+    catalog_bounds,
+    catalog_ramp_up,
+    compile_catalog,
+    compile_scenarios,
+    ramp_fractions,
+)
+from tools.storage_tool import load_report
+
+logger = logging.getLogger(__name__)
+
+
+def _reduction_percent(baseline: float, total_reduction: np.ndarray) -> np.ndarray:
+    new_emissions = np.maximum(baseline - total_reduction, 0.0)
+    return (baseline - new_emissions) / baseline * 100.0
+
+
+def _cumulative_reduction_percent(baseline: float, yearly_reduction: np.ndarray) -> np.ndarray:
+    """Cut in cumulative emissions from (..., years, scenarios) per-year reductions."""
+    years = yearly_reduction.shape[-2]
+    cumulative = np.maximum(baseline - yearly_reduction, 0.0).sum(axis=-2)
+    return (baseline * years - cumulative) / (baseline * years) * 100.0
+
+
+def sensitivity_analysis(
+    policy: Mapping[str, Any],
+    region: Mapping[str, Any],
+    scenarios: List[Dict[str, Any]],
+    interventions_catalog: Optional[Mapping[str, Mapping[str, Any]]] = None,
+    perturbation: float = 0.1,
+    use_bounds: bool = False,
+    weights: Optional[ScoringWeights] = None,
+    basis: str = "final",
+) -> Dict[str, Any]:
+    """
+    Tornado ranking of catalog parameters for the best of `scenarios`,
+    scored with `weights` on `basis` (see tools.scoring_tool).
+
+    Each parameter moves by +/- perturbation x |value|, or to its _low /
+    _high catalog bounds with use_bounds. Returns the best scenario's id
+    and score plus "rankings": one entry per (intervention, parameter)
+    with the parameter values and best-scenario scores at both ends, the
+    swing between them and the winning scenario at each end, largest
+    swing first. Interventions no scenario uses cannot move any score
+    and are left out.
+    """
+    if not scenarios:
+        raise ValueError("sensitivity_analysis needs at least one scenario")
+    if basis not in SCORE_BASES:
+        raise ValueError(f"Unknown score basis '{basis}'. Expected one of {SCORE_BASES}")
+    if interventions_catalog is None:
+        interventions_catalog = get_catalog()
+
+    baseline = baseline_emissions(region)
+    index, reduction, cost, jobs = compile_catalog(interventions_catalog)
+    ids = list(index)
+    iv_index, scale = compile_scenarios(scenarios, index)
+
+    # units[u, s]: summed scale factor of used intervention u in scenario s
+    valid = iv_index >= 0
+    used, slot_used = np.unique(iv_index[valid], return_inverse=True)
+    units = np.zeros((len(used), len(scenarios)), dtype=np.float64)
+    np.add.at(units, (slot_used, np.nonzero(valid)[0]), scale[valid])
+
+    # Per-unit parameter -> contribution to its total per unit of scale
+    columns = {
+        "base_reduction_percent_per_unit": (reduction, baseline / 100.0),
+        "base_cost_usd_per_unit": (cost, 1.0),
+        "job_impact_percent_per_unit": (jobs, 1.0),
+    }
+    totals = {name: (values[used] * factor) @ units for name, (values, factor) in columns.items()}
+
+    if basis == "cumulative":
+        # ramp[u, t]: share of intervention u's effect reached in year t
+        years = max(1, int(policy.get("time_horizon_years", 1)))
+        ramp = ramp_fractions(catalog_ramp_up(interventions_catalog)[used], years)
+        reduction_values, reduction_factor = columns["base_reduction_percent_per_unit"]
+        # (years, scenarios) reduction in each year
+        yearly = ((reduction_values[used] * reduction_factor)[:, None] * ramp).T @ units
+        base_cumulative = _cumulative_reduction_percent(baseline, yearly)
+
+    def scores(totals: Mapping[str, np.ndarray], reduction: Optional[np.ndarray] = None) -> np.ndarray:
+        if reduction is None:
+            if basis == "cumulative":
+                reduction = base_cumulative
+            else:
+                reduction = _reduction_percent(baseline, totals["base_reduction_percent_per_unit"])
+        return score_arrays(
+            policy,
+            reduction,
+            totals["base_cost_usd_per_unit"],
+            totals["job_impact_percent_per_unit"],
+            weights,
+        )
+
+    base_scores = scores(totals)
+    best = int(np.argmax(base_scores))
+    bounds = catalog_bounds(interventions_catalog)
+
+    rankings: List[Dict[str, Any]] = []
+    for name in UNCERTAIN_COLUMNS:
+        values, factor = columns[name]
+        mode = values[used]
+        if use_bounds:
+            ends = np.stack([bounds[name][0][used], bounds[name][2][used]])
+        else:
+            ends = np.stack([mode - perturbation * np.abs(mode), mode + perturbation * np.abs(mode)])
+
+        # (2, used, scenarios): lowered / raised, one intervention at a time
+        perturbed = dict(totals)
+        perturbed[name] = totals[name] + ((ends - mode) * factor)[:, :, None] * units
+        reduction = None
+        if basis == "cumulative" and name == "base_reduction_percent_per_unit":
+            # (2, used, years, scenarios): the change ramps in like the intervention
+            delta = ((ends - mode) * factor)[:, :, None, None] * ramp[None, :, :, None] * units[None, :, None, :]
+            reduction = _cumulative_reduction_percent(baseline, yearly + delta)
+        perturbed_scores = scores(perturbed, reduction)
+        winners = perturbed_scores.argmax(axis=2)
+
+        for u, i in enumerate(used.tolist()):
+            score_low, score_high = perturbed_scores[:, u, best].tolist()
+            rankings.append(
+                {
+                    "intervention": ids[i],
+                    "parameter": name,
+                    "value": float(mode[u]),
+                    "low": float(ends[0, u]),
+                    "high": float(ends[1, u]),
+                    "score_low": score_low,
+                    "score_high": score_high,
+                    "swing": abs(score_high - score_low),
+                    "best_at_low": scenarios[int(winners[0, u])]["scenario_id"],
+                    "best_at_high": scenarios[int(winners[1, u])]["scenario_id"],
+                }
+            )
+
+    rankings.sort(key=lambda e: e["swing"], reverse=True)
+    logger.debug("Sensitivity analysis of %d parameters over %d scenarios", len(rankings), len(scenarios))
+    return {
+        "scenario_id": scenarios[best]["scenario_id"],
+        "score": float(base_scores[best]),
+        "rankings": rankings,
+    }
+
+
+def analyze_report(session_id: str, perturbation: float = 0.1, use_bounds: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Sensitivity analysis of a saved session report against the current
+    catalog, with the score basis and weights the session was scored
+    with, or None if the session has no report.
+    """
+    report = load_report(session_id)
+    if report is None:
+        return None
+
+    best = report["best_scenario"]
+    if not best:
+        raise ValueError(f"Session {session_id} has no simulated scenarios: {report.get('error')}")
+    # Reports written before ranked_scenarios was stored only have the best
+    scenarios = [entry["scenario"] for entry in report.get("ranked_scenarios", [best])]
+
+    metrics = report.get("metrics", {})
+    basis = metrics.get("score_basis", "final")
+    if "score_weights" in metrics:
+        weights = ScoringWeights(**metrics["score_weights"])
+    else:
+        weights = None
+        logger.warning("Report for session %s does not record its score weights; using the current ones", session_id)
+
+    result = sensitivity_analysis(
+        best["policy"],
+        best["region"],
+        scenarios,
+        perturbation=perturbation,
+        use_bounds=use_bounds,
+        weights=weights,
+        basis=basis,
+    )
+    if result["scenario_id"] != best["scenario"]["scenario_id"]:
+        logger.warning(
+            "Session %s picked %s, but %s scores best against the current catalog",
+            session_id,
+            best["scenario"]["scenario_id"],
+            result["scenario_id"],
+        )
+    return result
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sensitivity of session results to catalog parameters.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    analyze = subparsers.add_parser(
+        "analyze",
+        help="Rank intervention parameters by how much they move a session's best score.",
+    )
+    analyze.add_argument("session_id", help="Session whose saved report to analyze.")
+    group = analyze.add_mutually_exclusive_group()
+    group.add_argument(
+        "--perturbation", type=float, default=0.1, help="Relative change applied to each parameter (default: 0.1)."
+    )
+    group.add_argument(
+        "--bounds", action="store_true", help="Move parameters to their _low / _high catalog bounds instead."
+    )
+    analyze.add_argument("--top", type=int, default=10, help="Rankings to print (0 = all, default: 10).")
+    analyze.add_argument("--json", action="store_true", help="Print the full result as JSON.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    if args.command == "analyze":
+        result = analyze_report(args.session_id, args.perturbation, args.bounds)
+        if result is None:
+            print(f"No report found for session {args.session_id}")
+            return
+        if args.json:
+            print(json.dumps(result, indent=2))
+            return
+
+        print(f"Best scenario {result['scenario_id']}: score {result['score']:.2f}")
+        rankings = result["rankings"][: args.top] if args.top > 0 else result["rankings"]
+        for entry in rankings:
+            winners = entry["best_at_low"]
+            if entry["best_at_high"] != winners:
+                winners += f" / {entry['best_at_high']}"
+            print(
+                f"- {entry['intervention']} {entry['parameter']}: "
+                f"{entry['low']:g} .. {entry['high']:g} -> score "
+                f"{entry['score_low']:.2f} .. {entry['score_high']:.2f} "
+                f"(swing {entry['swing']:.2f}, best {winners})"
+            )
+
+
+if __name__ == "__main__":
+    main()
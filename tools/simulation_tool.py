@@ -5,10 +5,38 @@ tools.simulation_tool
 Core numerical simulation of scenarios:
 Given a region, a scenario (portfolio of interventions), and the
 interventions catalog, estimate emissions, cost, and job impact.
+
+A scenario's canonical key is its actions as sorted (id, scale) pairs, so
+portfolios that differ only in action order or scenario_id share a key.
+SimulationCache memoizes results per (region, catalog version, key).
+
+simulate_monte_carlo samples intervention parameters from triangular
+distributions over the catalog's uncertainty bounds (mode = point value)
+and reports percentiles of emissions, reduction, cost and jobs per
+scenario. One draw fixes every intervention's parameters, shared by all
+scenarios (common random numbers), so scenarios are compared under the
+same draws and results do not depend on how scenarios are batched.
+
+simulate_trajectory projects each scenario year by year over a horizon:
+every intervention ramps up linearly to its full effect (and spend) over
+its ramp_up_years, giving (scenarios x years) arrays of emissions,
+cumulative cost and jobs impact. Once every ramp is complete, a year's
+values equal simulate_batch's end state bit for bit.
+
+For local search, accumulate() keeps a scenario's running totals in a
+ScenarioAccumulator and apply_delta() updates them for a single added,
+removed or rescaled action in O(1). AccumulatorCache memoizes exact
+accumulators per (region, catalog version, key).
 """
 
 import logging
-from typing import Dict, List
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from tools.intervention_tool import UNCERTAIN_COLUMNS, InterventionCatalog
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +48,44 @@ SCALE_FACTORS = {
 }
 
 
+# Percentiles reported by simulate_monte_carlo
+PERCENTILES = (5, 50, 95)
+
+# Sorted (intervention id, scale label) pairs
+ScenarioKey = Tuple[Tuple[str, str], ...]
+
+
+def canonical_actions(actions: List[Dict]) -> List[Dict]:
+    """Actions sorted by (id, scale), with the scale defaulted to "medium"."""
+    return [{"id": iv_id, "scale": scale} for iv_id, scale in _action_pairs(actions)]
+
+
+def canonical_scenario_key(scenario: Dict) -> ScenarioKey:
+    """Order-independent key of a scenario's actions (ignores scenario_id)."""
+    return tuple(_action_pairs(scenario.get("actions", [])))
+
+
+def _action_pairs(actions: List[Dict]) -> List[Tuple[str, str]]:
+    return sorted((action.get("id"), action.get("scale", "medium")) for action in actions)
+
+
+def region_fingerprint(region: Dict) -> Tuple[Any, float]:
+    """The region fields a simulation depends on."""
+    return region.get("region_id"), float(region.get("current_emissions_mtco2", 0.0))
+
+
+def baseline_emissions(region: Dict) -> float:
+    """Region's current emissions (MtCO2); non-positive values fall back to 1.0."""
+    baseline = float(region.get("current_emissions_mtco2", 0.0))
+    if baseline <= 0:
+        logger.warning(
+            "Region %s has non-positive baseline emissions, using 1.0",
+            region.get("region_id"),
+        )
+        baseline = 1.0
+    return baseline
+
+
 def simulate_scenario(
     region: Dict,
     scenario: Dict,
@@ -37,13 +103,63 @@ def simulate_scenario(
         dict with baseline_emissions, projected_emissions_mtco2,
         co2_reduction_percent, total_cost_usd, estimated_jobs_change_percent.
     """
-    baseline = float(region.get("current_emissions_mtco2", 0.0))
-    if baseline <= 0:
-        logger.warning(
-            "Region %s has non-positive baseline emissions, using 1.0",
-            region.get("region_id"),
-        )
-        baseline = 1.0
+    result = accumulate(region, scenario, interventions_catalog).result()
+
+    logger.debug(
+        "Simulated scenario %s: %s",
+        scenario.get("scenario_id"),
+        result,
+    )
+    return result
+
+
+class ScenarioAccumulator(NamedTuple):
+    """
+    ScenarioAccumulator
+
+    Running totals behind a simulation result. Each action adds its own
+    terms, so a one-action edit is an O(1) update (apply_delta) instead of
+    a full re-simulation; result() builds the simulate_scenario dict.
+    """
+
+    baseline: float
+    total_reduction: float = 0.0
+    total_cost: float = 0.0
+    jobs_impact: float = 0.0
+
+    def result(self) -> Dict[str, float]:
+        new_emissions = max(self.baseline - self.total_reduction, 0.0)
+        co2_reduction_percent = (self.baseline - new_emissions) / self.baseline * 100.0
+        return {
+            "baseline_emissions": self.baseline,
+            "projected_emissions_mtco2": new_emissions,
+            "co2_reduction_percent": co2_reduction_percent,
+            "total_cost_usd": self.total_cost,
+            "estimated_jobs_change_percent": self.jobs_impact,
+        }
+
+
+def action_terms(iv: Mapping[str, Any], scale_label: str, baseline: float) -> Tuple[float, float, float]:
+    """One action's (reduction MtCO2, cost, jobs impact) contribution."""
+    scale_factor = SCALE_FACTORS.get(scale_label, 1.0)
+    # Simple model: percent * scale_factor * baseline
+    return (
+        iv["base_reduction_percent_per_unit"] * scale_factor * baseline / 100.0,
+        iv["base_cost_usd_per_unit"] * scale_factor,
+        iv["job_impact_percent_per_unit"] * scale_factor,
+    )
+
+
+def accumulate(
+    region: Dict,
+    scenario: Dict,
+    interventions_catalog: Dict[str, Dict],
+) -> ScenarioAccumulator:
+    """
+    Sum a scenario's action terms from scratch, in action order. Unknown
+    intervention ids are skipped with a warning.
+    """
+    baseline = baseline_emissions(region)
 
     total_reduction = 0.0
     total_cost = 0.0
@@ -53,42 +169,628 @@ def simulate_scenario(
 
     for action in actions:
         iv_id = action.get("id")
-        scale_label = action.get("scale", "medium")
-
         iv = interventions_catalog.get(iv_id)
         if iv is None:
             logger.warning("Unknown intervention id '%s' in scenario %s", iv_id, scenario.get("scenario_id"))
             continue
 
-        scale_factor = SCALE_FACTORS.get(scale_label, 1.0)
+        reduction_amount, cost_amount, job_amount = action_terms(iv, action.get("scale", "medium"), baseline)
+        total_reduction += reduction_amount
+        total_cost += cost_amount
+        jobs_impact += job_amount
 
-        base_reduction_pct = iv["base_reduction_percent_per_unit"]  # per "unit"
-        base_cost = iv["base_cost_usd_per_unit"]
-        base_job_impact = iv["job_impact_percent_per_unit"]
+    return ScenarioAccumulator(baseline, total_reduction, total_cost, jobs_impact)
 
-        # Simple model: percent * scale_factor * baseline
-        reduction_amount = base_reduction_pct * scale_factor * baseline / 100.0
-        total_reduction += reduction_amount
 
-        cost_amount = base_cost * scale_factor
+def apply_delta(
+    acc: ScenarioAccumulator,
+    interventions_catalog: Dict[str, Dict],
+    iv_id: str,
+    old_scale: Optional[str] = None,
+    new_scale: Optional[str] = None,
+) -> ScenarioAccumulator:
+    """
+    Accumulator after a one-action edit, in O(1): add (old_scale None),
+    remove (new_scale None) or rescale (both given) intervention `iv_id`.
+    The caller tracks which actions the scenario holds.
+
+    Adding an action gives exactly what accumulate would for the scenario
+    with that action appended. Removals subtract, so long edit chains
+    drift by rounding; re-accumulate when exact totals matter.
+    """
+    iv = interventions_catalog[iv_id]
+    total_reduction, total_cost, jobs_impact = acc.total_reduction, acc.total_cost, acc.jobs_impact
+
+    if old_scale is not None:
+        reduction_amount, cost_amount, job_amount = action_terms(iv, old_scale, acc.baseline)
+        total_reduction -= reduction_amount
+        total_cost -= cost_amount
+        jobs_impact -= job_amount
+    if new_scale is not None:
+        reduction_amount, cost_amount, job_amount = action_terms(iv, new_scale, acc.baseline)
+        total_reduction += reduction_amount
         total_cost += cost_amount
+        jobs_impact += job_amount
+
+    return ScenarioAccumulator(acc.baseline, total_reduction, total_cost, jobs_impact)
+
+
+def compile_catalog(
+    interventions_catalog: Dict[str, Dict],
+) -> Tuple[Mapping[str, int], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Turn the catalog into an id -> index map plus per-intervention arrays of
+    reduction percent, cost and job impact (all per unit). A compiled
+    InterventionCatalog already carries these and is used as-is.
+    """
+    if isinstance(interventions_catalog, InterventionCatalog):
+        return (
+            interventions_catalog.index,
+            interventions_catalog.reduction,
+            interventions_catalog.cost,
+            interventions_catalog.jobs,
+        )
+
+    index: Dict[str, int] = {}
+    reduction: List[float] = []
+    cost: List[float] = []
+    jobs: List[float] = []
+    for iv_id, iv in interventions_catalog.items():
+        index[iv_id] = len(index)
+        reduction.append(iv["base_reduction_percent_per_unit"])
+        cost.append(iv["base_cost_usd_per_unit"])
+        jobs.append(iv["job_impact_percent_per_unit"])
+
+    return (
+        index,
+        np.asarray(reduction, dtype=np.float64),
+        np.asarray(cost, dtype=np.float64),
+        np.asarray(jobs, dtype=np.float64),
+    )
+
+
+def compile_scenarios(
+    scenarios: List[Dict],
+    index: Mapping[str, int],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compile scenarios into (iv_index, scale) matrices of shape
+    (n_scenarios, max_actions), keeping each scenario's action order.
+    Padding slots and unknown intervention ids get index -1 and scale 0.
+    """
+    width = max((len(sc.get("actions", [])) for sc in scenarios), default=0)
+    iv_index = np.full((len(scenarios), width), -1, dtype=np.int64)
+    scale = np.zeros((len(scenarios), width), dtype=np.float64)
+
+    unknown = 0
+    for row, scenario in enumerate(scenarios):
+        for col, action in enumerate(scenario.get("actions", [])):
+            i = index.get(action.get("id"))
+            if i is None:
+                unknown += 1
+                continue
+            iv_index[row, col] = i
+            scale[row, col] = SCALE_FACTORS.get(action.get("scale", "medium"), 1.0)
+
+    if unknown:
+        logger.warning("Skipped %d actions with unknown intervention ids in batch", unknown)
+    return iv_index, scale
+
+
+def simulate_compiled(
+    baseline: float,
+    iv_index: np.ndarray,
+    scale: np.ndarray,
+    reduction: np.ndarray,
+    cost: np.ndarray,
+    jobs: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    Simulate compiled scenarios (see compile_scenarios) against catalog
+    arrays. `baseline` must already be positive.
+
+    Per-action terms are computed with the same operations as
+    simulate_scenario and summed slot by slot in action order, so every
+    result is bit-identical to the scalar path. (A single matrix multiply
+    would reorder the floating-point sums.)
+    """
+    n = iv_index.shape[0]
+    total_reduction = np.zeros(n, dtype=np.float64)
+    total_cost = np.zeros(n, dtype=np.float64)
+    jobs_impact = np.zeros(n, dtype=np.float64)
 
-        jobs_impact += base_job_impact * scale_factor
+    for col in range(iv_index.shape[1]):
+        valid = iv_index[:, col] >= 0
+        i = np.where(valid, iv_index[:, col], 0)
+        s = scale[:, col]
+        total_reduction += np.where(valid, reduction[i] * s * baseline / 100.0, 0.0)
+        total_cost += np.where(valid, cost[i] * s, 0.0)
+        jobs_impact += np.where(valid, jobs[i] * s, 0.0)
 
-    new_emissions = max(baseline - total_reduction, 0.0)
+    new_emissions = np.maximum(baseline - total_reduction, 0.0)
     co2_reduction_percent = (baseline - new_emissions) / baseline * 100.0
 
-    result = {
-        "baseline_emissions": baseline,
+    return {
+        "baseline_emissions": np.full(n, baseline, dtype=np.float64),
         "projected_emissions_mtco2": new_emissions,
         "co2_reduction_percent": co2_reduction_percent,
         "total_cost_usd": total_cost,
         "estimated_jobs_change_percent": jobs_impact,
     }
 
+
+def simulate_batch(
+    region: Dict,
+    scenarios: List[Dict],
+    interventions_catalog: Dict[str, Dict],
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized simulate_scenario over many scenarios for one region.
+
+    Returns:
+        dict with the same keys as simulate_scenario, each mapped to an
+        array with one entry per scenario (in input order).
+    """
+    baseline = baseline_emissions(region)
+
+    index, reduction, cost, jobs = compile_catalog(interventions_catalog)
+    iv_index, scale = compile_scenarios(scenarios, index)
+    batch = simulate_compiled(baseline, iv_index, scale, reduction, cost, jobs)
+
+    logger.debug("Simulated batch of %d scenarios for region %s", len(scenarios), region.get("region_id"))
+    return batch
+
+
+def catalog_bounds(
+    interventions_catalog: Dict[str, Dict],
+) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Column name -> (low, mode, high) arrays in catalog order."""
+    if isinstance(interventions_catalog, InterventionCatalog):
+        columns = {
+            "base_reduction_percent_per_unit": interventions_catalog.reduction,
+            "base_cost_usd_per_unit": interventions_catalog.cost,
+            "job_impact_percent_per_unit": interventions_catalog.jobs,
+        }
+        return {
+            name: (low, columns[name], high)
+            for name, (low, high) in interventions_catalog.bounds.items()
+        }
+
+    bounds: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+    for name in UNCERTAIN_COLUMNS:
+        mode = np.asarray([iv[name] for iv in interventions_catalog.values()], dtype=np.float64)
+        low = np.asarray(
+            [iv.get(f"{name}_low", iv[name]) for iv in interventions_catalog.values()], dtype=np.float64
+        )
+        high = np.asarray(
+            [iv.get(f"{name}_high", iv[name]) for iv in interventions_catalog.values()], dtype=np.float64
+        )
+        bounds[name] = (np.minimum(low, mode), mode, np.maximum(high, mode))
+    return bounds
+
+
+def _triangular(
+    rng: np.random.Generator,
+    low: np.ndarray,
+    mode: np.ndarray,
+    high: np.ndarray,
+    draws: int,
+) -> np.ndarray:
+    """
+    (draws, n) triangular samples by inverse CDF, one column per entry of
+    low/mode/high. Zero-width ranges (no uncertainty given) yield the mode.
+    """
+    u = rng.random((draws, low.shape[0]))
+    width = high - low
+    safe = np.where(width > 0, width, 1.0)
+    left = low + np.sqrt(u * safe * (mode - low))
+    right = high - np.sqrt((1.0 - u) * safe * (high - mode))
+    return np.where(width > 0, np.where(u * safe < mode - low, left, right), mode)
+
+
+def simulate_monte_carlo(
+    region: Dict,
+    scenarios: List[Dict],
+    interventions_catalog: Dict[str, Dict],
+    draws: int = 1000,
+    seed: Optional[int] = 0,
+    chunk_size: int = 256,
+) -> Dict[str, np.ndarray]:
+    """
+    Monte Carlo counterpart of simulate_batch.
+
+    Samples `draws` parameter sets for the whole catalog, then evaluates
+    every scenario under every draw with one gather per action slot,
+    `chunk_size` scenarios at a time to bound memory.
+
+    Returns:
+        dict mapping projected_emissions_mtco2, co2_reduction_percent,
+        total_cost_usd and estimated_jobs_change_percent to arrays of shape
+        (n_scenarios, len(PERCENTILES)).
+    """
+    baseline = baseline_emissions(region)
+    index, _, _, _ = compile_catalog(interventions_catalog)
+    rng = np.random.default_rng(seed)
+    # name -> (interventions + 1, draws); the extra zero row serves padding (-1)
+    samples = {
+        name: np.vstack([_triangular(rng, low, mode, high, draws).T, np.zeros((1, draws))])
+        for name, (low, mode, high) in catalog_bounds(interventions_catalog).items()
+    }
+
+    iv_index, scale = compile_scenarios(scenarios, index)
+    complement = tuple(100 - q for q in PERCENTILES)
+    n = len(scenarios)
+    out = {
+        key: np.empty((n, len(PERCENTILES)), dtype=np.float64)
+        for key in (
+            "projected_emissions_mtco2",
+            "co2_reduction_percent",
+            "total_cost_usd",
+            "estimated_jobs_change_percent",
+        )
+    }
+
+    for start in range(0, n, max(1, chunk_size)):
+        stop = min(start + max(1, chunk_size), n)
+        # Sum each scenario's actions slot by slot, giving (scenarios, draws)
+        # arrays; results for a scenario never depend on its batch
+        totals = {name: np.zeros((stop - start, draws), dtype=np.float64) for name in samples}
+        for col in range(iv_index.shape[1]):
+            rows = iv_index[start:stop, col]
+            factor = scale[start:stop, col, None]
+            for name, per_iv in samples.items():
+                totals[name] += per_iv[rows] * factor
+
+        reduction = totals["base_reduction_percent_per_unit"] * baseline / 100.0
+        emissions = np.maximum(baseline - reduction, 0.0)
+        # Reduction percent falls as emissions rise, so its q-th percentile
+        # follows from the (100 - q)-th percentile of emissions
+        emission_pcts = np.percentile(emissions, PERCENTILES + complement, axis=1).T
+        k = len(PERCENTILES)
+        out["projected_emissions_mtco2"][start:stop] = emission_pcts[:, :k]
+        out["co2_reduction_percent"][start:stop] = (baseline - emission_pcts[:, k:]) / baseline * 100.0
+        out["total_cost_usd"][start:stop] = np.percentile(
+            totals["base_cost_usd_per_unit"], PERCENTILES, axis=1
+        ).T
+        out["estimated_jobs_change_percent"][start:stop] = np.percentile(
+            totals["job_impact_percent_per_unit"], PERCENTILES, axis=1
+        ).T
+
     logger.debug(
-        "Simulated scenario %s: %s",
-        scenario.get("scenario_id"),
-        result,
+        "Monte Carlo simulated %d scenarios x %d draws for region %s",
+        n,
+        draws,
+        region.get("region_id"),
     )
-    return result
+    return out
+
+
+def ramp_fractions(ramp_up_years: np.ndarray, years: int) -> np.ndarray:
+    """
+    (interventions, years) share of full effect reached in years 1..years:
+    linear up to 1.0 at ramp_up_years, 1.0 throughout when it is 0.
+    """
+    ramp = np.asarray(ramp_up_years, dtype=np.float64)[:, None]
+    year = np.arange(1, years + 1, dtype=np.float64)[None, :]
+    return np.where(ramp > 0, np.minimum(year / np.where(ramp > 0, ramp, 1.0), 1.0), 1.0)
+
+
+def catalog_ramp_up(interventions_catalog: Dict[str, Dict]) -> np.ndarray:
+    """Per-intervention ramp_up_years in catalog order."""
+    if isinstance(interventions_catalog, InterventionCatalog):
+        return interventions_catalog.ramp_up
+    return np.asarray(
+        [iv.get("ramp_up_years", 0.0) for iv in interventions_catalog.values()], dtype=np.float64
+    )
+
+
+def simulate_trajectory(
+    region: Dict,
+    scenarios: List[Dict],
+    interventions_catalog: Dict[str, Dict],
+    years: int,
+) -> Dict[str, np.ndarray]:
+    """
+    Year-by-year projection of scenarios over `years` years.
+
+    Returns:
+        dict with (n_scenarios, years) arrays emissions_mtco2,
+        cumulative_cost_usd and jobs_change_percent, plus per-scenario
+        cumulative_emissions_mtco2 (sum over the years) and
+        cumulative_reduction_percent (cut in cumulative emissions versus
+        staying at baseline).
+    """
+    years = max(1, int(years))
+    baseline = baseline_emissions(region)
+    index, reduction, cost, jobs = compile_catalog(interventions_catalog)
+    # Extra all-zero row for padding slots (-1)
+    curves = np.vstack([ramp_fractions(catalog_ramp_up(interventions_catalog), years), np.zeros((1, years))])
+
+    iv_index, scale = compile_scenarios(scenarios, index)
+    n = len(scenarios)
+    total_reduction = np.zeros((n, years), dtype=np.float64)
+    total_cost = np.zeros((n, years), dtype=np.float64)
+    jobs_impact = np.zeros((n, years), dtype=np.float64)
+
+    # Same per-action terms and slot order as simulate_compiled
+    for col in range(iv_index.shape[1]):
+        valid = iv_index[:, col] >= 0
+        i = np.where(valid, iv_index[:, col], 0)
+        s = scale[:, col]
+        curve = curves[np.where(valid, iv_index[:, col], -1)]
+        total_reduction += np.where(valid, reduction[i] * s * baseline / 100.0, 0.0)[:, None] * curve
+        total_cost += np.where(valid, cost[i] * s, 0.0)[:, None] * curve
+        jobs_impact += np.where(valid, jobs[i] * s, 0.0)[:, None] * curve
+
+    emissions = np.maximum(baseline - total_reduction, 0.0)
+    cumulative_emissions = emissions.sum(axis=1)
+    baseline_total = baseline * years
+
+    logger.debug("Simulated %d-year trajectories for %d scenarios", years, n)
+    return {
+        "emissions_mtco2": emissions,
+        "cumulative_cost_usd": total_cost,
+        "jobs_change_percent": jobs_impact,
+        "cumulative_emissions_mtco2": cumulative_emissions,
+        "cumulative_reduction_percent": (baseline_total - cumulative_emissions) / baseline_total * 100.0,
+    }
+
+
+def unpack_trajectory(trajectory: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    Split a simulate_trajectory result into per-scenario dicts:
+    {"cumulative_emissions_mtco2", "cumulative_reduction_percent",
+     "trajectory": {"year", "emissions_mtco2", "cumulative_cost_usd",
+     "jobs_change_percent"}} with one list entry per year.
+    """
+    emissions = trajectory["emissions_mtco2"].tolist()
+    cost = trajectory["cumulative_cost_usd"].tolist()
+    jobs = trajectory["jobs_change_percent"].tolist()
+    cumulative = trajectory["cumulative_emissions_mtco2"].tolist()
+    reduction = trajectory["cumulative_reduction_percent"].tolist()
+    years = list(range(1, trajectory["emissions_mtco2"].shape[1] + 1))
+    return [
+        {
+            "cumulative_emissions_mtco2": cumulative[k],
+            "cumulative_reduction_percent": reduction[k],
+            "trajectory": {
+                "year": list(years),
+                "emissions_mtco2": emissions[k],
+                "cumulative_cost_usd": cost[k],
+                "jobs_change_percent": jobs[k],
+            },
+        }
+        for k in range(len(emissions))
+    ]
+
+
+def unpack_monte_carlo(mc: Dict[str, np.ndarray]) -> List[Dict[str, Dict[str, float]]]:
+    """Split a simulate_monte_carlo result into per-scenario {metric: {"p5": ...}} dicts."""
+    columns = {key: values.tolist() for key, values in mc.items()}
+    n = len(columns["co2_reduction_percent"])
+    labels = [f"p{q}" for q in PERCENTILES]
+    return [
+        {key: dict(zip(labels, values[i])) for key, values in columns.items()}
+        for i in range(n)
+    ]
+
+
+def unpack_batch(batch: Dict[str, np.ndarray]) -> List[Dict]:
+    """Split a simulate_batch result into per-scenario result dicts."""
+    columns = {key: values.tolist() for key, values in batch.items()}
+    n = len(columns["co2_reduction_percent"])
+    return [{key: values[i] for key, values in columns.items()} for i in range(n)]
+
+
+def _simulate_unpacked(region: Dict, scenarios: List[Dict], interventions_catalog: Dict[str, Dict]) -> List[Dict]:
+    return unpack_batch(simulate_batch(region, scenarios, interventions_catalog))
+
+
+def _copy_result(value: Any) -> Any:
+    """
+    Copy of a result's nested dicts and lists (uncertainty, trajectory);
+    the leaves are immutable numbers.
+    """
+    if isinstance(value, dict):
+        return {key: _copy_result(item) for key, item in value.items()}
+    if isinstance(value, list):
+        if value and isinstance(value[0], (dict, list)):
+            return [_copy_result(item) for item in value]
+        return list(value)
+    return value
+
+
+class _LRUCache:
+    """
+    Thread-safe LRU of up to `maxsize` entries with hit / miss counters,
+    shared by SimulationCache and AccumulatorCache. Subclasses look up and
+    insert with _get() / _put() while holding `_lock`.
+    """
+
+    def __init__(self, maxsize: int = 100_000) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: Tuple) -> Any:
+        """The cached value (now most recently used) or None; counts the lookup."""
+        cached = self._entries.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return cached
+
+    def _put(self, key: Tuple, value: Any) -> None:
+        """Insert `value`, evicting least recently used entries past maxsize."""
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = value
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        """Lookup counters, hit rate and current number of entries."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class SimulationCache(_LRUCache):
+    """
+    SimulationCache
+
+    Thread-safe LRU memo of simulation results keyed by (region fingerprint,
+    catalog version, context, canonical scenario key), holding up to
+    `maxsize` entries. `context` holds any other simulation settings the
+    results depend on (e.g. the trajectory horizon). Misses are simulated
+    with their actions in canonical order, so every scenario with the same
+    key gets the same result. Catalogs without a version (plain dicts) are
+    never cached.
+
+    Every caller gets its own copy of a result, nested uncertainty and
+    trajectory included, so mutating it never touches the cache.
+
+    hits / misses count scenario lookups; see stats().
+    """
+
+    def lookup(
+        self,
+        region: Dict,
+        scenarios: List[Dict],
+        interventions_catalog: Dict[str, Dict],
+        context: Tuple = (),
+    ) -> Tuple[List[Optional[Dict]], List[Dict], List[List[int]]]:
+        """
+        Look up many scenarios for one region.
+
+        Returns:
+            (results, misses, positions): cached results in input order
+            (None where missing), one canonical scenario per distinct
+            missing key, and the input positions each of those fills.
+            Pass them to store() once the misses are simulated.
+        """
+        results: List[Optional[Dict]] = [None] * len(scenarios)
+        version = getattr(interventions_catalog, "version", "")
+        if not version:
+            return results, list(scenarios), [[i] for i in range(len(scenarios))]
+
+        prefix = (region_fingerprint(region), version, context)
+        pending: Dict[ScenarioKey, int] = {}
+        misses: List[Dict] = []
+        positions: List[List[int]] = []
+        with self._lock:
+            for i, scenario in enumerate(scenarios):
+                key = canonical_scenario_key(scenario)
+                cached = self._get(prefix + (key,))
+                if cached is not None:
+                    results[i] = _copy_result(cached)
+                    continue
+
+                slot = pending.get(key)
+                if slot is None:
+                    pending[key] = len(misses)
+                    misses.append(
+                        {
+                            "scenario_id": scenario.get("scenario_id"),
+                            "actions": canonical_actions(scenario.get("actions", [])),
+                        }
+                    )
+                    positions.append([i])
+                else:
+                    positions[slot].append(i)
+        return results, misses, positions
+
+    def store(
+        self,
+        region: Dict,
+        interventions_catalog: Dict[str, Dict],
+        results: List[Optional[Dict]],
+        misses: List[Dict],
+        positions: List[List[int]],
+        sim_results: List[Dict],
+        context: Tuple = (),
+    ) -> List[Dict]:
+        """Cache simulated misses and fill them into `results`; returns it."""
+        for where, sim_result in zip(positions, sim_results):
+            for i in where:
+                results[i] = _copy_result(sim_result)
+
+        version = getattr(interventions_catalog, "version", "")
+        if not version or self.maxsize <= 0:
+            return results  # type: ignore[return-value]
+
+        prefix = (region_fingerprint(region), version, context)
+        with self._lock:
+            for scenario, sim_result in zip(misses, sim_results):
+                self._put(prefix + (canonical_scenario_key(scenario),), _copy_result(sim_result))
+        return results  # type: ignore[return-value]
+
+    def simulate(
+        self,
+        region: Dict,
+        scenarios: List[Dict],
+        interventions_catalog: Dict[str, Dict],
+        simulate: Optional[Callable[[Dict, List[Dict], Dict[str, Dict]], List[Dict]]] = None,
+        context: Tuple = (),
+    ) -> List[Dict]:
+        """
+        Cached simulation, one result dict per scenario in input order.
+        Misses go through `simulate(region, scenarios, catalog)` (default:
+        simulate_batch, unpacked).
+        """
+        results, misses, positions = self.lookup(region, scenarios, interventions_catalog, context)
+        sim_results = (simulate or _simulate_unpacked)(region, misses, interventions_catalog) if misses else []
+        return self.store(region, interventions_catalog, results, misses, positions, sim_results, context)
+
+
+class AccumulatorCache(_LRUCache):
+    """
+    AccumulatorCache
+
+    Thread-safe LRU of exact ScenarioAccumulators keyed by (region
+    fingerprint, catalog version, canonical scenario key), holding up to
+    `maxsize` entries. Misses are accumulated from scratch with their
+    actions in canonical order, so every scenario with the same key gets
+    the same totals.
+
+    Local search uses it to re-anchor on exact totals whenever it settles
+    on a portfolio, instead of carrying apply_delta rounding along, and to
+    skip re-accumulating portfolios it has already settled on. Accumulators
+    are immutable and shared as is. Catalogs without a version (plain
+    dicts) are never cached.
+
+    hits / misses count lookups; see stats().
+    """
+
+    def get(self, region: Dict, scenario: Dict, interventions_catalog: Dict[str, Dict]) -> ScenarioAccumulator:
+        """The scenario's exact accumulator, from the cache or accumulated."""
+        key = canonical_scenario_key(scenario)
+        version = getattr(interventions_catalog, "version", "")
+        entry = (region_fingerprint(region), version, key)
+        if version:
+            with self._lock:
+                cached = self._get(entry)
+            if cached is not None:
+                return cached
+
+        canonical = {"scenario_id": scenario.get("scenario_id"), "actions": [{"id": i, "scale": s} for i, s in key]}
+        acc = accumulate(region, canonical, interventions_catalog)
+        if version:
+            with self._lock:
+                self._put(entry, acc)
+        return acc
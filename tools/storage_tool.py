@@ -3,10 +3,17 @@
 tools.storage_tool
 
 Utilities for saving and loading reports and other persistent artifacts.
+
+The result cache (memory/cache) stores finished reports under a key
+derived from everything that determines them (see result_cache_key), so
+an identical seeded request can be answered without re-simulating.
 """
 
+import hashlib
 import json
 import logging
+import os
+import tempfile
 from pathlib import Path
 from typing import Any, Dict, Optional
 
@@ -16,6 +23,7 @@ logger = logging.getLogger(__name__)
 
 REPORTS_DIR = MEMORY_DIR / "reports"
 REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+CACHE_DIR = MEMORY_DIR / "cache"
 
 
 def _report_path(session_id: str) -> Path:
@@ -59,3 +67,54 @@ def load_report(session_id: str) -> Optional[Dict[str, Any]]:
 
     logger.info("Loaded report for session %s from %s", session_id, path)
     return report
+
+
+def result_cache_key(**parts: Any) -> str:
+    """Stable hash of JSON-serializable request parts (policy, region, seed, ...)."""
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _cache_path(key: str) -> Path:
+    return CACHE_DIR / f"{key}_report.json"
+
+
+def save_cached_report(key: str, report: Dict[str, Any]) -> None:
+    """
+    Store a report in the result cache. Written to a temporary file and
+    renamed, so concurrent sessions (threads or processes) never see a
+    partial entry; the last writer wins.
+    """
+    path = _cache_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # A unique temp file per writer: sessions may be threads of one process
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+    logger.info("Cached report under key %s", key)
+
+
+def load_cached_report(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a cached report. Returns None on a miss or an unreadable entry.
+    """
+    path = _cache_path(key)
+    if not path.exists():
+        return None
+
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            report = json.load(f)
+    except json.JSONDecodeError as e:
+        logger.error("Failed to decode cached report %s: %s", path, e)
+        return None
+
+    logger.info("Result cache hit for key %s", key)
+    return report
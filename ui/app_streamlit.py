@@ -15,77 +15,30 @@ import logging
 import streamlit as st
 
 from core.config import setup_logging, DEFAULT_REGION_ID
-from core.message_bus import MessageBus
-from core.models import AgentMessage
-from core.session_manager import start_session, update_session_status
+from core.agent_system import AgentSystem
 from tools.storage_tool import load_report
 from tools.memory_tool import summarize_patterns
 
-from agents.orchestrator import Orchestrator
-from agents.policy_agent import PolicyAgent
-from agents.data_agent import DataAgent
-from agents.scenario_agent import ScenarioAgent
-from agents.simulation_agent import SimulationAgent
-from agents.evaluation_agent import EvaluationAgent
-from agents.report_agent import ReportAgent
-
 
 # Ensure logging is configured once
 setup_logging()
 logger = logging.getLogger(__name__)
 
 
-def build_system() -> MessageBus:
+@st.cache_resource
+def get_system() -> AgentSystem:
     """
-    Build a fresh MessageBus with registered agents.
-    Called per-run for simplicity; overhead is small.
+    Build the agent pipeline once per Streamlit server process; every rerun
+    and button click reuses it.
     """
-    bus = MessageBus()
-
-    orchestrator = Orchestrator()
-    policy_agent = PolicyAgent(default_region_id=DEFAULT_REGION_ID)
-    data_agent = DataAgent()
-    scenario_agent = ScenarioAgent()
-    simulation_agent = SimulationAgent()
-    evaluation_agent = EvaluationAgent()
-    report_agent = ReportAgent()
-
-    bus.register_agent("Orchestrator", orchestrator)
-    bus.register_agent("PolicyAgent", policy_agent)
-    bus.register_agent("DataAgent", data_agent)
-    bus.register_agent("ScenarioAgent", scenario_agent)
-    bus.register_agent("SimulationAgent", simulation_agent)
-    bus.register_agent("EvaluationAgent", evaluation_agent)
-    bus.register_agent("ReportAgent", report_agent)
-
-    return bus
+    return AgentSystem()
 
 
 def run_agentic_terraformer(goal_text: str, region_id: str) -> str:
     """
     Create a session, run the agent pipeline, return session_id.
     """
-    state = start_session(goal_text, region_id)
-    session_id = state.session_id
-
-    update_session_status(session_id, "running")
-
-    bus = build_system()
-
-    start_msg = AgentMessage(
-        sender="UI",
-        receiver="Orchestrator",
-        type="START",
-        payload={
-            "goal_text": goal_text,
-            "region_id": region_id,
-        },
-        session_id=session_id,
-    )
-    bus.send(start_msg)
-    bus.run(session_id=session_id)
-
-    update_session_status(session_id, "completed")
+    session_id = get_system().run_session(goal_text, region_id, sender="UI")
 
     logger.info("UI completed session %s", session_id)
     return session_id
@@ -115,6 +68,19 @@ def main() -> None:
             f"{region_id} with minimal job loss."
         )
 
+        # Served from the running aggregates, so this is cheap on every rerun
+        memory = summarize_patterns()
+        st.header("Long-Term Memory")
+        st.metric("Sessions recorded", memory["num_sessions"])
+        if memory["best_score"] is not None:
+            st.metric("Best score", f"{memory['best_score']:.2f}")
+        region_memory = memory.get("per_region", {}).get(region_id.strip())
+        if region_memory:
+            st.caption(
+                f"{region_memory['num_sessions']} past sessions for this region, "
+                f"avg CO2 reduction {region_memory['avg_co2_reduction_percent']:.1f}%"
+            )
+
     st.subheader("Define Your Sustainability Goal")
     goal_text = st.text_area(
         "Goal description",